@@ -14,32 +14,31 @@
 
 """Root agent for the wellness coach assistant with specialized sub-agents."""
 
-import os
-import google.auth
+import functools
+
 from google.adk.agents import Agent
-import time
-from typing import Optional
-from google.adk.tools.tool_context import ToolContext
-from app.sub_agents.bigquery_agent import bigquery_agent
-from app.sub_agents.fitness_planning_agent import fitness_planning_agent
-from app.sub_agents.video_generation_agent import video_generation_agent
-from app.sub_agents.user_registration_agent import user_registration_agent
-from app.sub_agents.gym_progress_report_agent import gym_progress_agent
-from google import genai
-from google.genai import types
-from google.cloud import storage
-
-_, project_id = google.auth.default()
-os.environ.setdefault("GOOGLE_CLOUD_PROJECT", project_id)
-os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "global")
-os.environ.setdefault("GOOGLE_GENAI_USE_VERTEXAI", "True")
 
+from app.sub_agents.bigquery_agent import create_bigquery_agent
+from app.sub_agents.fitness_planning_agent import create_fitness_planning_agent
+from app.sub_agents.gym_progress_report_agent import create_gym_progress_agent
+from app.sub_agents.user_registration_agent import create_user_registration_agent
+from app.sub_agents.video_generation_agent import create_video_generation_agent
+from app.sub_agents.wellness_bundle_agent import create_wellness_bundle_agent
+from app.utils.environment import init_environment
+from app.utils.intent_router import route_clear_intents
+from app.utils.response_cache import cached_response, store_response
 
-# Create the root agent with specialized subagents
-gym_assistant = Agent(
-    name="gym_assistant",
-    model="gemini-2.5-flash",
-    instruction="""You are a helpful AI wellness coach assistant with specialized capabilities. You can help with general wellness questions and delegate tasks to specialized agents.
+# Sub-agents are built on first access to `root_agent`, in delegation order.
+SUB_AGENT_FACTORIES = (
+    create_fitness_planning_agent,
+    create_video_generation_agent,
+    create_bigquery_agent,
+    create_user_registration_agent,
+    create_gym_progress_agent,
+    create_wellness_bundle_agent,
+)
+
+GYM_ASSISTANT_INSTRUCTION = """You are a helpful AI wellness coach assistant with specialized capabilities. You can help with general wellness questions and delegate tasks to specialized agents.
 
 When users ask about:
 - Creating training plans, fitness coaching, exercise recommendations, health data analysis, weekly workout schedules, personalized fitness programs
@@ -49,21 +48,40 @@ When users ask about:
 - Creating videos, video generation, visual content, Veo videos, generating clips, making videos from text
 → Delegate to the video_generation_agent
 
+When users ask about:
+- Both a workout plan and a diet plan, a weekly wellness bundle, training and nutrition together
+→ Delegate to the wellness_bundle_agent
+
 DELEGATION EXAMPLES:
 - "I'll connect you with our expert fitness planning agent who can create a personalized training plan for you."
 - "I'll connect you with our video generation specialist who can create amazing videos using Veo 3 technology."
 
 IMPORTANT: If the user asks about data, you can use the bigquery_agent only to get information.
 
-For other general wellness questions, you can handle them directly with your knowledge.""",
-    tools=[],
-    sub_agents=[
-        fitness_planning_agent, 
-        video_generation_agent, 
-        bigquery_agent, 
-        user_registration_agent,
-        gym_progress_agent
-    ],
-)
+For other general wellness questions, you can handle them directly with your knowledge."""
+
+
+# Create the root agent with specialized subagents
+@functools.cache
+def get_root_agent() -> Agent:
+    """Builds the gym assistant and its sub-agents once per process."""
+    init_environment()
+    return Agent(
+        name="gym_assistant",
+        model="gemini-2.5-flash",
+        instruction=GYM_ASSISTANT_INSTRUCTION,
+        tools=[],
+        # Clear-cut requests skip the model's delegation turn, and repeated
+        # general questions are answered from the opt-in response cache
+        before_model_callback=[route_clear_intents, cached_response],
+        after_model_callback=store_response,
+        sub_agents=[factory() for factory in SUB_AGENT_FACTORIES],
+    )
+
 
-root_agent = gym_assistant
\ No newline at end of file
+def __getattr__(name: str) -> Agent:
+    # `root_agent` and `gym_assistant` are resolved lazily so that importing
+    # this module stays cheap for callers that never run the agent.
+    if name in ("root_agent", "gym_assistant"):
+        return get_root_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
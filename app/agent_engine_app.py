@@ -13,11 +13,14 @@
 # limitations under the License.
 
 # mypy: disable-error-code="attr-defined,arg-type"
-import copy
 import datetime
+import functools
 import json
 import logging
 import os
+import queue
+import threading
+from collections.abc import Callable
 from typing import Any
 
 import google.auth
@@ -29,26 +32,121 @@ from opentelemetry.sdk.trace import TracerProvider, export
 from vertexai import agent_engines
 from vertexai.preview.reasoning_engines import AdkApp
 
-from app.agent import root_agent
 from app.utils.gcs import create_bucket_if_not_exists
 from app.utils.tracing import CloudTraceLoggingSpanExporter
 from app.utils.typing import Feedback
 
+# Number of set-up clones kept ready per process; 0 disables the pool.
+CLONE_POOL_SIZE = int(os.environ.get("AGENT_ENGINE_CLONE_POOL_SIZE", "0"))
+SHARED_SERVICE_BUILDERS = (
+    "session_service_builder",
+    "artifact_service_builder",
+    "memory_service_builder",
+)
+
+
+@functools.cache
+def _init_telemetry() -> google_cloud_logging.Logger:
+    """Creates the Cloud Logging client and trace exporter once per process."""
+    logging_client = google_cloud_logging.Client()
+    provider = TracerProvider()
+    processor = export.BatchSpanProcessor(
+        CloudTraceLoggingSpanExporter(
+            logging_client=logging_client,
+            project_id=os.environ.get("GOOGLE_CLOUD_PROJECT"),
+        )
+    )
+    provider.add_span_processor(processor)
+    trace.set_tracer_provider(provider)
+    return logging_client.logger(__name__)
+
+
+class _SharedServiceBuilder:
+    """Wraps a service builder so that all clones of an app share one instance."""
+
+    def __init__(self, builder: Callable[[], Any]) -> None:
+        self.builder = builder
+        self._service: Any = None
+        self._lock = threading.Lock()
+
+    def __call__(self) -> Any:
+        with self._lock:
+            if self._service is None:
+                self._service = self.builder()
+        return self._service
+
+
+class ClonePool:
+    """Keeps a number of set-up clones of an app ready to be taken by workers."""
+
+    def __init__(self, template: "AgentEngineApp", size: int) -> None:
+        self.template = template
+        self.size = size
+        self._ready: queue.SimpleQueue[AgentEngineApp] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._filling = False
+
+    def take(self) -> "AgentEngineApp | None":
+        """Returns a ready clone, or None if the pool is empty, and refills it."""
+        try:
+            app = self._ready.get_nowait()
+        except queue.Empty:
+            app = None
+        self.fill()
+        return app
+
+    def fill(self) -> None:
+        """Tops the pool up to its size in a background thread."""
+        with self._lock:
+            if self._filling or self._ready.qsize() >= self.size:
+                return
+            self._filling = True
+        threading.Thread(target=self._fill, daemon=True).start()
+
+    def _fill(self) -> None:
+        try:
+            while self._ready.qsize() < self.size:
+                app = self.template._new_clone()
+                app.set_up()
+                self._ready.put(app)
+        except Exception as e:
+            logging.warning(f"Could not pre-warm agent engine app clone: {e}")
+        finally:
+            with self._lock:
+                self._filling = False
+
 
 class AgentEngineApp(AdkApp):
+    _is_set_up = False
+    _is_clone = False
+    _clone_pool: ClonePool | None = None
+
     def set_up(self) -> None:
-        """Set up logging and tracing for the agent engine app."""
+        """Set up logging and tracing for the agent engine app.
+
+        Clients that are expensive to create (Cloud Logging, the trace exporter
+        and the services returned by the configured builders) are created once
+        per process and shared with every clone. Calling it again on an app
+        that is already set up, e.g. one taken from the clone pool, is a no-op.
+        """
+        if self._is_set_up:
+            return
+        for key in SHARED_SERVICE_BUILDERS:
+            builder = self._tmpl_attrs.get(key)
+            if builder is not None and not isinstance(builder, _SharedServiceBuilder):
+                self._tmpl_attrs[key] = _SharedServiceBuilder(builder)
         super().set_up()
-        logging_client = google_cloud_logging.Client()
-        self.logger = logging_client.logger(__name__)
-        provider = TracerProvider()
-        processor = export.BatchSpanProcessor(
-            CloudTraceLoggingSpanExporter(
-                project_id=os.environ.get("GOOGLE_CLOUD_PROJECT")
-            )
-        )
-        provider.add_span_processor(processor)
-        trace.set_tracer_provider(provider)
+        self.logger = _init_telemetry()
+        self._is_set_up = True
+        if CLONE_POOL_SIZE > 0 and not self._is_clone:
+            self.warm_clone_pool(CLONE_POOL_SIZE)
+
+    def warm_clone_pool(self, size: int) -> ClonePool:
+        """Starts keeping `size` set-up clones ready for `clone()` to hand out."""
+        if self._clone_pool is None:
+            self._clone_pool = ClonePool(self, size)
+        self._clone_pool.fill()
+        return self._clone_pool
 
     def register_feedback(self, feedback: dict[str, Any]) -> None:
         """Collect and log feedback."""
@@ -65,19 +163,35 @@ class AgentEngineApp(AdkApp):
         return operations
 
     def clone(self) -> "AgentEngineApp":
-        """Returns a clone of the ADK application."""
+        """Returns a clone of the ADK application.
+
+        A pre-set-up clone is taken from the pool when one is ready.
+        """
+        if self._clone_pool is not None:
+            pooled = self._clone_pool.take()
+            if pooled is not None:
+                return pooled
+        return self._new_clone()
+
+    def _new_clone(self) -> "AgentEngineApp":
+        """Builds a clone that shares the agent graph and service builders.
+
+        Clones never start a clone pool of their own.
+        """
         template_attributes = self._tmpl_attrs
-        from app.agent import root_agent
-        print(f"Cloning agent: {root_agent}")
-        return self.__class__(
-            agent=root_agent,
+        logging.debug(f"Cloning agent: {template_attributes['agent'].name}")
+        clone = self.__class__(
+            agent=template_attributes["agent"],
             enable_tracing=bool(template_attributes.get("enable_tracing", False)),
             session_service_builder=template_attributes.get("session_service_builder"),
             artifact_service_builder=template_attributes.get(
                 "artifact_service_builder"
             ),
+            memory_service_builder=template_attributes.get("memory_service_builder"),
             env_vars=template_attributes.get("env_vars"),
         )
+        clone._is_clone = True
+        return clone
 
 
 def deploy_agent_engine_app(
@@ -90,6 +204,7 @@ def deploy_agent_engine_app(
     service_account: str | None = None,
 ) -> agent_engines.AgentEngine:
     """Deploy the agent engine app to Vertex AI."""
+    from app.agent import root_agent
 
     staging_bucket_uri = f"gs://{project}-agent-engine"
     artifacts_bucket_name = f"{project}-health-assistant-logs-data"
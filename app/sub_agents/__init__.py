@@ -14,12 +14,18 @@
 
 """Sub-agents module for the wellness coach assistant."""
 
-from .bigquery_agent import bigquery_agent
-from .fitness_planning_agent import fitness_planning_agent
-from .video_generation_agent import video_generation_agent
+from .bigquery_agent import create_bigquery_agent
+from .fitness_planning_agent import create_fitness_planning_agent
+from .gym_progress_report_agent import create_gym_progress_agent
+from .user_registration_agent import create_user_registration_agent
+from .video_generation_agent import create_video_generation_agent
+from .wellness_bundle_agent import create_wellness_bundle_agent
 
 __all__ = [
-    "bigquery_agent",
-    "fitness_planning_agent", 
-    "video_generation_agent"
+    "create_bigquery_agent",
+    "create_fitness_planning_agent",
+    "create_gym_progress_agent",
+    "create_user_registration_agent",
+    "create_video_generation_agent",
+    "create_wellness_bundle_agent",
 ]
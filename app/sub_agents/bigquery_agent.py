@@ -1,26 +1,20 @@
 """BigQuery agent for data analysis and querying."""
 
-import os
-import google.auth
 from google.adk.agents import Agent
-from toolbox_core import ToolboxClient, auth_methods, ToolboxSyncClient
 
-_, project_id = google.auth.default()
-os.environ.setdefault("GOOGLE_CLOUD_PROJECT", project_id)
-os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "global")
-os.environ.setdefault("GOOGLE_GENAI_USE_VERTEXAI", "True")
+from app.utils.toolbox import get_toolbox_tools
 
-def get_tools():
-    URL = "https://toolbox-4wmotx3yxa-ey.a.run.app"
-    toolbox_client = ToolboxSyncClient(URL)
-    return toolbox_client.load_toolset("health-assistant-toolset")
-
-bigquery_agent = Agent(
-    name="bigquery_agent",
-    model="gemini-2.5-flash",
-    instruction="""You are a helpful assistant that can answer questions about data. 
+BIGQUERY_AGENT_INSTRUCTION = """You are a helpful assistant that can answer questions about data.
     You can use the following tools to get information:
     - list_distinct_users
-    - get_fitness_data_for_user""",
-    tools=get_tools(),
-)
+    - get_fitness_data_for_user"""
+
+
+def create_bigquery_agent() -> Agent:
+    """Builds the BigQuery data agent."""
+    return Agent(
+        name="bigquery_agent",
+        model="gemini-2.5-flash",
+        instruction=BIGQUERY_AGENT_INSTRUCTION,
+        tools=get_toolbox_tools(),
+    )
@@ -14,36 +14,30 @@
 
 """Fitness planning agent for creating personalized workout plans."""
 
-from google.adk.agents import Agent
 import datetime
-from toolbox_core import ToolboxClient, auth_methods, ToolboxSyncClient
 
-def get_tools():
-    URL = "https://toolbox-4wmotx3yxa-ey.a.run.app"
-    toolbox_client = ToolboxSyncClient(URL)
-    return toolbox_client.load_toolset("health-assistant-toolset")
+from google.adk.agents import Agent
+
+from app.utils.fitness_data import get_fitness_data_window
+from app.utils.fitness_rollups import get_fitness_rollup_for_user
+from app.utils.fitness_summary import get_fitness_summary_for_user
+from app.utils.toolbox import get_toolbox_tools
 
-process_workout_plan = Agent(
-    name="process_workout_plan",
-    model="gemini-2.5-flash",
-    instruction="""You are a helpful assistant that can process a workout plan.
+PROCESS_WORKOUT_PLAN_INSTRUCTION = """You are a helpful assistant that can process a workout plan.
     You are already provided a workout plan from another agent. Make sure to process it.
     You can use the following tools to process a workout plan:
-    - add_workout_plan""",
-    tools=get_tools(),
-)
+    - add_weekly_workout_plan: stores all days of the plan in a single call
+    - add_workout_plan: only for storing a single day"""
 
-# Create the fitness planning agent
-fitness_planning_agent = Agent(
-    name="fitness_planning_agent",
-    model="gemini-2.5-flash",
-    instruction="current_date: "+ datetime.datetime.now().strftime("%Y-%m-%d")+ """You are an expert personal trainer and sports scientist specializing in data-driven fitness coaching.
+FITNESS_PLANNING_AGENT_INSTRUCTION = """You are an expert personal trainer and sports scientist specializing in data-driven fitness coaching.
 
 ROLE: Expert personal trainer and sports scientist
 CONTEXT: Generate comprehensive 1-week training plans based on user's complete health and fitness data
 
 WORKFLOW:
-1. Based on the user email address use the tool get_fitness_data_for_user to get the user's health data.
+1. Based on the user email address use the tool get_fitness_rollup_for_user to get the precomputed overview of the user's health data.
+   If the user has no rollup yet, use get_fitness_summary_for_user instead.
+   Only if you need individual daily records, use get_fitness_data_window with a date window and just the columns you need.
 2. Create a detailed 7-day training schedule that considers:
    - Their fitness experience and current activity level
    - Cardiovascular health (heart rate, blood pressure)
@@ -55,15 +49,42 @@ WORKFLOW:
 
 5. Specify intensity using heart rate zones and specific sets/reps/rest periods
 6. Include proper warm-up and cool-down for each workout day
-7. Finally use the tool add_workout_plan to add the workout plan per day to the database.
+7. Finally use the tool add_weekly_workout_plan to add the workout plan of all 7 days to the database in a single call.
 8. Show the workout plan to the user in markdown format with emojis that is copatabile with Mobile devices.
 So keep it short and concise.
 
 IMPORTANT: 
 Generate completely personalized plans. Each person's plan should be unique based on their specific health profile, goals, and preferences.
-Strictly follow the format of the workout plan. Every day needs to have a seperate and single tool call.
+Strictly follow the format of the workout plan. Store the whole week with exactly one add_weekly_workout_plan call, with one entry per day in each list.
+
+Present everything in clear, well-structured Markdown format."""
 
-Present everything in clear, well-structured Markdown format.""",
-    description="Expert fitness planning agent that creates personalized weekly training plans by directly analyzing comprehensive user health data without intermediate processing tools.",
-    tools=get_tools()
-)
+
+def create_process_workout_plan_agent() -> Agent:
+    """Builds the agent that stores an already generated workout plan."""
+    return Agent(
+        name="process_workout_plan",
+        model="gemini-2.5-flash",
+        instruction=PROCESS_WORKOUT_PLAN_INSTRUCTION,
+        tools=get_toolbox_tools(),
+    )
+
+
+# Create the fitness planning agent
+def create_fitness_planning_agent() -> Agent:
+    """Builds the fitness planning agent, dated with the current day."""
+    current_date = datetime.datetime.now().strftime("%Y-%m-%d")
+    return Agent(
+        name="fitness_planning_agent",
+        model="gemini-2.5-flash",
+        instruction="current_date: "
+        + current_date
+        + FITNESS_PLANNING_AGENT_INSTRUCTION,
+        description="Expert fitness planning agent that creates personalized weekly training plans from precomputed rollups of the user's complete health data.",
+        tools=[
+            get_fitness_rollup_for_user,
+            get_fitness_summary_for_user,
+            get_fitness_data_window,
+            *get_toolbox_tools(),
+        ],
+    )
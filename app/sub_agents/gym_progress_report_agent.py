@@ -1,22 +1,20 @@
-import os
-import google.auth
+import asyncio
+
 from google.adk.agents import Agent
 from google.adk.tools.tool_context import ToolContext
-from google import genai
-from google.genai import types
-from google.cloud import storage
-import datetime
 
-_, project_id = google.auth.default()
-os.environ.setdefault("GOOGLE_CLOUD_PROJECT", project_id)
-os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "global")
-os.environ.setdefault("GOOGLE_GENAI_USE_VERTEXAI", "True")
+from app.utils.clients import get_genai_client, get_storage_client
+from app.utils.fitness_rollups import get_fitness_rollup_for_user
+from app.utils.fitness_summary import get_fitness_summary_for_user
+from app.utils.media_artifacts import save_media_artifact
+from app.utils.media_renditions import get_media_post_processor, rendition_urls
+from app.utils.media_spool import get_media_spool
 
 
-def generate_gym_progress_image(
+async def generate_gym_progress_image(
     progress_description: str,
     visual_style: str = "motivational poster",
-    tool_context: ToolContext = None
+    tool_context: ToolContext = None,
 ) -> dict:
     """Generates a funny and innovative image about gym progress using Gemini 2.5 Flash Image.
 
@@ -26,12 +24,13 @@ def generate_gym_progress_image(
         tool_context: ADK tool context for saving artifacts
 
     Returns:
-        Dictionary with image generation status and analysis.
+        Dictionary with image generation status, analysis and a reference to
+        the image artifact.
     """
     try:
-        # Initialize the Gemini client
-        client = genai.Client()
-        
+        # Use the shared Gemini client
+        client = get_genai_client()
+
         # Create a creative and funny prompt for gym progress
         creative_prompt = f"""Create a funny and innovative {visual_style} about gym progress: {progress_description}
 
@@ -44,111 +43,117 @@ Make it:
 - Make it Instagram-worthy and shareable
 
 Style: Modern, colorful, and energetic with a touch of humor"""
-        
+
         print(f"🎨 Generating gym progress image: '{progress_description[:50]}...'")
-        
+
         # Generate image using Gemini 2.5 Flash Image (Nano Banana)
-        response = client.models.generate_content(
+        # Blocking calls run off the event loop, which serves other sessions
+        response = await asyncio.to_thread(
+            client.models.generate_content,
             model="gemini-2.5-flash-image-preview",
             contents=[creative_prompt],
         )
-        
+
         # Process the response
         image_generated = False
         analysis_text = ""
-        filename = None
-        gcs_url = None
+        artifact = None
         public_url = None
-        
+        renditions = {}
+
         for part in response.candidates[0].content.parts:
             if part.text:
                 analysis_text = part.text
                 print(f"📝 Analysis: {part.text}")
             elif part.inline_data:
-                # Generate unique filename
-                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"gym_progress_{timestamp}.png"
-                
-                # Save image locally
-                from PIL import Image
-                from io import BytesIO
-                image = Image.open(BytesIO(part.inline_data.data))
-                image.save(filename)
-                print(f"🖼️ Image saved locally as: {filename}")
-                
+                # Save the image as returned by the model to the media spool
+                path = await asyncio.to_thread(
+                    get_media_spool().write,
+                    part.inline_data.data,
+                    "gym_progress",
+                    ".png",
+                )
+                filename = path.name
+                print(f"🖼️ Image saved locally as: {path}")
+
                 # Upload to GCS bucket
                 try:
                     bucket_name = "qwiklabs-gcp-00-a489584c5286-adk-videos"
-                    storage_client = storage.Client()
+                    storage_client = get_storage_client()
                     bucket = storage_client.bucket(bucket_name)
                     blob = bucket.blob(filename)
-                    
-                    blob.upload_from_filename(filename)
+
+                    await asyncio.to_thread(
+                        blob.upload_from_filename, path, content_type="image/png"
+                    )
                     gcs_url = f"gs://{bucket_name}/{filename}"
-                    public_url = f"https://storage.googleapis.com/{bucket_name}/{filename}"
+                    public_url = (
+                        f"https://storage.googleapis.com/{bucket_name}/{filename}"
+                    )
                     print(f"☁️ Image uploaded to GCS: {gcs_url}")
-                    
+
+                    # Thumbnail and WebP/AVIF versions are made off-thread
+                    get_media_post_processor().submit(path)
+                    renditions = rendition_urls(filename, bucket_name)
+
                 except Exception as e:
                     print(f"⚠️ Could not upload to GCS: {e}")
-                
-                # Save as artifact if tool_context is available
-                if tool_context:
-                    try:
-                        image_part = types.Part(
-                            inline_data=types.Blob(
-                                mime_type="image/png",
-                                data=part.inline_data.data
-                            )
-                        )
-                        tool_context.save_artifact(filename, image_part)
-                        print(f"💾 Image saved as artifact: {filename}")
-                    except Exception as e:
-                        print(f"⚠️ Could not save as artifact: {e}")
-                
+
+                # Save as artifact and return a reference instead of the bytes
+                artifact = await save_media_artifact(
+                    tool_context,
+                    filename,
+                    part.inline_data.data,
+                    "image/png",
+                    public_url,
+                )
+
                 image_generated = True
-        
+
         if image_generated:
-            # Convert to base64
-            import base64
-            with open(filename, 'rb') as f:
-                image_base64 = base64.b64encode(f.read()).decode('utf-8')
-            
             return {
                 "status": "success",
                 "message": f"Funny gym progress image created! {analysis_text[:100] if analysis_text else 'Visual motivation generated!'}",
-                "filename": filename,
-                "gcs_url": gcs_url,
-                "public_url": public_url,
-                # "base64_image": image_base64,
+                "artifact": artifact,
+                "renditions": renditions,
                 "analysis": analysis_text,
-                "style": visual_style
+                "style": visual_style,
             }
         else:
             return {
                 "status": "error",
-                "message": "Image generation failed - no image was produced"
+                "message": "Image generation failed - no image was produced",
             }
-            
+
     except Exception as e:
-        error_message = f"Image generation failed: {str(e)}"
+        error_message = f"Image generation failed: {e!s}"
         print(f"❌ {error_message}")
-        return {
-            "status": "error",
-            "message": error_message
-        }
+        return {"status": "error", "message": error_message}
 
-# Create a gym progress image agent
-gym_progress_agent = Agent(
-    name="gym_progress_agent", 
-    model="gemini-2.5-flash",
-    instruction="""You are a creative fitness visualization specialist using Nano Banana (Gemini 2.5 Flash Image).
+
+GYM_PROGRESS_AGENT_INSTRUCTION = """You are a creative fitness visualization specialist using Nano Banana (Gemini 2.5 Flash Image).
 
 WORKFLOW:
 1. Ask for user's email
-2. Use generate_gym_progress_image tool with their email - it fetches real BigQuery data automatically
-3. Generate funny motivational images based on their actual progress data
+2. Use get_fitness_rollup_for_user with their email to get their real progress data (weekly weight trajectory, resting heart rate, sleep and steps)
+   If they have no rollup yet, use get_fitness_summary_for_user instead
+3. Use generate_gym_progress_image with a progress description built from that data
+4. Generate funny motivational images based on their actual progress data
+
+Just get email, summarize and generate image!"""
 
-Just get email and generate image!""",
-    description="Creative agent that generates funny gym progress images using Nano Banana and provides motivational analysis of fitness achievements.",
-    tools=[generate_gym_progress_image],
-)
\ No newline at end of file
+
+# Create a gym progress image agent
+def create_gym_progress_agent() -> Agent:
+    """Builds the gym progress image agent."""
+    return Agent(
+        name="gym_progress_agent",
+        model="gemini-2.5-flash",
+        instruction=GYM_PROGRESS_AGENT_INSTRUCTION,
+        description="Creative agent that generates funny gym progress images using Nano Banana and provides motivational analysis of fitness achievements.",
+        tools=[
+            get_fitness_rollup_for_user,
+            get_fitness_summary_for_user,
+            generate_gym_progress_image,
+        ],
+    )
@@ -1,28 +1,23 @@
 """User registration agent for user registration."""
 
-import os
-import google.auth
 from google.adk.agents import Agent
-from toolbox_core import ToolboxClient, auth_methods, ToolboxSyncClient
 
-_, project_id = google.auth.default()
-os.environ.setdefault("GOOGLE_CLOUD_PROJECT", project_id)
-os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "global")
-os.environ.setdefault("GOOGLE_GENAI_USE_VERTEXAI", "True")
+from app.utils.toolbox import get_toolbox_tools
+from app.utils.user_index import is_user_registered
 
-def get_tools():
-    URL = "https://toolbox-4wmotx3yxa-ey.a.run.app"
-    toolbox_client = ToolboxSyncClient(URL)
-    return toolbox_client.load_toolset("health-assistant-toolset")
-
-# Create the user registration agent
-user_registration_agent = Agent(
-    name="user_registration_agent",
-    model="gemini-2.5-flash",
-    instruction="""You are a helpful assistant that can register a new user.
+USER_REGISTRATION_AGENT_INSTRUCTION = """You are a helpful assistant that can register a new user.
     Make sure to check if the user is already registered before registering a new user.
     You can use the following tools to register a new user:
-    - list_distinct_users
-    - register_user""",
-    tools=get_tools(),
-)
\ No newline at end of file
+    - is_user_registered: checks a single email, use it instead of listing all users
+    - register_user"""
+
+
+# Create the user registration agent
+def create_user_registration_agent() -> Agent:
+    """Builds the user registration agent."""
+    return Agent(
+        name="user_registration_agent",
+        model="gemini-2.5-flash",
+        instruction=USER_REGISTRATION_AGENT_INSTRUCTION,
+        tools=[is_user_registered, *get_toolbox_tools("register_user")],
+    )
@@ -14,161 +14,263 @@
 
 """Video generation agent using Veo 3 technology."""
 
-import datetime
-import os
+import asyncio
 import time
-from typing import Optional
 
-import google.auth
-from google.adk.tools.tool_context import ToolContext
-from google import genai
-from google.genai import types
-from google.cloud import storage
 from google.adk.agents import Agent
+from google.adk.tools.tool_context import ToolContext
+
+from app.utils.media_artifacts import media_reference
+from app.utils.video_jobs import VIDEO_MIME_TYPE, VideoJob, get_video_job_manager
+
+# Session state key holding the Veo operation of every submitted job, so that a
+# status check can be answered by any worker, not only the one that submitted.
+VIDEO_JOBS_STATE_KEY = "video_jobs"
+# Session state key holding which videos of each batch were already reported
+VIDEO_BATCHES_STATE_KEY = "video_batches"
+
+
+async def _video_result(job: VideoJob, tool_context: ToolContext | None) -> dict:
+    """Saves a finished video as an artifact, once per session, and describes it."""
+    if job.status == "failed":
+        return {"status": "error", "message": job.error, "job_id": job.job_id}
+
+    version = None
+    if tool_context:
+        jobs = dict(tool_context.state.get(VIDEO_JOBS_STATE_KEY) or {})
+        entry = dict(jobs.get(job.job_id) or {})
+        version = entry.get("artifact_version")
+        if version is None:
+            try:
+                version = await get_video_job_manager().save_artifact(job, tool_context)
+                print(f"💾 Video saved as artifact: {job.filename}")
+                entry["artifact_version"] = version
+                jobs[job.job_id] = entry
+                tool_context.state[VIDEO_JOBS_STATE_KEY] = jobs
+            except Exception as e:
+                print(f"⚠️ Could not save as artifact: {e}")
+
+    return {
+        "status": "success",
+        "message": f"Video generated successfully as {job.filename}",
+        "job_id": job.job_id,
+        "artifact": media_reference(
+            job.filename,
+            VIDEO_MIME_TYPE,
+            job.size_bytes,
+            url=job.public_url,
+            version=version,
+        ),
+        "cached": job.cached,
+        "prompt": job.prompt,
+        "aspect_ratio": job.aspect_ratio,
+        "duration": "8 seconds",
+        "resolution": "720p",
+    }
 
-_, project_id = google.auth.default()
-os.environ.setdefault("GOOGLE_CLOUD_PROJECT", project_id)
-os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "global")
-os.environ.setdefault("GOOGLE_GENAI_USE_VERTEXAI", "True")
 
-def generate_veo_video(
+async def generate_veo_video(
     prompt: str,
     aspect_ratio: str = "16:9",
     negative_prompt: str = "",
-    tool_context: ToolContext = None
+    tool_context: ToolContext = None,
 ) -> dict:
-    """Generates a video using Veo 3 from a text prompt and saves it as an artifact.
+    """Starts generating a video using Veo 3 from a text prompt.
+
+    The generation runs in the background and takes 2-3 minutes. Use
+    get_veo_video_status with the returned job_id to check on it later.
+    Videos that were generated before for the same request are returned
+    right away.
 
     Args:
         prompt: Text description of the video to generate
         aspect_ratio: Video aspect ratio - "16:9" or "9:16" (default: "16:9")
         negative_prompt: Text describing what NOT to include in the video
-        tool_context: ADK tool context for saving artifacts
+        tool_context: ADK tool context for tracking the job in the session
 
     Returns:
-        Dictionary with video generation status and details.
+        Dictionary with the job id of the submitted video generation, or the
+        video details if it was already generated.
     """
     try:
-        # Initialize the Gemini client
-        client = genai.Client()
-        
-        # Configure video generation parameters
-        config = types.GenerateVideosConfig(
-            aspect_ratio=aspect_ratio,
-            negative_prompt=negative_prompt if negative_prompt else None,
-        )
-        
         print(f"🎬 Starting video generation with prompt: '{prompt[:50]}...'")
-        
-        # Start video generation operation
-        operation = client.models.generate_videos(
-            model="veo-3.0-generate-001",
-            prompt=prompt,
-            config=config,
+        # Submitting reads the GCS cache and calls Veo, off the event loop
+        job = await asyncio.to_thread(
+            get_video_job_manager().submit, prompt, aspect_ratio, negative_prompt
         )
-        
-        print("⏳ Video generation in progress... This may take 2-3 minutes.")
-        
-        # Poll operation status until video is ready
-        while not operation.done:
-            print("⏳ Still generating video...")
-            time.sleep(20)  # Check every 20 seconds
-            operation = client.operations.get(operation)
-        
-        # Check if generation was successful
-        if operation.response and operation.response.generated_videos:
-            generated_video = operation.response.generated_videos[0]
-            
-            # Generate unique filename
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"veo_video_{timestamp}.mp4"
-            
-            # Download the video file
-            client.files.download(file=generated_video.video)
-            
-            # Save the video locally
-            generated_video.video.save(filename)
-            
-            # Upload to GCS bucket
-            gcs_url = None
-            try:
-                bucket_name = "qwiklabs-gcp-00-a489584c5286-adk-videos"
-                storage_client = storage.Client()
-                bucket = storage_client.bucket(bucket_name)
-                blob = bucket.blob(filename)
-                
-                blob.upload_from_filename(filename)
-                gcs_url = f"gs://{bucket_name}/{filename}"
-                public_url = f"https://storage.googleapis.com/{bucket_name}/{filename}"
-                print(f"☁️ Video uploaded to GCS: {gcs_url}")
-                print(f"🌐 Public URL: {public_url}")
-                
-            except Exception as e:
-                print(f"⚠️ Could not upload to GCS: {e}")
-            
-            # If tool_context is available, save as artifact
-            if tool_context:
-                try:
-                    # Read the video file as bytes
-                    with open(filename, 'rb') as f:
-                        video_bytes = f.read()
-                    
-                    # Create a Part object for the video
-                    video_part = types.Part(
-                        inline_data=types.Blob(
-                            mime_type="video/mp4",
-                            data=video_bytes
-                        )
-                    )
-                    
-                    # Save as artifact
-                    tool_context.save_artifact(filename, video_part)
-                    print(f"💾 Video saved as artifact: {filename}")
-                    print(f"📁 Video also kept locally as: {filename}")
-                    
-                except Exception as e:
-                    print(f"⚠️ Could not save as artifact: {e}")
-                    print(f"📁 Video saved locally as: {filename}")
-            else:
-                print(f"📁 Video saved locally as: {filename}")
-            
-            return {
-                "status": "success",
-                "message": f"Video generated successfully! Saved as {filename}" + (f" and uploaded to GCS: {gcs_url}" if gcs_url else ""),
-                "filename": filename,
-                "gcs_url": gcs_url,
-                "public_url": public_url if gcs_url else None,
+        if job.done:
+            return await _video_result(job, tool_context)
+
+        if tool_context:
+            jobs = dict(tool_context.state.get(VIDEO_JOBS_STATE_KEY) or {})
+            jobs[job.job_id] = {
+                "operation": job.operation.name,
                 "prompt": prompt,
                 "aspect_ratio": aspect_ratio,
-                "duration": "8 seconds",
-                "resolution": "720p"
+                "cache_key": job.cache_key,
             }
-        else:
-            return {
-                "status": "error", 
-                "message": "Video generation failed - no video was produced"
-            }
-            
+            tool_context.state[VIDEO_JOBS_STATE_KEY] = jobs
+
+        print(f"⏳ Video generation job {job.job_id} submitted.")
+        return {
+            "status": "submitted",
+            "message": f"Video generation started as job {job.job_id}. It usually takes 2-3 minutes.",
+            "job_id": job.job_id,
+            "prompt": prompt,
+            "aspect_ratio": aspect_ratio,
+        }
+
     except Exception as e:
-        error_message = f"Video generation failed: {str(e)}"
+        error_message = f"Video generation failed: {e!s}"
         print(f"❌ {error_message}")
+        return {"status": "error", "message": error_message}
+
+
+async def get_veo_video_status(job_id: str, tool_context: ToolContext = None) -> dict:
+    """Checks a video generation job and returns the video once it is ready.
+
+    Args:
+        job_id: Job id returned by generate_veo_video
+        tool_context: ADK tool context for saving artifacts
+
+    Returns:
+        Dictionary with the job status, and the video details once it succeeded.
+    """
+    manager = get_video_job_manager()
+    job = manager.get(job_id)
+    if job is None and tool_context:
+        # The job may have been submitted by another worker of this session
+        submitted = (tool_context.state.get(VIDEO_JOBS_STATE_KEY) or {}).get(job_id)
+        if submitted:
+            job = manager.attach(
+                job_id,
+                submitted["operation"],
+                submitted["prompt"],
+                submitted["aspect_ratio"],
+                submitted.get("cache_key"),
+            )
+    if job is None:
+        return {"status": "error", "message": f"Unknown video job: {job_id}"}
+
+    if not job.done:
         return {
-            "status": "error",
-            "message": error_message
+            "status": "running",
+            "message": f"Video is still being generated ({int(job.elapsed_seconds)}s elapsed).",
+            "job_id": job_id,
+            "elapsed_seconds": int(job.elapsed_seconds),
         }
+    return await _video_result(job, tool_context)
 
-# Create a video generation agent
-video_generation_agent = Agent(
-    name="video_generation_agent",
-    model="gemini-2.5-flash",
-    instruction="""You are a creative video generation specialist using Google's Veo 3 technology.
+
+async def generate_veo_video_batch(
+    prompts: list[str],
+    aspect_ratio: str = "16:9",
+    negative_prompt: str = "",
+    tool_context: ToolContext = None,
+) -> dict:
+    """Starts generating several videos using Veo 3, e.g. one per day of a plan.
+
+    The videos are generated concurrently in the background. Use
+    get_veo_batch_status with the returned batch_id to collect each video as
+    soon as it is ready.
+
+    Args:
+        prompts: Text descriptions of the videos to generate, one per video
+        aspect_ratio: Video aspect ratio - "16:9" or "9:16" (default: "16:9")
+        negative_prompt: Text describing what NOT to include in any video
+        tool_context: ADK tool context for tracking the batch in the session
+
+    Returns:
+        Dictionary with the batch id of the submitted video generations.
+    """
+    if not prompts:
+        return {"status": "error", "message": "No video prompts were given"}
+
+    print(f"🎬 Starting {len(prompts)} video generations")
+    batch = get_video_job_manager().submit_batch(
+        [(prompt, aspect_ratio, negative_prompt) for prompt in prompts]
+    )
+    if tool_context:
+        batches = dict(tool_context.state.get(VIDEO_BATCHES_STATE_KEY) or {})
+        batches[batch.batch_id] = {"reported": []}
+        tool_context.state[VIDEO_BATCHES_STATE_KEY] = batches
+
+    return {
+        "status": "submitted",
+        "message": f"{len(prompts)} videos are being generated as batch {batch.batch_id}. They usually take 2-3 minutes.",
+        "batch_id": batch.batch_id,
+        "total": len(prompts),
+    }
+
+
+async def get_veo_batch_status(
+    batch_id: str, wait_seconds: int = 0, tool_context: ToolContext = None
+) -> dict:
+    """Returns the videos of a batch that finished since the last check.
+
+    Args:
+        batch_id: Batch id returned by generate_veo_video_batch
+        wait_seconds: Seconds to wait for the next video to finish if none is
+            new yet (at most 60)
+        tool_context: ADK tool context for saving artifacts
+
+    Returns:
+        Dictionary with the newly finished videos and the batch progress.
+    """
+    manager = get_video_job_manager()
+    batch = manager.get_batch(batch_id)
+    if batch is None:
+        return {"status": "error", "message": f"Unknown video batch: {batch_id}"}
+
+    batches = (
+        dict(tool_context.state.get(VIDEO_BATCHES_STATE_KEY) or {})
+        if tool_context
+        else {}
+    )
+    reported = set(batches.get(batch_id, {}).get("reported", []))
+    finished = await asyncio.to_thread(
+        manager.wait_batch, batch, reported, min(max(wait_seconds, 0), 60)
+    )
+
+    results = []
+    for index in finished:
+        job = batch.jobs[index]
+        if job is None:
+            result = {"status": "error", "message": batch.errors[index]}
+        else:
+            result = await _video_result(job, tool_context)
+        results.append({"index": index, "prompt": batch.requests[index][0], **result})
+    reported.update(finished)
+    if tool_context:
+        batches[batch_id] = {"reported": sorted(reported)}
+        tool_context.state[VIDEO_BATCHES_STATE_KEY] = batches
+
+    completed = sum(1 for i in range(len(batch.requests)) if batch.is_finished(i))
+    return {
+        "status": "done" if batch.done else "running",
+        "message": f"{completed} of {len(batch.requests)} videos finished ({int(time.monotonic() - batch.submitted_at)}s elapsed).",
+        "batch_id": batch_id,
+        "new_results": results,
+        "completed": completed,
+        "total": len(batch.requests),
+    }
+
+
+VIDEO_GENERATION_AGENT_INSTRUCTION = """You are a creative video generation specialist using Google's Veo 3 technology.
 
 ROLE: Video content creator and prompt engineer
 CONTEXT: Generate high-quality 8-second videos from text descriptions using Veo 3
 
 WORKFLOW:
-1. When users request video generation, use the generate_veo_video tool
-2. Help users craft effective video prompts by suggesting:
+1. When users request video generation, use the generate_veo_video tool. It returns a job_id right away
+   while the video is generated in the background, or the finished video if the same request was
+   generated before
+2. When users ask about their video, use the get_veo_video_status tool with that job_id to report
+   progress or share the finished video
+3. When users want several videos at once, for example one clip per day of a workout plan, use the
+   generate_veo_video_batch tool with one prompt per clip. Then call get_veo_batch_status with the
+   batch_id (and wait_seconds up to 60) to share each clip as soon as it is ready, until the batch is done
+4. Help users craft effective video prompts by suggesting:
    - Clear subject and action descriptions
    - Camera angles and movements (close-up, wide shot, tracking shot, etc.)
    - Lighting conditions (golden hour, dramatic shadows, soft lighting)
@@ -187,7 +289,22 @@ EXAMPLE GOOD PROMPTS:
 - "Aerial drone view of a red sailboat on turquoise ocean waters at golden sunset, gentle waves, peaceful atmosphere"
 - "Time-lapse of a blooming flower in macro detail, dewdrops on petals, natural lighting, nature documentary style"
 
-Always explain the video generation process and estimated time (2-3 minutes) to users.""",
-    description="Specialized agent for generating videos using Veo 3, with expertise in prompt crafting and video creation.",
-    tools=[generate_veo_video],
-)
+Always explain the video generation process and estimated time (2-3 minutes) to users, and tell them
+they can ask for the video's status at any time."""
+
+
+# Create a video generation agent
+def create_video_generation_agent() -> Agent:
+    """Builds the Veo video generation agent."""
+    return Agent(
+        name="video_generation_agent",
+        model="gemini-2.5-flash",
+        instruction=VIDEO_GENERATION_AGENT_INSTRUCTION,
+        description="Specialized agent for generating videos using Veo 3, with expertise in prompt crafting and video creation.",
+        tools=[
+            generate_veo_video,
+            get_veo_video_status,
+            generate_veo_video_batch,
+            get_veo_batch_status,
+        ],
+    )
@@ -0,0 +1,241 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Weekly wellness bundle: a training week and a diet plan in one turn.
+
+The bundle is a workflow rather than a conversation:
+
+1. Once `WellnessBundleAgent` has found the user's email in the conversation,
+   `WellnessDataAgent` reads their profile and fitness overview once,
+   concurrently, into session state.
+2. A `ParallelAgent` runs the workout and diet planners at the same time,
+   both working from that state instead of fetching the data again.
+3. `WellnessMergeAgent` joins both plans into a single response.
+
+The turn takes about as long as the slower planner, not both in a row.
+"""
+
+import asyncio
+import datetime
+import json
+import logging
+import re
+from collections.abc import AsyncGenerator
+from typing import Any
+
+from google.adk.agents import Agent, BaseAgent, ParallelAgent, SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from app.utils.fitness_rollups import get_fitness_rollup_for_user
+from app.utils.fitness_summary import get_fitness_summary_for_user
+from app.utils.toolbox import get_toolbox_tools
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+# Session state keys shared by the bundle's steps
+EMAIL_KEY = "user_email"
+DATA_KEY = "wellness_data"
+WORKOUT_KEY = "wellness_workout_plan"
+DIET_KEY = "wellness_diet_plan"
+
+BUNDLE_WORKOUT_INSTRUCTION = """You are an expert personal trainer and sports scientist.
+
+The user's profile and fitness overview were already fetched:
+{wellness_data}
+
+1. Create a 7-day training schedule for {user_email} starting today, based on
+   that data: experience and activity level, heart rate, weight goals, sleep,
+   daily activity and any constraints from the user's message.
+2. Specify intensity using heart rate zones and sets/reps/rest periods, with a
+   warm-up and cool-down for each day.
+3. {store_step}
+4. Reply with the plan in short, mobile-friendly Markdown with emojis.
+
+Do not ask for more data and do not mention nutrition; a nutritionist covers
+the diet in parallel."""
+
+STORE_STEP = "Store the whole week with exactly one add_weekly_workout_plan call."
+NO_STORE_STEP = "Do not try to store the plan; no tool for it is available."
+
+BUNDLE_DIET_INSTRUCTION = """You are a certified nutritionist and dietitian.
+
+The user's profile and fitness overview were already fetched:
+{wellness_data}
+
+Create a personalized 7-day diet plan based on their weight goals, activity,
+dietary restrictions, BMI and age, with calorie counts, macros and meal timing.
+It will be paired with a training week written in parallel, so size the
+calories for an active week.
+
+Reply with the plan in short, mobile-friendly Markdown with emojis. Do not ask
+for more data and do not write a workout plan."""
+
+
+def _load_profile(email: str) -> dict[str, Any] | None:
+    # The nutrition package configures its own agents on import
+    from nutrition_agent.queries import get_user_profile
+
+    return get_user_profile(email)
+
+
+def _load_fitness(email: str) -> dict[str, Any]:
+    result = get_fitness_rollup_for_user(email)
+    if result["status"] != "success":
+        result = get_fitness_summary_for_user(email)
+    return result
+
+
+def _text(content: types.Content | None) -> str:
+    if not content or not content.parts:
+        return ""
+    return "".join(part.text or "" for part in content.parts)
+
+
+class WellnessBundleAgent(SequentialAgent):
+    """Runs the bundle's steps once the user's email is known."""
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        email = self._find_email(ctx)
+        if email is None:
+            # Nothing for the planners to work from yet
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                content=types.Content(
+                    role="model",
+                    parts=[
+                        types.Part(
+                            text="📧 Please share your email so I can build your "
+                            "weekly wellness bundle."
+                        )
+                    ],
+                ),
+            )
+            return
+        if ctx.session.state.get(EMAIL_KEY) != email:
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                actions=EventActions(state_delta={EMAIL_KEY: email}),
+            )
+        async for event in super()._run_async_impl(ctx):
+            yield event
+
+    @staticmethod
+    def _find_email(ctx: InvocationContext) -> str | None:
+        """Returns the latest email the user gave, or the one in state."""
+        texts = [_text(ctx.user_content)] + [
+            _text(event.content)
+            for event in reversed(ctx.session.events)
+            if event.author == "user"
+        ]
+        for text in texts:
+            if match := EMAIL_PATTERN.search(text):
+                return match.group(0).lower()
+        return ctx.session.state.get(EMAIL_KEY)
+
+
+class WellnessDataAgent(BaseAgent):
+    """Reads the user's profile and fitness overview once for the bundle."""
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        email = ctx.session.state[EMAIL_KEY]
+        # Both reads go to different backends, so they run side by side
+        profile, fitness = await asyncio.gather(
+            asyncio.to_thread(_load_profile, email),
+            asyncio.to_thread(_load_fitness, email),
+        )
+        print(f"📦 Loaded wellness bundle data for: {email}")
+        data = {
+            "profile": profile,
+            "fitness": fitness.get("rollup") or fitness.get("summary"),
+        }
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={DATA_KEY: json.dumps(data, default=str)}),
+        )
+
+
+class WellnessMergeAgent(BaseAgent):
+    """Joins the workout and diet plans into one response."""
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        sections = [
+            f"## 🏋️ Your training week\n\n{state.get(WORKOUT_KEY, '').strip()}",
+            f"## 🥗 Your diet plan\n\n{state.get(DIET_KEY, '').strip()}",
+        ]
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(
+                role="model", parts=[types.Part(text="\n\n".join(sections))]
+            ),
+        )
+
+
+def create_wellness_bundle_agent() -> WellnessBundleAgent:
+    """Builds the weekly wellness bundle workflow, dated with the current day."""
+    current_date = datetime.datetime.now().strftime("%Y-%m-%d")
+    try:
+        tools = get_toolbox_tools("add_weekly_workout_plan")
+        store_step = STORE_STEP
+    except ValueError as e:
+        # Toolbox deployments that predate tools.yaml's add_weekly_workout_plan
+        logging.warning(f"Wellness bundle cannot store workout plans: {e}")
+        tools = []
+        store_step = NO_STORE_STEP
+    workout_planner = Agent(
+        name="bundle_workout_planner",
+        model="gemini-2.5-flash",
+        instruction="current_date: "
+        + current_date
+        + "\n"
+        + BUNDLE_WORKOUT_INSTRUCTION.replace("{store_step}", store_step),
+        tools=tools,
+        # The data is in the instruction; only this turn's request matters
+        include_contents="none",
+        output_key=WORKOUT_KEY,
+    )
+    diet_planner = Agent(
+        name="bundle_diet_planner",
+        model="gemini-2.5-flash",
+        instruction=BUNDLE_DIET_INSTRUCTION,
+        include_contents="none",
+        output_key=DIET_KEY,
+    )
+    return WellnessBundleAgent(
+        name="wellness_bundle_agent",
+        description="Workflow that builds a weekly training plan and a diet plan together, from one read of the user's data, and returns both in one response.",
+        sub_agents=[
+            WellnessDataAgent(name="wellness_data"),
+            ParallelAgent(
+                name="wellness_planners", sub_agents=[workout_planner, diet_planner]
+            ),
+            WellnessMergeAgent(name="wellness_merge"),
+        ],
+    )
@@ -0,0 +1,128 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide, thread-safe registry of the Google Cloud clients used by tools.
+
+Each client is created once, on first use, and then shared by every tool in
+`app` and `nutrition_agent`, so that TLS connections and auth tokens are
+reused across tool calls. Tests can swap in local fakes with
+`register_client_factory` and `reset_clients`.
+"""
+
+import os
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from app.utils.environment import get_project_id, init_environment
+
+# Size of the keep-alive HTTP connection pool of the BigQuery and Storage
+# clients. The requests default of 10 is below the number of concurrent tool
+# calls a worker runs, which makes connections get discarded and re-opened.
+HTTP_POOL_SIZE = int(os.environ.get("CLIENT_HTTP_POOL_SIZE", "32"))
+
+
+def _mount_connection_pool(client: Any) -> Any:
+    """Mounts a larger keep-alive connection pool on a google-cloud client."""
+    from requests.adapters import HTTPAdapter
+
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    client._http.mount("https://", adapter)
+    return client
+
+
+def _create_genai_client() -> Any:
+    from google import genai
+
+    init_environment()
+    return genai.Client()
+
+
+def _create_bigquery_client() -> Any:
+    from google.cloud import bigquery
+
+    return _mount_connection_pool(bigquery.Client(project=get_project_id()))
+
+
+def _create_bigquery_storage_client() -> Any:
+    from google.cloud import bigquery_storage
+
+    return bigquery_storage.BigQueryReadClient()
+
+
+def _create_storage_client() -> Any:
+    from google.cloud import storage
+
+    return _mount_connection_pool(storage.Client(project=get_project_id()))
+
+
+_DEFAULT_FACTORIES: dict[str, Callable[[], Any]] = {
+    "genai": _create_genai_client,
+    "bigquery": _create_bigquery_client,
+    "bigquery_storage": _create_bigquery_storage_client,
+    "storage": _create_storage_client,
+}
+_factories = dict(_DEFAULT_FACTORIES)
+_clients: dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def get_client(kind: str) -> Any:
+    """Returns the shared client of the given kind, creating it on first use."""
+    client = _clients.get(kind)
+    if client is None:
+        with _lock:
+            client = _clients.get(kind)
+            if client is None:
+                client = _factories[kind]()
+                _clients[kind] = client
+    return client
+
+
+def get_genai_client() -> Any:
+    """Returns the shared `google.genai.Client`."""
+    return get_client("genai")
+
+
+def get_bigquery_client() -> Any:
+    """Returns the shared `google.cloud.bigquery.Client`."""
+    return get_client("bigquery")
+
+
+def get_bigquery_storage_client() -> Any:
+    """Returns the shared BigQuery Storage Read API client."""
+    return get_client("bigquery_storage")
+
+
+def get_storage_client() -> Any:
+    """Returns the shared `google.cloud.storage.Client`."""
+    return get_client("storage")
+
+
+def register_client_factory(kind: str, factory: Callable[[], Any]) -> None:
+    """Replaces how a client kind is built, e.g. with a local fake in tests.
+
+    Any client of that kind that was already created is dropped.
+    """
+    with _lock:
+        _factories[kind] = factory
+        _clients.pop(kind, None)
+
+
+def reset_clients() -> None:
+    """Drops all shared clients and restores the default factories."""
+    with _lock:
+        _clients.clear()
+        _factories.clear()
+        _factories.update(_DEFAULT_FACTORIES)
@@ -0,0 +1,40 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Project and Vertex AI environment shared by the agents and their tools."""
+
+import functools
+import os
+
+
+@functools.cache
+def get_project_id() -> str:
+    """Returns the Google Cloud project, resolving default credentials at most once.
+
+    `GOOGLE_CLOUD_PROJECT` takes precedence, so deployments that set it never
+    pay for a credentials lookup.
+    """
+    project_id = os.environ.get("GOOGLE_CLOUD_PROJECT")
+    if not project_id:
+        import google.auth
+
+        _, project_id = google.auth.default()
+    return project_id
+
+
+def init_environment() -> None:
+    """Sets the environment defaults expected by the genai and Vertex AI clients."""
+    os.environ.setdefault("GOOGLE_CLOUD_PROJECT", get_project_id())
+    os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "global")
+    os.environ.setdefault("GOOGLE_GENAI_USE_VERTEXAI", "True")
@@ -0,0 +1,317 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Windowed, projected and row-capped reads of a user's fitness data.
+
+A `FitnessQuery` names the user, an optional date window, the columns to read
+and a row cap. A fitness source runs it and yields Arrow record batches:
+
+- `BigQueryFitnessSource` runs a parameterized query and, once a result is
+  large enough, streams it through the BigQuery Storage Read API instead of
+  paging it through the REST API. Rows are never materialized as Python
+  `Row` objects.
+- `LocalFitnessSource` applies the same query to an in-memory Arrow table or
+  a Parquet file, for tests, benchmarks and offline development. Set
+  FITNESS_DATA_PARQUET to use it instead of BigQuery.
+"""
+
+import datetime
+import decimal
+import os
+import re
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from app.utils.clients import get_bigquery_client, get_bigquery_storage_client
+from app.utils.environment import get_project_id
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+FITNESS_DATASET = os.environ.get("FITNESS_DATASET", "health_metrics")
+FITNESS_TABLE = "fitness_data"
+FITNESS_DATE_COLUMN = os.environ.get("FITNESS_DATE_COLUMN", "date")
+FITNESS_DATA_PARQUET = os.environ.get("FITNESS_DATA_PARQUET")
+# Row cap of a query that does not set one
+DEFAULT_MAX_ROWS = int(os.environ.get("FITNESS_MAX_ROWS", "10000"))
+# Results with at least this many rows are read with the Storage Read API
+STORAGE_API_MIN_ROWS = int(os.environ.get("FITNESS_STORAGE_API_MIN_ROWS", "5000"))
+# Rows per record batch of the local source
+LOCAL_BATCH_ROWS = 8192
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+@dataclass(frozen=True)
+class FitnessQuery:
+    """A read of one user's fitness data.
+
+    Attributes:
+        email: The user whose rows are read.
+        start_date: First day of the window, inclusive. None for no lower bound.
+        end_date: Last day of the window, inclusive. None for no upper bound.
+        columns: Columns to read, or None for all of them. The date column is
+            always included.
+        max_rows: Maximum number of rows returned, most recent first.
+    """
+
+    email: str
+    start_date: datetime.date | None = None
+    end_date: datetime.date | None = None
+    columns: tuple[str, ...] | None = None
+    max_rows: int = DEFAULT_MAX_ROWS
+
+    def __post_init__(self) -> None:
+        if self.columns is not None:
+            invalid = [c for c in self.columns if not _IDENTIFIER.match(c)]
+            if invalid:
+                raise ValueError(f"Invalid column names: {invalid}")
+            if FITNESS_DATE_COLUMN not in self.columns:
+                object.__setattr__(
+                    self, "columns", (FITNESS_DATE_COLUMN, *self.columns)
+                )
+        if self.max_rows < 1:
+            raise ValueError("max_rows must be at least 1")
+
+    def sql(self, table: str) -> str:
+        """Returns the BigQuery statement of the query against a table."""
+        projection = ", ".join(f"`{c}`" for c in self.columns) if self.columns else "*"
+        conditions = ["email = @email"]
+        if self.start_date is not None:
+            conditions.append(f"`{FITNESS_DATE_COLUMN}` >= @start_date")
+        if self.end_date is not None:
+            conditions.append(f"`{FITNESS_DATE_COLUMN}` <= @end_date")
+        # The cap keeps the most recent rows; one extra row detects truncation
+        return (
+            f"SELECT {projection} FROM `{table}` WHERE {' AND '.join(conditions)} "
+            f"ORDER BY `{FITNESS_DATE_COLUMN}` DESC LIMIT {self.max_rows + 1}"
+        )
+
+    def parameters(self) -> list[Any]:
+        """Returns the BigQuery query parameters of `sql`."""
+        from google.cloud import bigquery
+
+        parameters = [bigquery.ScalarQueryParameter("email", "STRING", self.email)]
+        if self.start_date is not None:
+            parameters.append(
+                bigquery.ScalarQueryParameter("start_date", "DATE", self.start_date)
+            )
+        if self.end_date is not None:
+            parameters.append(
+                bigquery.ScalarQueryParameter("end_date", "DATE", self.end_date)
+            )
+        return parameters
+
+
+@dataclass
+class FitnessResult:
+    """Rows read by a `FitnessQuery`, oldest first.
+
+    Attributes:
+        table: The rows, as an Arrow table.
+        truncated: Whether the row cap dropped older rows.
+        storage_api: Whether the rows were streamed with the Storage Read API.
+    """
+
+    table: "pa.Table"
+    truncated: bool
+    storage_api: bool = False
+
+
+class BigQueryFitnessSource:
+    """Reads fitness data from BigQuery as Arrow record batches."""
+
+    def __init__(
+        self,
+        client: Any = None,
+        storage_client: Any = None,
+        table: str | None = None,
+        storage_api_min_rows: int = STORAGE_API_MIN_ROWS,
+    ) -> None:
+        """
+        Args:
+            client: BigQuery client. Defaults to the shared client.
+            storage_client: BigQuery Storage Read API client. Defaults to the
+                shared client.
+            table: Fully qualified fitness table. Defaults to the fitness
+                table of the current project.
+            storage_api_min_rows: Smallest result read with the Storage Read
+                API; smaller results are paged through the REST API.
+        """
+        self._client = client
+        self._storage_client = storage_client
+        self._table = table
+        self.storage_api_min_rows = storage_api_min_rows
+
+    @property
+    def table(self) -> str:
+        return self._table or f"{get_project_id()}.{FITNESS_DATASET}.{FITNESS_TABLE}"
+
+    def read_batches(self, query: FitnessQuery) -> tuple[Iterator[Any], bool]:
+        """Runs a query.
+
+        Returns:
+            The record batches of the result, and whether they are streamed
+            with the Storage Read API.
+        """
+        from google.cloud import bigquery
+
+        client = self._client or get_bigquery_client()
+        job_config = bigquery.QueryJobConfig(query_parameters=query.parameters())
+        rows = client.query(query.sql(self.table), job_config=job_config).result()
+        if (rows.total_rows or 0) >= self.storage_api_min_rows:
+            storage_client = self._storage_client or get_bigquery_storage_client()
+            return rows.to_arrow_iterable(bqstorage_client=storage_client), True
+        return rows.to_arrow_iterable(), False
+
+
+class LocalFitnessSource:
+    """Runs fitness queries against an in-memory Arrow table."""
+
+    def __init__(self, table: "pa.Table", batch_rows: int = LOCAL_BATCH_ROWS) -> None:
+        """
+        Args:
+            table: Fitness rows, with the columns of the BigQuery table.
+            batch_rows: Maximum rows per yielded record batch.
+        """
+        self.table = table
+        self.batch_rows = batch_rows
+
+    @classmethod
+    def from_parquet(cls, path: str) -> "LocalFitnessSource":
+        import pyarrow.parquet as pq
+
+        return cls(pq.read_table(path))
+
+    def read_batches(self, query: FitnessQuery) -> tuple[Iterator[Any], bool]:
+        """Runs a query. See `BigQueryFitnessSource.read_batches`."""
+        import pyarrow.compute as pc
+
+        date = self.table[FITNESS_DATE_COLUMN]
+        mask = pc.equal(self.table["email"], query.email)
+        if query.start_date is not None:
+            mask = pc.and_(mask, pc.greater_equal(date, query.start_date))
+        if query.end_date is not None:
+            mask = pc.and_(mask, pc.less_equal(date, query.end_date))
+        rows = self.table.filter(mask)
+        if query.columns is not None:
+            rows = rows.select(list(query.columns))
+        rows = rows.sort_by([(FITNESS_DATE_COLUMN, "descending")])
+        rows = rows.slice(0, query.max_rows + 1)
+        return iter(rows.to_batches(max_chunksize=self.batch_rows)), False
+
+
+def read_fitness_data(query: FitnessQuery, source: Any = None) -> FitnessResult:
+    """Reads the rows of a fitness query, oldest first.
+
+    Args:
+        query: The read to run.
+        source: Fitness source to read from. Defaults to the shared source.
+
+    Returns:
+        The rows and how they were read.
+    """
+    import pyarrow as pa
+
+    batches, storage_api = (source or get_fitness_source()).read_batches(query)
+    batches = list(batches)
+    if batches:
+        table = pa.Table.from_batches(batches)
+    else:
+        table = pa.table({FITNESS_DATE_COLUMN: pa.array([], pa.date32())})
+    truncated = table.num_rows > query.max_rows
+    # Batches arrive most recent first, so that the cap keeps the latest rows
+    table = table.slice(0, query.max_rows).sort_by(FITNESS_DATE_COLUMN)
+    return FitnessResult(table=table, truncated=truncated, storage_api=storage_api)
+
+
+_source: Any = None
+_source_lock = threading.Lock()
+
+
+def get_fitness_source() -> Any:
+    """Returns the process-wide fitness source.
+
+    This is a `LocalFitnessSource` over FITNESS_DATA_PARQUET when it is set,
+    and a `BigQueryFitnessSource` otherwise.
+    """
+    global _source
+    if _source is None:
+        with _source_lock:
+            if _source is None:
+                if FITNESS_DATA_PARQUET:
+                    _source = LocalFitnessSource.from_parquet(FITNESS_DATA_PARQUET)
+                else:
+                    _source = BigQueryFitnessSource()
+    return _source
+
+
+def _parse_date(value: str) -> datetime.date | None:
+    return datetime.date.fromisoformat(value) if value else None
+
+
+def get_fitness_data_window(
+    email: str,
+    start_date: str = "",
+    end_date: str = "",
+    columns: list[str] | None = None,
+    max_rows: int = 366,
+) -> dict:
+    """Reads a user's fitness data for a date window.
+
+    Prefer get_fitness_rollup_for_user or get_fitness_summary_for_user for an
+    overview; use this tool when individual daily records are needed.
+
+    Args:
+        email: The email of the user to read the fitness data of.
+        start_date: First day to read (YYYY-MM-DD). Empty for no lower bound.
+        end_date: Last day to read (YYYY-MM-DD). Empty for no upper bound.
+        columns: Columns to read, e.g. ["weight_kg", "steps"]. Empty for all.
+        max_rows: Maximum number of rows, keeping the most recent ones.
+
+    Returns:
+        Dictionary with the status, the rows oldest first and whether older
+        rows were left out.
+    """
+    try:
+        query = FitnessQuery(
+            email=email,
+            start_date=_parse_date(start_date),
+            end_date=_parse_date(end_date),
+            columns=tuple(columns) if columns else None,
+            max_rows=max(1, min(max_rows, DEFAULT_MAX_ROWS)),
+        )
+        result = read_fitness_data(query)
+        rows = result.table.to_pylist()
+        for row in rows:
+            for column, value in row.items():
+                if isinstance(value, datetime.date):
+                    row[column] = value.isoformat()
+                elif isinstance(value, decimal.Decimal):
+                    row[column] = float(value)
+        print(f"📅 Read {len(rows)} fitness records for: {email}")
+        return {
+            "status": "success",
+            "email": email,
+            "rows": rows,
+            "row_count": len(rows),
+            "truncated": result.truncated,
+        }
+
+    except Exception as e:
+        error_message = f"Failed to read fitness data: {e!s}"
+        print(f"❌ {error_message}")
+        return {"status": "error", "message": error_message}
@@ -0,0 +1,676 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Incrementally maintained per-user rollups of the fitness data.
+
+`run_rollup_job` is a batch job, meant to run on a schedule (e.g. Cloud
+Scheduler or cron running `python -m app.utils.fitness_rollups`). It keeps
+three tables next to `fitness_data`:
+
+- `fitness_daily_rollups`: one row per user and day, with the day's metrics
+  aggregated like `app.utils.fitness_summary` does (totals for steps and
+  calories, the low for resting heart rate, the mean for the rest).
+- `fitness_weekly_rollups`: one row per user and week (starting Monday) with
+  the means of the daily rollups and the weekly totals.
+- `fitness_user_rollups`: one row per user with the latest values, 7- and
+  30-day means, all-time totals and the weight trend.
+
+Each run only reads the `fitness_data` rows dated after the watermark of the
+previous run, minus ROLLUP_LOOKBACK_DAYS to pick up late arriving rows, plus
+the recent rollups of the users those rows belong to. Its cost therefore
+grows with the new data and the number of active users, never with the
+length of a user's history. `get_fitness_rollup_for_user` then reads a
+single precomputed row.
+
+The user rollups add the changed days' totals to the previous ones, so a run
+writes all four tables in one transaction: a run that fails halfway leaves
+no replaced days behind for the rerun to miss.
+
+The tables live in BigQuery (`BigQueryRollupStore`) or, offline, in the
+SQLite database of the local toolbox (`SQLiteRollupStore`, selected with
+FITNESS_ROLLUP_SQLITE_PATH).
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import sqlite3
+import statistics
+import threading
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from app.utils.clients import get_bigquery_client
+from app.utils.environment import get_project_id
+from app.utils.fitness_data import FITNESS_DATASET, FITNESS_DATE_COLUMN, FITNESS_TABLE
+from app.utils.fitness_summary import (
+    DAILY_LOW_METRICS,
+    DAILY_TOTAL_METRICS,
+    METRIC_COLUMNS,
+    WEIGHT_TRAJECTORY_WEEKS,
+)
+from app.utils.user_cache import get_user_cache
+
+ROLLUP_JOB = "fitness_rollups"
+# Days before the watermark that are reprocessed, for late arriving rows
+ROLLUP_LOOKBACK_DAYS = int(os.environ.get("ROLLUP_LOOKBACK_DAYS", "3"))
+FITNESS_ROLLUP_SQLITE_PATH = os.environ.get("FITNESS_ROLLUP_SQLITE_PATH")
+# Rows per MERGE statement, keeping the JSON parameter well below query limits
+UPSERT_BATCH_ROWS = 2000
+
+DAILY_ROLLUPS = "fitness_daily_rollups"
+WEEKLY_ROLLUPS = "fitness_weekly_rollups"
+USER_ROLLUPS = "fitness_user_rollups"
+ROLLUP_WATERMARKS = "fitness_rollup_watermarks"
+
+_METRIC_TYPES = dict.fromkeys(METRIC_COLUMNS, "FLOAT64")
+# Table -> (key columns, BigQuery column types)
+ROLLUP_TABLES: dict[str, tuple[tuple[str, ...], dict[str, str]]] = {
+    DAILY_ROLLUPS: (
+        ("email", "date"),
+        {"email": "STRING", "date": "DATE", "measurements": "INT64", **_METRIC_TYPES},
+    ),
+    WEEKLY_ROLLUPS: (
+        ("email", "week_start"),
+        {
+            "email": "STRING",
+            "week_start": "DATE",
+            "days": "INT64",
+            **_METRIC_TYPES,
+            **{f"{m}_total": "FLOAT64" for m in sorted(DAILY_TOTAL_METRICS)},
+        },
+    ),
+    USER_ROLLUPS: (
+        ("email",),
+        {
+            "email": "STRING",
+            "first_date": "DATE",
+            "last_date": "DATE",
+            "days_recorded": "INT64",
+            "first_weight_kg": "FLOAT64",
+            "weight_change_kg": "FLOAT64",
+            "weight_trend_kg_per_week": "FLOAT64",
+            # JSON list of the latest weekly mean weights, oldest first
+            "weekly_weight_kg": "STRING",
+            **{f"{m}_total": "FLOAT64" for m in sorted(DAILY_TOTAL_METRICS)},
+            **{
+                f"{metric}_{stat}": "FLOAT64"
+                for metric in METRIC_COLUMNS
+                for stat in ("latest", "mean_7d", "mean_30d")
+            },
+        },
+    ),
+    ROLLUP_WATERMARKS: (("job",), {"job": "STRING", "watermark": "DATE"}),
+}
+_SQLITE_TYPES = {
+    "STRING": "TEXT",
+    "DATE": "TEXT",
+    "INT64": "INTEGER",
+    "FLOAT64": "REAL",
+}
+
+
+class BigQueryRollupStore:
+    """Keeps the rollup tables in the BigQuery dataset of `fitness_data`."""
+
+    def __init__(self, client: Any = None, prefix: str | None = None) -> None:
+        """
+        Args:
+            client: BigQuery client. Defaults to the shared client.
+            prefix: `project.dataset` of the tables. Defaults to the fitness
+                dataset of the current project.
+        """
+        self._client = client
+        self._prefix = prefix
+        # Session of the calling thread's open transaction, if any
+        self._local = threading.local()
+
+    @property
+    def prefix(self) -> str:
+        return self._prefix or f"{get_project_id()}.{FITNESS_DATASET}"
+
+    def ensure_tables(self) -> None:
+        for table, (_, columns) in ROLLUP_TABLES.items():
+            definition = ", ".join(f"{c} {t}" for c, t in columns.items())
+            clustering = " CLUSTER BY email" if "email" in columns else ""
+            self.query(
+                f"CREATE TABLE IF NOT EXISTS `{self.prefix}.{table}` "
+                f"({definition}){clustering}",
+                {},
+            )
+
+    def query(self, statement: str, parameters: dict[str, Any]) -> list[dict[str, Any]]:
+        from google.cloud import bigquery
+
+        types = {
+            bool: "BOOL",
+            int: "INT64",
+            float: "FLOAT64",
+            str: "STRING",
+            datetime.date: "DATE",
+        }
+        query_parameters = []
+        for name, value in parameters.items():
+            if isinstance(value, list):
+                element_type = types[type(value[0])] if value else "STRING"
+                query_parameters.append(
+                    bigquery.ArrayQueryParameter(name, element_type, value)
+                )
+            else:
+                query_parameters.append(
+                    bigquery.ScalarQueryParameter(name, types[type(value)], value)
+                )
+        job_config = bigquery.QueryJobConfig(query_parameters=query_parameters)
+        session_id = getattr(self._local, "session_id", None)
+        if session_id:
+            job_config.connection_properties = [
+                bigquery.ConnectionProperty("session_id", session_id)
+            ]
+        client = self._client or get_bigquery_client()
+        rows = client.query(statement, job_config=job_config).result()
+        return [dict(row.items()) for row in rows]
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Runs this thread's queries in the block as one multi-statement transaction.
+
+        The transaction lives in a BigQuery session; aborting the session rolls
+        it back if the block raised before the commit.
+        """
+        from google.cloud import bigquery
+
+        client = self._client or get_bigquery_client()
+        job = client.query(
+            "BEGIN TRANSACTION", job_config=bigquery.QueryJobConfig(create_session=True)
+        )
+        job.result()
+        self._local.session_id = job.session_info.session_id
+        try:
+            yield
+            self.query("COMMIT TRANSACTION", {})
+        finally:
+            with contextlib.suppress(Exception):
+                self.query("CALL BQ.ABORT_SESSION()", {})
+            self._local.session_id = None
+
+    def upsert(self, table: str, rows: list[dict[str, Any]]) -> None:
+        """Inserts or replaces rows by the table's key, with one MERGE per batch."""
+        keys, columns = ROLLUP_TABLES[table]
+        source = ", ".join(
+            f"SAFE_CAST(JSON_VALUE(r, '$.{c}') AS {t}) AS {c}"
+            for c, t in columns.items()
+        )
+        updates = ", ".join(f"{c} = S.{c}" for c in columns)
+        statement = (
+            f"MERGE `{self.prefix}.{table}` T "
+            f"USING (SELECT {source} FROM UNNEST(JSON_QUERY_ARRAY(@rows)) AS r) S "
+            f"ON {' AND '.join(f'T.{k} = S.{k}' for k in keys)} "
+            f"WHEN MATCHED THEN UPDATE SET {updates} "
+            "WHEN NOT MATCHED THEN INSERT ROW"
+        )
+        for start in range(0, len(rows), UPSERT_BATCH_ROWS):
+            batch = rows[start : start + UPSERT_BATCH_ROWS]
+            self.query(statement, {"rows": json.dumps(batch, default=str)})
+
+
+class SQLiteRollupStore:
+    """Keeps the rollup tables in a SQLite database, e.g. the local toolbox's.
+
+    The tables are named like the BigQuery ones, next to `fitness_data`.
+    """
+
+    def __init__(
+        self, database: "str | sqlite3.Connection", prefix: str | None = None
+    ) -> None:
+        """
+        Args:
+            database: SQLite database file, or an open connection.
+            prefix: `project.dataset` of the tables. Defaults to the one of
+                `fitness_data` in the bundled `tools.yaml`, as created by
+                `LocalToolbox`.
+        """
+        if isinstance(database, sqlite3.Connection):
+            self.connection = database
+        else:
+            self.connection = sqlite3.connect(database, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        if prefix is None:
+            import yaml
+
+            from app.utils.local_toolbox import table_names
+            from app.utils.toolbox import TOOLS_FILE
+
+            with open(TOOLS_FILE) as f:
+                prefix = table_names(yaml.safe_load(f))[FITNESS_TABLE].rsplit(".", 1)[0]
+        self.prefix = prefix
+        # Reentrant so that a transaction can hold it across its upserts
+        self._lock = threading.RLock()
+        self._in_transaction = False
+
+    def ensure_tables(self) -> None:
+        with self._lock, self.connection:
+            for table, (keys, columns) in ROLLUP_TABLES.items():
+                definition = ", ".join(
+                    f"{c} {_SQLITE_TYPES[t]}" for c, t in columns.items()
+                )
+                self.connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS `{self.prefix}.{table}` "
+                    f"({definition}, PRIMARY KEY ({', '.join(keys)}))"
+                )
+
+    def query(self, statement: str, parameters: dict[str, Any]) -> list[dict[str, Any]]:
+        from app.utils.local_toolbox import to_sqlite
+
+        values = {}
+        for name, value in parameters.items():
+            if isinstance(value, datetime.date):
+                value = value.isoformat()
+            elif isinstance(value, list):
+                # Arrays are passed as JSON, like the local toolbox does
+                value = json.dumps(value, default=str)
+            values[name] = value
+        with self._lock:
+            cursor = self.connection.execute(to_sqlite(statement), values)
+            return [dict(row) for row in cursor.fetchall()]
+
+    def upsert(self, table: str, rows: list[dict[str, Any]]) -> None:
+        """Inserts or replaces rows by the table's key."""
+        _, columns = ROLLUP_TABLES[table]
+        values = [
+            tuple(
+                value.isoformat() if isinstance(value, datetime.date) else value
+                for value in (row.get(c) for c in columns)
+            )
+            for row in rows
+        ]
+        with self._lock:
+            # Inside a transaction, the commit is left to its end
+            with contextlib.nullcontext() if self._in_transaction else self.connection:
+                self.connection.executemany(
+                    f"INSERT OR REPLACE INTO `{self.prefix}.{table}` "
+                    f"({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                    values,
+                )
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Commits the upserts made in the block together, or rolls them all back."""
+        with self._lock, self.connection:
+            self._in_transaction = True
+            try:
+                yield
+            finally:
+                self._in_transaction = False
+
+
+def _to_date(value: Any) -> datetime.date:
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+def _week_start(date: datetime.date) -> datetime.date:
+    return date - datetime.timedelta(days=date.weekday())
+
+
+def _mean(values: Iterable[Any]) -> float | None:
+    present = [float(v) for v in values if v is not None]
+    return round(statistics.fmean(present), 2) if present else None
+
+
+def _slope(points: list[tuple[float, float]]) -> float | None:
+    """Least-squares slope of (x, y) points."""
+    if len(points) < 2:
+        return None
+    mean_x = statistics.fmean(x for x, _ in points)
+    mean_y = statistics.fmean(y for _, y in points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if spread == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+
+def _daily_rollups(raw: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Aggregates raw fitness rows into one row per user and day."""
+    lowered = {column.lower(): column for column in raw[0]}
+    columns = {
+        metric: next((lowered[c] for c in candidates if c in lowered), None)
+        for metric, candidates in METRIC_COLUMNS.items()
+    }
+
+    days: dict[tuple[str, datetime.date], list[dict[str, Any]]] = defaultdict(list)
+    for row in raw:
+        days[(row["email"], _to_date(row[FITNESS_DATE_COLUMN]))].append(row)
+    rollups = []
+    for (email, date), rows in days.items():
+        rollup: dict[str, Any] = {
+            "email": email,
+            "date": date,
+            "measurements": len(rows),
+        }
+        for metric, column in columns.items():
+            values = [
+                float(row[column]) for row in rows if column and row[column] is not None
+            ]
+            if not values:
+                rollup[metric] = None
+            elif metric in DAILY_TOTAL_METRICS:
+                rollup[metric] = sum(values)
+            elif metric in DAILY_LOW_METRICS:
+                rollup[metric] = min(values)
+            else:
+                rollup[metric] = round(statistics.fmean(values), 2)
+        rollups.append(rollup)
+    return rollups
+
+
+def _weekly_rollups(daily: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Aggregates complete weeks of daily rollups into one row per user and week."""
+    weeks: dict[tuple[str, datetime.date], list[dict[str, Any]]] = defaultdict(list)
+    for day in daily:
+        weeks[(day["email"], _week_start(day["date"]))].append(day)
+    rollups = []
+    for (email, week_start), days in weeks.items():
+        rollup: dict[str, Any] = {
+            "email": email,
+            "week_start": week_start,
+            "days": len(days),
+        }
+        for metric in METRIC_COLUMNS:
+            rollup[metric] = _mean(day[metric] for day in days)
+        for metric in DAILY_TOTAL_METRICS:
+            rollup[f"{metric}_total"] = sum(day[metric] or 0 for day in days)
+        rollups.append(rollup)
+    return rollups
+
+
+def _user_rollup(
+    email: str,
+    recent: list[dict[str, Any]],
+    weeks: list[dict[str, Any]],
+    previous: dict[str, Any] | None,
+    added_days: int,
+    total_deltas: dict[str, float],
+) -> dict[str, Any]:
+    """Builds a user's row from their recent days and weeks and their last row."""
+    last_date = recent[-1]["date"]
+    first_date = recent[0]["date"]
+    if previous is not None:
+        first_date = min(first_date, _to_date(previous["first_date"]))
+    weights = [day["weight_kg"] for day in recent if day["weight_kg"] is not None]
+    if previous is not None and previous["first_weight_kg"] is not None:
+        first_weight = previous["first_weight_kg"]
+    else:
+        first_weight = weights[0] if weights else None
+
+    weekly_weight = [
+        week["weight_kg"] for week in weeks if week["weight_kg"] is not None
+    ][-WEIGHT_TRAJECTORY_WEEKS:]
+    trend = _slope(list(enumerate(weekly_weight)))
+    rollup: dict[str, Any] = {
+        "email": email,
+        "first_date": first_date,
+        "last_date": last_date,
+        "days_recorded": (previous["days_recorded"] if previous else 0) + added_days,
+        "first_weight_kg": first_weight,
+        "weight_change_kg": (
+            round(weights[-1] - first_weight, 2)
+            if weights and first_weight is not None
+            else None
+        ),
+        "weight_trend_kg_per_week": round(trend, 2) if trend is not None else None,
+        "weekly_weight_kg": json.dumps(weekly_weight),
+    }
+    for metric in DAILY_TOTAL_METRICS:
+        total = previous[f"{metric}_total"] if previous else 0
+        rollup[f"{metric}_total"] = (total or 0) + total_deltas.get(metric, 0)
+    for metric in METRIC_COLUMNS:
+        values = [(d["date"], d[metric]) for d in recent if d[metric] is not None]
+        rollup[f"{metric}_latest"] = values[-1][1] if values else None
+        for days in (7, 30):
+            since = last_date - datetime.timedelta(days=days)
+            rollup[f"{metric}_mean_{days}d"] = _mean(v for d, v in values if d > since)
+    return rollup
+
+
+def run_rollup_job(
+    store: Any = None, lookback_days: int = ROLLUP_LOOKBACK_DAYS
+) -> dict[str, Any]:
+    """Brings the rollup tables up to date with the rows added since the last run.
+
+    Args:
+        store: Rollup store to update. Defaults to the shared store.
+        lookback_days: Days before the watermark that are reprocessed.
+
+    Returns:
+        Dictionary with the number of raw rows read, of daily, weekly and
+        user rows written, and the new watermark.
+    """
+    store = store or get_rollup_store()
+    store.ensure_tables()
+    prefix = store.prefix
+    watermarks = store.query(
+        f"SELECT watermark FROM `{prefix}.{ROLLUP_WATERMARKS}` WHERE job = @job",
+        {"job": ROLLUP_JOB},
+    )
+    watermark = _to_date(watermarks[0]["watermark"]) if watermarks else None
+
+    if watermark is None:
+        raw = store.query(f"SELECT * FROM `{prefix}.{FITNESS_TABLE}`", {})
+    else:
+        raw = store.query(
+            f"SELECT * FROM `{prefix}.{FITNESS_TABLE}` "
+            f"WHERE `{FITNESS_DATE_COLUMN}` >= @since",
+            {"since": watermark - datetime.timedelta(days=lookback_days)},
+        )
+    if not raw:
+        return {"status": "success", "raw_rows": 0, "users": 0, "watermark": watermark}
+
+    daily = _daily_rollups(raw)
+    start = min(day["date"] for day in daily)
+    users = sorted({day["email"] for day in daily})
+    # Days already rolled up are replaced, so their old totals are subtracted
+    replaced = {
+        (row["email"], _to_date(row["date"])): row
+        for row in store.query(
+            f"SELECT * FROM `{prefix}.{DAILY_ROLLUPS}` "
+            "WHERE date >= @start AND email IN UNNEST(@emails)",
+            {"start": start, "emails": users},
+        )
+    }
+    # Reads inside the transaction see its own upserts
+    with store.transaction():
+        store.upsert(DAILY_ROLLUPS, daily)
+
+        # The weeks touched by the new days, and the 30-day windows of the users
+        context_start = min(_week_start(start), start - datetime.timedelta(days=30))
+        recent: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for row in store.query(
+            f"SELECT * FROM `{prefix}.{DAILY_ROLLUPS}` "
+            "WHERE date >= @start AND email IN UNNEST(@emails)",
+            {"start": context_start, "emails": users},
+        ):
+            recent[row["email"]].append({**row, "date": _to_date(row["date"])})
+        for days in recent.values():
+            days.sort(key=lambda day: day["date"])
+        weekly = _weekly_rollups(
+            [
+                day
+                for days in recent.values()
+                for day in days
+                if day["date"] >= _week_start(start)
+            ]
+        )
+        store.upsert(WEEKLY_ROLLUPS, weekly)
+
+        weeks: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for row in store.query(
+            f"SELECT * FROM `{prefix}.{WEEKLY_ROLLUPS}` "
+            "WHERE week_start >= @start AND email IN UNNEST(@emails) "
+            "ORDER BY week_start",
+            {
+                "start": _week_start(start)
+                - datetime.timedelta(weeks=WEIGHT_TRAJECTORY_WEEKS - 1),
+                "emails": users,
+            },
+        ):
+            weeks[row["email"]].append(row)
+        previous = {
+            row["email"]: row
+            for row in store.query(
+                f"SELECT * FROM `{prefix}.{USER_ROLLUPS}` WHERE email IN UNNEST(@emails)",
+                {"emails": users},
+            )
+        }
+
+        added_days: dict[str, int] = defaultdict(int)
+        total_deltas: dict[str, dict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        for day in daily:
+            old = replaced.get((day["email"], day["date"]))
+            if old is None:
+                added_days[day["email"]] += 1
+            for metric in DAILY_TOTAL_METRICS:
+                delta = (day[metric] or 0) - ((old[metric] or 0) if old else 0)
+                total_deltas[day["email"]][metric] += delta
+        user_rollups = [
+            _user_rollup(
+                email,
+                recent[email],
+                weeks[email],
+                previous.get(email),
+                added_days[email],
+                total_deltas[email],
+            )
+            for email in users
+        ]
+        store.upsert(USER_ROLLUPS, user_rollups)
+
+        latest = max(day["date"] for day in daily)
+        new_watermark = max(latest, watermark) if watermark else latest
+        store.upsert(
+            ROLLUP_WATERMARKS, [{"job": ROLLUP_JOB, "watermark": new_watermark}]
+        )
+    # Other workers pick up the new rows once their cached reads expire
+    for email in users:
+        get_user_cache().invalidate(email)
+    return {
+        "status": "success",
+        "raw_rows": len(raw),
+        "daily_rows": len(daily),
+        "weekly_rows": len(weekly),
+        "users": len(users),
+        "watermark": new_watermark,
+    }
+
+
+_store: Any = None
+_store_lock = threading.Lock()
+
+
+def get_rollup_store() -> Any:
+    """Returns the process-wide rollup store.
+
+    This is a `SQLiteRollupStore` over FITNESS_ROLLUP_SQLITE_PATH when it is
+    set, and a `BigQueryRollupStore` otherwise.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if FITNESS_ROLLUP_SQLITE_PATH:
+                    _store = SQLiteRollupStore(FITNESS_ROLLUP_SQLITE_PATH)
+                else:
+                    _store = BigQueryRollupStore()
+    return _store
+
+
+def read_user_rollup(email: str) -> dict[str, Any] | None:
+    """Returns a user's precomputed rollup row, or None if there is none yet."""
+
+    def load() -> dict[str, Any] | None:
+        store = get_rollup_store()
+        rows = store.query(
+            f"SELECT * FROM `{store.prefix}.{USER_ROLLUPS}` WHERE email = @email",
+            {"email": email},
+        )
+        if not rows:
+            return None
+        rollup = {
+            column: value.isoformat() if isinstance(value, datetime.date) else value
+            for column, value in rows[0].items()
+        }
+        rollup["weekly_weight_kg"] = json.loads(rollup["weekly_weight_kg"] or "[]")
+        return rollup
+
+    return get_user_cache().get_or_load(email, "fitness_rollup", load)
+
+
+def get_fitness_rollup_for_user(email: str) -> dict:
+    """Reads a user's precomputed fitness rollup.
+
+    This is the cheapest overview of a user's fitness data: latest values,
+    7- and 30-day means, all-time totals and the weekly weight trend, kept up
+    to date by a batch job. If the user has no rollup yet, use
+    get_fitness_summary_for_user instead.
+
+    Args:
+        email: The email of the user to read the fitness rollup of.
+
+    Returns:
+        Dictionary with the status and the user's rollup.
+    """
+    try:
+        rollup = read_user_rollup(email)
+        if rollup is None:
+            return {
+                "status": "error",
+                "message": f"No fitness rollup yet for {email}; "
+                "use get_fitness_summary_for_user instead",
+            }
+
+        as_of = rollup["last_date"]
+        print(f"📈 Read the fitness rollup for: {email} (as of {as_of})")
+        return {"status": "success", "email": email, "rollup": rollup}
+
+    except Exception as e:
+        error_message = f"Failed to read the fitness rollup: {e!s}"
+        print(f"❌ {error_message}")
+        return {"status": "error", "message": error_message}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=run_rollup_job.__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sqlite", help="SQLite database to update instead of BigQuery"
+    )
+    parser.add_argument("--lookback-days", type=int, default=ROLLUP_LOOKBACK_DAYS)
+    args = parser.parse_args()
+
+    store = SQLiteRollupStore(args.sqlite) if args.sqlite else None
+    result = run_rollup_job(store, args.lookback_days)
+    print(
+        f"✅ Rolled up {result['raw_rows']} rows for {result['users']} users "
+        f"up to {result['watermark']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Server-side summary of a user's fitness history.
+
+`get_fitness_data_for_user` hands every raw `fitness_data` row to the model,
+which then has to read years of daily measurements token by token. The
+`get_fitness_summary_for_user` tool reads the same rows as Arrow (see
+`app.utils.fitness_data`) and condenses them with pandas into rolling
+averages, trends and the latest profile values, so the planners get a few
+hundred tokens regardless of the length of the history.
+
+Columns are matched by name, so the summary keeps working when the table
+gains or renames a metric: known metrics get dedicated statistics, any other
+numeric column gets the generic ones, and text columns report their latest
+value.
+"""
+
+from typing import TYPE_CHECKING, Any
+
+from app.utils.fitness_data import FitnessQuery, read_fitness_data
+from app.utils.user_cache import get_user_cache
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Number of weekly means reported for the weight trajectory
+WEIGHT_TRAJECTORY_WEEKS = 8
+
+# Summary name -> candidate column names, in order of preference
+DATE_COLUMNS = ("date", "timestamp", "recorded_at", "measurement_date", "day")
+METRIC_COLUMNS = {
+    "weight_kg": ("weight_kg", "weight", "current_weight_kg"),
+    "resting_heart_rate": ("resting_heart_rate", "resting_hr", "heart_rate"),
+    "sleep_hours": ("sleep_hours", "sleep_duration_hours", "hours_of_sleep", "sleep"),
+    "steps": ("steps", "daily_steps", "step_count"),
+    "calories_burned": ("calories_burned", "active_calories", "calories"),
+    "systolic_bp": ("systolic_bp", "blood_pressure_systolic", "systolic"),
+    "diastolic_bp": ("diastolic_bp", "blood_pressure_diastolic", "diastolic"),
+}
+# Metrics that add up over a day; heart rate takes the daily low, others the mean
+DAILY_TOTAL_METRICS = {"steps", "calories_burned"}
+DAILY_LOW_METRICS = {"resting_heart_rate"}
+# Columns that identify the row rather than describe the user
+IGNORED_COLUMNS = {"email", "user_id", "id"}
+
+
+def _find_column(columns: list[str], candidates: tuple[str, ...]) -> str | None:
+    lowered = {column.lower(): column for column in columns}
+    for candidate in candidates:
+        if candidate in lowered:
+            return lowered[candidate]
+    return None
+
+
+def _round(value: Any, digits: int = 1) -> float | None:
+    import pandas as pd
+
+    if value is None or pd.isna(value):
+        return None
+    return round(float(value), digits)
+
+
+def _trend_per_week(series: "pd.Series") -> float | None:
+    """Least-squares slope of a daily series, in units per week."""
+    import numpy as np
+
+    series = series.dropna()
+    if len(series) < 2:
+        return None
+    days = (series.index - series.index[0]).days.to_numpy(dtype=float)
+    if np.ptp(days) == 0:
+        return None
+    return _round(np.polyfit(days, series.to_numpy(dtype=float), 1)[0] * 7, 2)
+
+
+def _window(series: "pd.Series", days: int) -> "pd.Series":
+    import pandas as pd
+
+    return series[series.index > series.index[-1] - pd.Timedelta(days=days)]
+
+
+def _metric_stats(series: "pd.Series") -> dict[str, Any]:
+    series = series.dropna()
+    last_30 = _window(series, 30)
+    return {
+        "latest": _round(series.iloc[-1]),
+        "mean_7d": _round(_window(series, 7).mean()),
+        "mean_30d": _round(last_30.mean()),
+        "mean_all": _round(series.mean()),
+        "min": _round(series.min()),
+        "max": _round(series.max()),
+        "trend_per_week_30d": _trend_per_week(last_30),
+    }
+
+
+def _daily(frame: "pd.DataFrame", date_column: str | None) -> "pd.DataFrame":
+    """Indexes the rows by day, aggregating days with several measurements."""
+    import pandas as pd
+
+    if date_column is None:
+        # Without dates, treat each row as one day in table order
+        frame = frame.copy()
+        frame.index = pd.date_range("2000-01-01", periods=len(frame), freq="D")
+        return frame
+    dates = pd.to_datetime(frame[date_column], errors="coerce", utc=True)
+    frame = frame.loc[dates.notna()].drop(columns=date_column)
+    days = dates[dates.notna()].dt.tz_localize(None).dt.normalize()
+    aggregations = {
+        column: "sum"
+        if column in DAILY_TOTAL_METRICS
+        else "min"
+        if column in DAILY_LOW_METRICS
+        else "mean"
+        for column in frame.columns
+    }
+    return frame.groupby(days.to_numpy()).agg(aggregations).sort_index()
+
+
+def summarize_fitness_rows(rows: Any) -> dict[str, Any]:
+    """Condenses raw fitness rows into a compact, structured summary.
+
+    Args:
+        rows: `fitness_data` rows, as an Arrow table or DataFrame, or as a
+            list of mappings or BigQuery rows.
+
+    Returns:
+        Dictionary with the covered period, per-metric statistics (latest value,
+        7/30-day and all-time means, range and 30-day trend per week), the
+        weight trajectory, sleep and step highlights, and the latest value of
+        each text column.
+    """
+    # Imported here: pandas is too heavy to load with the agent graph
+    import pandas as pd
+
+    if hasattr(rows, "to_pandas"):
+        frame = rows.to_pandas()
+    elif isinstance(rows, pd.DataFrame):
+        frame = rows
+    else:
+        frame = pd.DataFrame([dict(row) for row in rows])
+    if frame.empty:
+        return {"records": 0}
+    frame = frame.drop(
+        columns=[c for c in frame.columns if c.lower() in IGNORED_COLUMNS]
+    )
+    columns = list(frame.columns)
+    date_column = _find_column(columns, DATE_COLUMNS)
+    for column in columns:
+        # BigQuery NUMERIC values arrive as Decimal objects
+        if column != date_column and frame[column].dtype == object:
+            converted = pd.to_numeric(frame[column], errors="coerce")
+            if converted.notna().sum() == frame[column].notna().sum():
+                frame[column] = converted
+    if date_column is not None:
+        frame = (
+            frame.assign(
+                _order=pd.to_datetime(frame[date_column], errors="coerce", utc=True)
+            )
+            .sort_values("_order", kind="stable")
+            .drop(columns="_order")
+        )
+
+    # The latest value of each text column, e.g. goals or dietary restrictions
+    text_columns = [
+        c
+        for c in columns
+        if c != date_column and not pd.api.types.is_numeric_dtype(frame[c])
+    ]
+    profile = {}
+    for column in text_columns:
+        values = frame[column].dropna()
+        if not values.empty:
+            value = values.iloc[-1]
+            profile[column] = (
+                value.isoformat() if hasattr(value, "isoformat") else str(value)
+            )
+
+    numeric = frame.drop(columns=text_columns)
+    renames = {}
+    for metric, candidates in METRIC_COLUMNS.items():
+        column = _find_column(list(numeric.columns), candidates)
+        if column is not None and column != date_column and column not in renames:
+            renames[column] = metric
+    numeric = numeric.rename(columns=renames)
+    daily = _daily(numeric, date_column if date_column in numeric.columns else None)
+
+    summary: dict[str, Any] = {
+        "records": len(frame),
+        "days": len(daily),
+        "first_date": daily.index[0].date().isoformat() if date_column else None,
+        "last_date": daily.index[-1].date().isoformat() if date_column else None,
+        "metrics": {},
+        "profile": profile,
+    }
+    for column in daily.columns:
+        if daily[column].notna().any():
+            summary["metrics"][column] = _metric_stats(daily[column])
+
+    if "weight_kg" in summary["metrics"]:
+        weight = daily["weight_kg"].dropna()
+        weekly = weight.resample("W").mean().dropna().tail(WEIGHT_TRAJECTORY_WEEKS)
+        summary["weight"] = {
+            "start": _round(weight.iloc[0]),
+            "latest": _round(weight.iloc[-1]),
+            "change": _round(weight.iloc[-1] - weight.iloc[0]),
+            "trend_per_week_all": _trend_per_week(weight),
+            "weekly_means": [_round(value) for value in weekly],
+        }
+    if "sleep_hours" in summary["metrics"]:
+        sleep = _window(daily["sleep_hours"].dropna(), 30)
+        summary["sleep"] = {"nights_under_7h_30d": int((sleep < 7).sum())}
+    if "steps" in summary["metrics"]:
+        steps = _window(daily["steps"].dropna(), 30)
+        summary["steps"] = {"days_over_10k_30d": int((steps >= 10_000).sum())}
+    return summary
+
+
+def get_fitness_summary_for_user(email: str) -> dict:
+    """Summarizes a user's complete fitness history.
+
+    Use this instead of reading the raw fitness data: it returns rolling
+    averages, trends, resting heart rate, sleep, steps and the weight
+    trajectory computed over all of the user's records.
+
+    Args:
+        email: The email of the user to summarize the fitness data for.
+
+    Returns:
+        Dictionary with the status and the fitness summary.
+    """
+
+    def load_summary() -> tuple[dict[str, Any], bool] | None:
+        result = read_fitness_data(FitnessQuery(email=email))
+        if result.table.num_rows == 0:
+            return None
+        return summarize_fitness_rows(result.table), result.truncated
+
+    try:
+        loaded = get_user_cache().get_or_load(email, "fitness_summary", load_summary)
+        if loaded is None:
+            return {"status": "error", "message": f"No fitness data found for {email}"}
+
+        summary, truncated = loaded
+        print(f"📊 Summarized {summary['records']} fitness records for: {email}")
+        return {
+            "status": "success",
+            "email": email,
+            "summary": summary,
+            "truncated": truncated,
+        }
+
+    except Exception as e:
+        error_message = f"Failed to summarize fitness data: {e!s}"
+        print(f"❌ {error_message}")
+        return {"status": "error", "message": error_message}
@@ -0,0 +1,189 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Rule-based fast path for the gym assistant's delegation decisions.
+
+Without it, every user message costs a full `gemini-2.5-flash` turn in
+`gym_assistant` just to pick a sub-agent. `route_clear_intents` runs as the
+assistant's `before_model_callback`: when the message matches the intents of
+exactly one sub-agent, it answers in place of the model with the
+`transfer_to_agent` call the model would have made, and ADK transfers
+straight away. Messages matching no intent or several, or containing a
+negation, go to the model as before.
+
+Set GYM_ASSISTANT_FAST_ROUTING=0 to always let the model route.
+"""
+
+import logging
+import os
+import re
+import threading
+from collections import Counter
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+FAST_ROUTING = os.environ.get("GYM_ASSISTANT_FAST_ROUTING", "1") != "0"
+
+# Sub-agent -> patterns of the requests that clearly belong to it, after the
+# intent descriptions in GYM_ASSISTANT_INSTRUCTION and the agent descriptions
+INTENT_PATTERNS: dict[str, tuple[str, ...]] = {
+    "fitness_planning_agent": (
+        r"\b(training|workout|exercise|fitness|gym|running|strength) "
+        r"(plan|program|programme|schedule|routine|split)s?\b",
+        r"\bplan (my|a|the|next) (week|weeks|workouts?|training|sessions?)\b",
+        r"\bweekly (plan|schedule|workouts?|training)\b",
+        r"\bcoach me\b",
+    ),
+    "video_generation_agent": (
+        r"\b(make|create|generate|render|produce)( \S+){0,3} "
+        r"(videos?|clips?|footage|animations?)\b",
+        r"\b(want|like|need) (a|an|some)( \S+)? "
+        r"(videos?|clips?|footage|animations?) (of|showing)\b",
+        r"\b(status|progress) of (my|the|that) (videos?|clips?)\b",
+        r"\bis (my|the|that) (video|clip) (ready|done|finished)\b",
+        r"\bveo\b",
+        r"\banimate\b",
+    ),
+    "bigquery_agent": (
+        r"\b(show|list|get|fetch|give|display|pull)\b.*\b(my|the|all)\b.*"
+        r"\b(data|records|measurements|history|steps|weight|heart rate|sleep)\b",
+        r"\b(list|show|how many)\b.*\busers\b",
+        r"\bwhat (was|were|is|are) my\b.*"
+        r"\b(steps|weight|heart rate|sleep|calories)\b",
+        r"\bmy (fitness|health) data\b",
+    ),
+    "user_registration_agent": (
+        r"\b(register|enroll|enrol)( me| us)?\b",
+        r"\bregistration for\b",
+        r"\bam i registered\b",
+        r"\bsign (me |us )?up\b",
+        r"\b(want|like) to (join|sign up)\b",
+        r"\b(create|open|make) (an |my |a new )?(account|profile)\b",
+        r"\b(i'm|i am) a new (user|member)\b",
+    ),
+    "gym_progress_agent": (
+        r"\bprogress (image|picture|pic|photo|meme)s?\b",
+        r"\b(image|picture|pic|photo|meme)s? of my (gym |fitness )?progress\b",
+        r"\bnano banana\b",
+        r"\b(funny|motivational) (image|picture|pic|photo|meme)s?\b",
+    ),
+    # Both halves must be asked for as plans, not merely mentioned
+    "wellness_bundle_agent": (
+        r"\bwellness bundle\b",
+        r"\b(workout|training|fitness|exercise) (plan|program|schedule)s?\b.*"
+        r"\b(diet|meal|nutrition|eating) (plan|program|schedule)s?\b",
+        r"\b(diet|meal|nutrition|eating) (plan|program|schedule)s?\b.*"
+        r"\b(workout|training|fitness|exercise) (plan|program|schedule)s?\b",
+        r"\b(workout|training|fitness|exercise) and (diet|meal|nutrition) "
+        r"(plan|program|schedule)s?\b",
+        r"\b(diet|meal|nutrition) and (workout|training|fitness|exercise) "
+        r"(plan|program|schedule)s?\b",
+        r"\bplan (my |the )?(meals|diet|nutrition) and "
+        r"(my |the )?(training|workouts?|exercise)\b",
+        r"\bplan (my |the )?(training|workouts?|exercise) and "
+        r"(my |the )?(meals|diet|nutrition)\b",
+    ),
+}
+
+# Sub-agent -> sub-agents whose matches it absorbs, e.g. the bundle covers
+# the workout plan that comes with a diet plan
+SUPERSEDES: dict[str, tuple[str, ...]] = {
+    "wellness_bundle_agent": ("fitness_planning_agent",),
+}
+
+# Messages the rules should not second-guess
+NEGATION_PATTERN = re.compile(r"\b(don't|dont|do not|not|never|no|without|instead)\b")
+
+_COMPILED = {
+    agent: re.compile("|".join(f"(?:{p})" for p in patterns))
+    for agent, patterns in INTENT_PATTERNS.items()
+}
+
+_stats: Counter[str] = Counter()
+_stats_lock = threading.Lock()
+
+
+def classify_intent(message: str) -> str | None:
+    """Returns the sub-agent a message clearly asks for, or None.
+
+    Args:
+        message: The user's message.
+
+    Returns:
+        The name of the only sub-agent whose intents match the message, or
+        None if the message is ambiguous or for the assistant itself.
+    """
+    text = " ".join(message.lower().split())
+    if not text or NEGATION_PATTERN.search(text):
+        return None
+    matches = [agent for agent, pattern in _COMPILED.items() if pattern.search(text)]
+    superseded = {other for agent in matches for other in SUPERSEDES.get(agent, ())}
+    matches = [agent for agent in matches if agent not in superseded]
+    return matches[0] if len(matches) == 1 else None
+
+
+def route_clear_intents(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> LlmResponse | None:
+    """Transfers clear-cut user messages without calling the model.
+
+    Only the model call answering a new user message is replaced, and only
+    when the agent may transfer; every other call goes to the model.
+
+    Args:
+        callback_context: The gym assistant's callback context.
+        llm_request: The request about to be sent to the model.
+
+    Returns:
+        A response calling `transfer_to_agent`, or None to call the model.
+    """
+    user_content = callback_context.user_content
+    if (
+        not FAST_ROUTING
+        or "transfer_to_agent" not in llm_request.tools_dict
+        or not user_content
+        or not llm_request.contents
+        or llm_request.contents[-1] != user_content
+    ):
+        return None
+    message = "".join(part.text or "" for part in user_content.parts or [])
+    agent_name = classify_intent(message)
+    with _stats_lock:
+        _stats["fast_routed" if agent_name else "model_routed"] += 1
+    if agent_name is None:
+        return None
+    logging.info(f"Fast-routing {callback_context.agent_name} to {agent_name}")
+    return LlmResponse(
+        content=types.Content(
+            role="model",
+            parts=[
+                types.Part(
+                    function_call=types.FunctionCall(
+                        name="transfer_to_agent", args={"agent_name": agent_name}
+                    )
+                )
+            ],
+        )
+    )
+
+
+def get_router_stats() -> dict[str, int]:
+    """Returns how many user messages were routed by the rules or the model."""
+    with _stats_lock:
+        return {
+            "fast_routed": _stats["fast_routed"],
+            "model_routed": _stats["model_routed"],
+        }
@@ -0,0 +1,403 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local SQLite implementation of the health-assistant toolset.
+
+`LocalToolbox` loads the sources and tools of `tools.yaml` and runs the same
+parameterized statements against SQLite, so the data path can be developed,
+benchmarked and load-tested without the BigQuery project. Setting
+TOOLBOX_URL to `sqlite:///path/to/health.db` (or `sqlite://` for an
+in-memory database) makes `ToolboxRegistry` use it in place of the remote
+toolbox server.
+
+The statements run unchanged where SQLite understands them: it accepts the
+backtick-quoted `project.dataset.table` names and `@name` parameters. Array
+parameters are passed as JSON, and the BigQuery array constructs the
+toolset and the fitness rollups use are rewritten:
+
+- `UNNEST(@xs) AS x WITH OFFSET AS i` becomes a `json_each(@xs)` subquery.
+- `IN UNNEST(@xs)` becomes `IN (SELECT value FROM json_each(@xs))`.
+- `@xs[OFFSET(i)]` becomes `json_extract(@xs, '$[' || i || ']')`.
+
+An empty database is given the three tables and filled with synthetic data
+(see `generate_synthetic_data`), sized by LOCAL_TOOLBOX_USERS and
+LOCAL_TOOLBOX_DAYS. Run this module to write a database file up front:
+
+    python -m app.utils.local_toolbox health.db --users 1000 --days 1095
+
+`create_toolbox_app` serves a `LocalToolbox` over the toolbox server's HTTP
+API, so the remote client path can be load-tested too. Add `--serve PORT`
+to the command above to run it.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+from typing import Any
+
+import yaml
+from toolbox_core.protocol import ParameterSchema
+
+LOCAL_TOOLBOX_SCHEME = "sqlite://"
+LOCAL_TOOLBOX_USERS = int(os.environ.get("LOCAL_TOOLBOX_USERS", "100"))
+LOCAL_TOOLBOX_DAYS = int(os.environ.get("LOCAL_TOOLBOX_DAYS", "365"))
+# Result of a statement that returns no rows, e.g. an INSERT
+NO_CONTENT = "Query executed successfully and returned no content."
+
+# Table name (last part of the BigQuery name) -> columns
+TABLE_COLUMNS = {
+    "user_profiles": (
+        "email TEXT",
+        "age INTEGER",
+        "gender TEXT",
+        "height_cm INTEGER",
+        "current_weight_kg INTEGER",
+        "goal_weight_kg INTEGER",
+        "experience_level TEXT",
+        "workout_days_per_week INTEGER",
+        "preferred_workout_types TEXT",
+        "fitness_goals TEXT",
+        "health_notes TEXT",
+    ),
+    "fitness_data": (
+        "email TEXT",
+        "date TEXT",
+        "weight_kg REAL",
+        "resting_heart_rate INTEGER",
+        "systolic_bp INTEGER",
+        "diastolic_bp INTEGER",
+        "sleep_hours REAL",
+        "steps INTEGER",
+        "calories_burned INTEGER",
+    ),
+    "workout_plans": (
+        "email TEXT",
+        "date TEXT",
+        "day TEXT",
+        "goal TEXT",
+        "warm_up_phase TEXT",
+        "main_workout_phase TEXT",
+        "cool_down_phase TEXT",
+    ),
+}
+# Per-user lookups and date windows, standing in for BigQuery clustering
+TABLE_INDEXES = {
+    "user_profiles": "(email)",
+    "fitness_data": "(email, date)",
+    "workout_plans": "(email, date)",
+}
+
+_TABLE_NAME = re.compile(r"`([\w-]+\.\w+\.(\w+))`")
+_UNNEST = re.compile(
+    r"UNNEST\(@(\w+)\)\s+AS\s+(\w+)\s+WITH\s+OFFSET\s+AS\s+(\w+)", re.I
+)
+_IN_UNNEST = re.compile(r"\bIN\s+UNNEST\(@(\w+)\)", re.I)
+_OFFSET = re.compile(r"@(\w+)\[OFFSET\((\w+)\)\]", re.I)
+
+
+def to_sqlite(statement: str) -> str:
+    """Rewrites the BigQuery array constructs of a statement for SQLite."""
+    statement = _UNNEST.sub(
+        r"(SELECT value AS \2, CAST(key AS INTEGER) AS \3 FROM json_each(@\1))",
+        statement,
+    )
+    statement = _IN_UNNEST.sub(r"IN (SELECT value FROM json_each(@\1))", statement)
+    return _OFFSET.sub(r"json_extract(@\1, '$[' || \2 || ']')", statement)
+
+
+def table_names(config: dict[str, Any]) -> dict[str, str]:
+    """Returns the BigQuery names of the tables used by the tools, by table."""
+    names = {}
+    for tool in config["tools"].values():
+        for full_name, table in _TABLE_NAME.findall(tool["statement"]):
+            names[table] = full_name
+    return names
+
+
+def create_tables(connection: sqlite3.Connection, names: dict[str, str]) -> None:
+    """Creates the toolset's tables under their BigQuery names."""
+    with connection:
+        for table, columns in TABLE_COLUMNS.items():
+            full_name = names.get(table, table)
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS `{full_name}` ({', '.join(columns)})"
+            )
+            connection.execute(
+                f"CREATE INDEX IF NOT EXISTS `{table}_by_user` "
+                f"ON `{full_name}` {TABLE_INDEXES[table]}"
+            )
+
+
+def generate_synthetic_data(
+    connection: sqlite3.Connection,
+    names: dict[str, str],
+    users: int | None = None,
+    days: int | None = None,
+    seed: int = 0,
+) -> None:
+    """Fills the tables with synthetic users, daily measurements and plans.
+
+    Args:
+        connection: SQLite database with the toolset's tables.
+        names: BigQuery names of the tables, see `table_names`.
+        users: Number of users. Defaults to LOCAL_TOOLBOX_USERS.
+        days: Days of fitness data per user, ending today. Defaults to
+            LOCAL_TOOLBOX_DAYS.
+        seed: Random seed, for reproducible data.
+    """
+    users = LOCAL_TOOLBOX_USERS if users is None else users
+    days = LOCAL_TOOLBOX_DAYS if days is None else days
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    profiles, measurements, plans = [], [], []
+    for user in range(users):
+        email = f"user{user}@example.com"
+        weight = rng.uniform(55, 110)
+        goal_weight = weight + rng.uniform(-15, 5)
+        profiles.append(
+            (
+                email,
+                rng.randint(18, 70),
+                rng.choice(("female", "male")),
+                rng.randint(150, 200),
+                round(weight),
+                round(goal_weight),
+                rng.choice(("Beginner", "Intermediate", "Advanced")),
+                rng.randint(2, 6),
+                rng.choice(("strength", "running", "yoga", "strength, cycling")),
+                rng.choice(("lose weight", "build muscle", "improve endurance")),
+                None,
+            )
+        )
+        resting_hr = rng.uniform(55, 75)
+        for day in range(days):
+            date = today - datetime.timedelta(days=days - 1 - day)
+            weight += (goal_weight - weight) / 2000 + rng.gauss(0, 0.15)
+            measurements.append(
+                (
+                    email,
+                    date.isoformat(),
+                    round(weight, 1),
+                    round(resting_hr + rng.gauss(0, 2)),
+                    round(rng.gauss(122, 8)),
+                    round(rng.gauss(79, 5)),
+                    round(rng.gauss(7, 0.8), 1),
+                    max(0, round(rng.gauss(8_500, 2_500))),
+                    round(rng.gauss(2_300, 250)),
+                )
+            )
+        for day in range(7):
+            date = today + datetime.timedelta(days=day)
+            plans.append(
+                (
+                    email,
+                    date.isoformat(),
+                    date.strftime("%A"),
+                    "Full body strength" if day % 2 else "Zone 2 cardio",
+                    "10 min mobility",
+                    "45 min main set",
+                    "5 min stretching",
+                )
+            )
+    with connection:
+        for table, rows in (
+            ("user_profiles", profiles),
+            ("fitness_data", measurements),
+            ("workout_plans", plans),
+        ):
+            placeholders = ", ".join("?" * len(TABLE_COLUMNS[table]))
+            connection.executemany(
+                f"INSERT INTO `{names.get(table, table)}` VALUES ({placeholders})", rows
+            )
+
+
+class LocalToolboxTool:
+    """A toolbox tool that runs its statement on the local database.
+
+    Exposes `_description` and `_params` like `ToolboxTool`, which is all
+    `ToolboxRegistry` reads from a loaded tool. Calls are blocking.
+    """
+
+    def __init__(
+        self, toolbox: "LocalToolbox", name: str, config: dict[str, Any]
+    ) -> None:
+        self._toolbox = toolbox
+        self.__name__ = name
+        self._description = config["description"]
+        self._params = [
+            ParameterSchema.model_validate({"required": True, **param})
+            for param in config.get("parameters", [])
+        ]
+        self.statement = to_sqlite(config["statement"])
+
+    def __call__(self, **kwargs: Any) -> str:
+        parameters = {}
+        for param in self._params:
+            value = kwargs.get(param.name)
+            if param.required and value is None:
+                raise ValueError(f"Missing required parameter: {param.name}")
+            if param.type == "array":
+                value = json.dumps(value)
+            parameters[param.name] = value
+        rows = self._toolbox.execute(self.statement, parameters)
+        return json.dumps(rows, default=str) if rows else NO_CONTENT
+
+
+class LocalToolbox:
+    """Runs the tools of a `tools.yaml` against a local SQLite database.
+
+    Offers `load_toolset` like `ToolboxClient`, without awaiting.
+    """
+
+    def __init__(self, tools_file: str, database: str = ":memory:") -> None:
+        """
+        Args:
+            tools_file: Toolbox `tools.yaml` to load the tools from.
+            database: SQLite database file, or ":memory:". An empty database
+                is created and filled with synthetic data.
+        """
+        with open(tools_file) as f:
+            self.config = yaml.safe_load(f)
+        self.tables = table_names(self.config)
+        self.connection = sqlite3.connect(database, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self.statements = 0
+        has_tables = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table'"
+        ).fetchone()
+        if not has_tables:
+            create_tables(self.connection, self.tables)
+            generate_synthetic_data(self.connection, self.tables)
+
+    @classmethod
+    def from_url(cls, url: str, tools_file: str) -> "LocalToolbox":
+        """Opens the database of a `sqlite:///path` or `sqlite://` URL."""
+        return cls(tools_file, url[len(LOCAL_TOOLBOX_SCHEME) :] or ":memory:")
+
+    def load_toolset(self, name: str) -> list[LocalToolboxTool]:
+        return [
+            LocalToolboxTool(self, tool, self.config["tools"][tool])
+            for tool in self.config["toolsets"][name]
+        ]
+
+    def execute(
+        self, statement: str, parameters: dict[str, Any]
+    ) -> list[dict[str, Any]]:
+        with self._lock, self.connection:
+            self.statements += 1
+            cursor = self.connection.execute(statement, parameters)
+            return [dict(row) for row in cursor.fetchall()]
+
+
+def create_toolbox_app(toolbox: LocalToolbox, latency_seconds: float = 0.0) -> Any:
+    """Returns an `aiohttp` app serving a local toolbox like the toolbox server.
+
+    Args:
+        toolbox: The toolbox whose tools are served.
+        latency_seconds: Delay added to every invocation, to stand in for the
+            BigQuery round trip in benchmarks.
+    """
+    from aiohttp import web
+
+    def manifest(names: list[str]) -> dict[str, Any]:
+        tools = {}
+        for name in names:
+            tool = LocalToolboxTool(toolbox, name, toolbox.config["tools"][name])
+            tools[name] = {
+                "description": tool._description,
+                "parameters": [param.model_dump() for param in tool._params],
+            }
+        return {"serverVersion": "local", "tools": tools}
+
+    async def get_toolset(request: web.Request) -> web.Response:
+        names = toolbox.config["toolsets"].get(request.match_info["name"])
+        if names is None:
+            raise web.HTTPNotFound()
+        return web.json_response(manifest(names))
+
+    async def get_tool(request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        if name not in toolbox.config["tools"]:
+            raise web.HTTPNotFound()
+        return web.json_response(manifest([name]))
+
+    async def invoke(request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        if name not in toolbox.config["tools"]:
+            raise web.HTTPNotFound()
+        tool = LocalToolboxTool(toolbox, name, toolbox.config["tools"][name])
+        payload = await request.json()
+        if latency_seconds:
+            await asyncio.sleep(latency_seconds)
+        try:
+            result = await asyncio.to_thread(tool, **payload)
+        except (ValueError, sqlite3.Error) as e:
+            return web.json_response({"error": str(e)}, status=400)
+        return web.json_response({"result": result})
+
+    async def health(request: web.Request) -> web.Response:
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_get("/", health)
+    app.router.add_get("/api/toolset/{name}", get_toolset)
+    app.router.add_get("/api/tool/{name}", get_tool)
+    app.router.add_post("/api/tool/{name}/invoke", invoke)
+    return app
+
+
+def main() -> None:
+    from app.utils.toolbox import TOOLS_FILE
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("database", help="SQLite database file to create or serve")
+    parser.add_argument("--users", type=int, default=LOCAL_TOOLBOX_USERS)
+    parser.add_argument("--days", type=int, default=LOCAL_TOOLBOX_DAYS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tools-file", default=TOOLS_FILE)
+    parser.add_argument("--serve", type=int, metavar="PORT", help="Serve the tools")
+    args = parser.parse_args()
+
+    with open(args.tools_file) as f:
+        names = table_names(yaml.safe_load(f))
+    connection = sqlite3.connect(args.database)
+    tables = connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table'")
+    if tables.fetchone():
+        print(f"✅ Using the existing database {args.database}")
+    else:
+        create_tables(connection, names)
+        generate_synthetic_data(connection, names, args.users, args.days, args.seed)
+        print(f"✅ Wrote {args.users} synthetic users to {args.database}")
+    connection.close()
+    url = f"{LOCAL_TOOLBOX_SCHEME}/{os.path.abspath(args.database)}"
+    if args.serve is None:
+        print(f"   Use it with TOOLBOX_URL={url}")
+        return
+
+    from aiohttp import web
+
+    print(f"   Serving it with TOOLBOX_URL=http://127.0.0.1:{args.serve}")
+    app = create_toolbox_app(LocalToolbox(args.tools_file, args.database))
+    web.run_app(app, host="127.0.0.1", port=args.serve, print=None)
+
+
+if __name__ == "__main__":
+    main()
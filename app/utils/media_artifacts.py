@@ -0,0 +1,84 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Response envelope for the media produced by tools.
+
+Tool results are fed back to the model and persisted in the session, so media
+tools never return the bytes themselves. They save the media as an artifact
+and return a small reference to it, which clients resolve through the
+artifact service (name and version) or the public URL.
+"""
+
+from typing import Any
+
+
+def media_reference(
+    name: str,
+    mime_type: str,
+    size_bytes: int | None,
+    url: str | None = None,
+    version: int | None = None,
+) -> dict[str, Any]:
+    """Builds the reference a media tool returns instead of the media bytes.
+
+    Args:
+        name: Artifact name of the media.
+        mime_type: MIME type of the media.
+        size_bytes: Size of the media, if known.
+        url: Public URL the media can be downloaded from, if any.
+        version: Artifact version, if it was saved as an artifact.
+
+    Returns:
+        Dictionary with the name, version, url, mime_type and size_bytes keys.
+    """
+    return {
+        "name": name,
+        "version": version,
+        "url": url,
+        "mime_type": mime_type,
+        "size_bytes": size_bytes,
+    }
+
+
+async def save_media_artifact(
+    tool_context: Any,
+    name: str,
+    data: bytes,
+    mime_type: str,
+    url: str | None = None,
+) -> dict[str, Any]:
+    """Saves media bytes as an artifact of the tool's session.
+
+    Args:
+        tool_context: ADK tool context, or None outside of an agent run.
+        name: Artifact name.
+        data: Media bytes.
+        mime_type: MIME type of the media.
+        url: Public URL the media can also be downloaded from, if any.
+
+    Returns:
+        The media reference, see `media_reference`.
+    """
+    from google.genai import types
+
+    version = None
+    if tool_context:
+        try:
+            version = await tool_context.save_artifact(
+                name, types.Part(inline_data=types.Blob(mime_type=mime_type, data=data))
+            )
+            print(f"💾 Saved as artifact: {name}")
+        except Exception as e:
+            print(f"⚠️ Could not save as artifact: {e}")
+    return media_reference(name, mime_type, len(data), url=url, version=version)
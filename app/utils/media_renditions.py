@@ -0,0 +1,216 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Off-thread renditions of generated images.
+
+Media tools store the original image as returned by the model and hand it to
+`MediaPostProcessor`, which decodes it once in a process pool and encodes the
+renditions the UI uses: a WebP thumbnail, a full-size WebP and, when Pillow
+supports it, a full-size AVIF. The renditions are spooled and uploaded next to
+the original once they are ready, by a thread pool of their own, so neither
+the request thread nor the process pool's result handling waits for image
+encoding, disk or network.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from app.utils.clients import get_storage_client
+from app.utils.media_spool import MediaSpool, get_media_spool
+
+MEDIA_BUCKET_NAME = "qwiklabs-gcp-00-a489584c5286-adk-videos"
+POSTPROCESS_WORKERS = int(os.environ.get("MEDIA_POSTPROCESS_WORKERS", "2"))
+# Threads spooling and uploading finished renditions
+STORE_WORKERS = int(os.environ.get("MEDIA_STORE_WORKERS", "4"))
+THUMBNAIL_SIZE = (256, 256)
+
+# Rendition name -> (file suffix, MIME type, Pillow format)
+RENDITIONS = {
+    "thumbnail": (".thumb.webp", "image/webp", "WEBP"),
+    "webp": (".webp", "image/webp", "WEBP"),
+    "avif": (".avif", "image/avif", "AVIF"),
+}
+
+
+def rendition_names(filename: str) -> dict[str, str]:
+    """Returns the file names of the renditions of an original image."""
+    stem = Path(filename).stem
+    return {
+        rendition: f"{stem}{suffix}"
+        for rendition, (suffix, _, _) in RENDITIONS.items()
+        if rendition != "avif" or _avif_supported()
+    }
+
+
+def rendition_urls(
+    filename: str, bucket_name: str = MEDIA_BUCKET_NAME
+) -> dict[str, str]:
+    """Returns the public URLs the renditions of an image are uploaded to."""
+    return {
+        rendition: f"https://storage.googleapis.com/{bucket_name}/{name}"
+        for rendition, name in rendition_names(filename).items()
+    }
+
+
+def _avif_supported() -> bool:
+    from PIL import features
+
+    return bool(features.check("avif"))
+
+
+def render(path: str) -> tuple[dict[str, bytes], float]:
+    """Encodes the renditions of an image file.
+
+    Runs in a worker process.
+
+    Returns:
+        The encoded renditions by name, and the CPU seconds spent.
+    """
+    from io import BytesIO
+
+    from PIL import Image
+
+    cpu_start = time.process_time()
+    image = Image.open(path)
+    image.load()
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+    renditions = {}
+    for rendition in rendition_names(path):
+        target = image
+        if rendition == "thumbnail":
+            target = image.copy()
+            target.thumbnail(THUMBNAIL_SIZE)
+        buffer = BytesIO()
+        target.save(buffer, format=RENDITIONS[rendition][2])
+        renditions[rendition] = buffer.getvalue()
+    return renditions, time.process_time() - cpu_start
+
+
+class MediaPostProcessor:
+    """Produces image renditions in a process pool and stores them."""
+
+    def __init__(
+        self,
+        max_workers: int = POSTPROCESS_WORKERS,
+        spool: MediaSpool | None = None,
+        storage_client: Any = None,
+        bucket_name: str = MEDIA_BUCKET_NAME,
+        store_workers: int = STORE_WORKERS,
+    ) -> None:
+        """
+        Args:
+            max_workers: Number of worker processes.
+            spool: Spool the renditions are written to. Defaults to the shared
+                media spool.
+            storage_client: Cloud Storage client. Defaults to the shared client.
+            bucket_name: Bucket the renditions are uploaded to.
+            store_workers: Number of threads spooling and uploading
+                renditions.
+        """
+        self.max_workers = max_workers
+        self._spool = spool
+        self._storage_client = storage_client
+        self.bucket_name = bucket_name
+        self.store_workers = store_workers
+        self._pool: ProcessPoolExecutor | None = None
+        self._store_pool: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def spool(self) -> MediaSpool:
+        return self._spool or get_media_spool()
+
+    @property
+    def storage_client(self) -> Any:
+        return self._storage_client or get_storage_client()
+
+    def submit(self, path: Path) -> Future:
+        """Starts rendering a spooled original image.
+
+        Returns:
+            Future resolving to the spooled rendition paths by rendition name.
+        """
+        with self._lock:
+            if self._pool is None:
+                # spawn: the parent runs threads, which fork does not support
+                self._pool = ProcessPoolExecutor(
+                    self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            if self._store_pool is None:
+                self._store_pool = ThreadPoolExecutor(
+                    self.store_workers, thread_name_prefix="media-store"
+                )
+            store_pool = self._store_pool
+            rendered = self._pool.submit(render, str(path))
+        stored: Future = Future()
+
+        def store(rendered: Future) -> None:
+            try:
+                renditions, cpu_s = rendered.result()
+                names = rendition_names(path.name)
+                paths = {}
+                for rendition, data in renditions.items():
+                    paths[rendition] = self.spool.write_as(names[rendition], data)
+                    self._upload(paths[rendition], RENDITIONS[rendition][1])
+                logging.info(f"Rendered {path.name} in {cpu_s * 1000:.0f} ms CPU")
+                stored.set_result(paths)
+            except Exception as e:
+                print(f"⚠️ Could not create renditions of {path.name}: {e}")
+                stored.set_exception(e)
+
+        def hand_off(rendered: Future) -> None:
+            # Runs on the process pool's management thread, which must not block
+            try:
+                store_pool.submit(store, rendered)
+            except RuntimeError as e:
+                # The store pool was shut down
+                stored.set_exception(e)
+
+        rendered.add_done_callback(hand_off)
+        return stored
+
+    def _upload(self, path: Path, content_type: str) -> None:
+        blob = self.storage_client.bucket(self.bucket_name).blob(path.name)
+        blob.upload_from_filename(path, content_type=content_type)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+            # After the process pool, whose last results hand off stores here
+            if self._store_pool is not None:
+                self._store_pool.shutdown()
+                self._store_pool = None
+
+
+_post_processor: MediaPostProcessor | None = None
+_post_processor_lock = threading.Lock()
+
+
+def get_media_post_processor() -> MediaPostProcessor:
+    """Returns the process-wide media post-processor."""
+    global _post_processor
+    if _post_processor is None:
+        with _post_processor_lock:
+            if _post_processor is None:
+                _post_processor = MediaPostProcessor()
+    return _post_processor
@@ -0,0 +1,145 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bounded local spool directory for the files written by media tools.
+
+Files are named after a hash of their content, so concurrent writes never
+collide and identical media is stored once. Writes are atomic (temporary file
+plus rename), and the least recently used files are evicted whenever the
+spool grows beyond its byte budget, which keeps the disk footprint of a
+long-running worker flat.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+MEDIA_SPOOL_DIR = os.environ.get(
+    "MEDIA_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "adk-media-spool")
+)
+MEDIA_SPOOL_MAX_BYTES = int(os.environ.get("MEDIA_SPOOL_MAX_BYTES", str(512 * 2**20)))
+
+
+class MediaSpool:
+    """A directory of content-addressed media files with LRU eviction."""
+
+    def __init__(
+        self, directory: str = MEDIA_SPOOL_DIR, max_bytes: int = MEDIA_SPOOL_MAX_BYTES
+    ) -> None:
+        """
+        Args:
+            directory: Directory holding the spooled files. Created if missing.
+            max_bytes: Total size of the spooled files above which the least
+                recently used ones are deleted.
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # File name -> size, least recently used first
+        self._files: OrderedDict[str, int] = OrderedDict()
+        self._total = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for path in sorted(
+            (p for p in self.directory.iterdir() if p.is_file()),
+            key=lambda p: p.stat().st_mtime,
+        ):
+            if path.name.startswith("."):
+                # Left over from an interrupted write
+                path.unlink(missing_ok=True)
+                continue
+            self._files[path.name] = path.stat().st_size
+            self._total += self._files[path.name]
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def write(self, data: bytes, prefix: str, suffix: str) -> Path:
+        """Stores `data` and returns its path.
+
+        Args:
+            data: File content.
+            prefix: Leading part of the file name, e.g. "gym_progress".
+            suffix: File extension including the dot, e.g. ".png".
+
+        Returns:
+            Path of the file, named `<prefix>_<content hash><suffix>`.
+        """
+        name = f"{prefix}_{hashlib.sha256(data).hexdigest()[:16]}{suffix}"
+        with self._lock:
+            if name in self._files and (self.directory / name).exists():
+                self._touch(name)
+                return self.directory / name
+        return self.write_as(name, data)
+
+    def write_as(self, name: str, data: bytes) -> Path:
+        """Stores `data` under a given name, e.g. a rendition of a spooled file."""
+        path = self.directory / name
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.directory, prefix=".", suffix=path.suffix
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self._total += len(data) - self._files.pop(name, 0)
+            self._files[name] = len(data)
+            self._evict(keep=name)
+        return path
+
+    def get(self, name: str) -> Path | None:
+        """Returns the path of a spooled file, marking it as recently used."""
+        with self._lock:
+            if name not in self._files:
+                return None
+            path = self.directory / name
+            if not path.exists():
+                self._total -= self._files.pop(name)
+                return None
+            self._touch(name)
+            return path
+
+    def _touch(self, name: str) -> None:
+        self._files.move_to_end(name)
+        os.utime(self.directory / name)
+
+    def _evict(self, keep: str) -> None:
+        for name in list(self._files):
+            if self._total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            self._total -= self._files.pop(name)
+            (self.directory / name).unlink(missing_ok=True)
+
+
+_spool: MediaSpool | None = None
+_spool_lock = threading.Lock()
+
+
+def get_media_spool() -> MediaSpool:
+    """Returns the process-wide media spool."""
+    global _spool
+    if _spool is None:
+        with _spool_lock:
+            if _spool is None:
+                _spool = MediaSpool()
+    return _spool
@@ -0,0 +1,274 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Opt-in cache of the gym assistant's answers to general wellness questions.
+
+The same general questions ("how much protein do I need?") come up across
+many users, and `gym_assistant` answers them from its own knowledge. With
+GYM_ASSISTANT_RESPONSE_CACHE=1, `cached_response` and `store_response` run as
+the assistant's model callbacks and serve repeats from a `ResponseCache`
+instead of calling the model.
+
+The key is the normalized text of the conversation the model would see, so a
+question asked first hits on the answer given to another user's first
+question, while follow-ups only hit on the same conversation. Turns are
+neither served nor stored when the conversation mentions an email address,
+contains tool calls or results, or has context from a sub-agent: their
+answers may depend on a user's data. Only plain text answers are stored, so
+transfers and tool calls always reach the model.
+
+Hits, misses, skipped turns and the model time the hits saved are kept as
+counters; `stats` returns them.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+RESPONSE_CACHE_ENABLED = os.environ.get("GYM_ASSISTANT_RESPONSE_CACHE", "0") == "1"
+RESPONSE_CACHE_TTL_SECONDS = float(
+    os.environ.get("RESPONSE_CACHE_TTL_SECONDS", "86400")
+)
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+# Words that do not change the question
+FILLER_WORDS = frozenset(
+    {"hi", "hey", "hello", "please", "pls", "thanks", "thank", "you", "so", "um"}
+)
+# Text ADK puts in front of other agents' events it shows the model
+FOREIGN_CONTEXT = "For context:"
+
+
+def normalize_prompt(text: str) -> str:
+    """Returns the cache form of a message.
+
+    Case, accents, punctuation, spacing and filler words do not matter.
+    """
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    words = re.findall(r"[a-z0-9]+", text)
+    return " ".join(word for word in words if word not in FILLER_WORDS)
+
+
+def response_cache_key(agent_name: str, contents: list[types.Content]) -> str | None:
+    """Returns the cache key of a conversation, or None if it is not cacheable.
+
+    Args:
+        agent_name: The agent about to answer.
+        contents: The conversation the model would see, ending with the new
+            user message.
+
+    Returns:
+        A key of the agent and the normalized conversation, or None if the
+        conversation touched user data or tools.
+    """
+    turns = []
+    for content in contents:
+        for part in content.parts or []:
+            if part.function_call or part.function_response or part.inline_data:
+                return None
+            text = part.text or ""
+            if text.startswith(FOREIGN_CONTEXT) or EMAIL_PATTERN.search(text):
+                return None
+        text = normalize_prompt("".join(p.text or "" for p in content.parts or []))
+        if text:
+            turns.append(f"{content.role}: {text}")
+    if not turns:
+        return None
+    digest = hashlib.sha256("\n".join(turns).encode()).hexdigest()
+    return f"{agent_name}:{digest}"
+
+
+class ResponseCache:
+    """TTL- and size-bounded LRU cache of model answers."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            ttl_seconds: How long a cached answer stays valid.
+            max_entries: Number of answers kept; the least recently used one
+                is evicted beyond that.
+            clock: Monotonic clock, replaceable in tests.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        # Key -> (answer, expires at, seconds the model took)
+        self._entries: OrderedDict[str, tuple[types.Content, float, float]] = (
+            OrderedDict()
+        )
+        # Invocation -> (key, model call start) of the misses being answered
+        self._pending: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+
+    def lookup(self, invocation_id: str, key: str | None) -> types.Content | None:
+        """Returns the cached answer to a conversation, or None on a miss.
+
+        Args:
+            invocation_id: The invocation the model call belongs to; a miss
+                is remembered under it until `store`.
+            key: The conversation's key, or None if it is not cacheable.
+        """
+        now = self._clock()
+        with self._lock:
+            if key is None:
+                self.skipped += 1
+                return None
+            cached = self._entries.get(key)
+            if cached is not None and cached[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_seconds += cached[2]
+                return cached[0]
+            if cached is not None:
+                del self._entries[key]
+            self.misses += 1
+            self._pending[invocation_id] = (key, now)
+            while len(self._pending) > self.max_entries:
+                self._pending.popitem(last=False)
+            return None
+
+    def store(self, invocation_id: str, content: types.Content | None) -> None:
+        """Caches the answer to the miss of an invocation, if it had one.
+
+        Args:
+            invocation_id: The invocation passed to `lookup`.
+            content: The model's answer, or None to only forget the miss.
+        """
+        now = self._clock()
+        with self._lock:
+            pending = self._pending.pop(invocation_id, None)
+            if pending is None or content is None:
+                return
+            key, start = pending
+            self._entries[key] = (content, now + self.ttl_seconds, now - start)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drops all cached answers and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._pending.clear()
+            self.hits = self.misses = self.skipped = self.evictions = 0
+            self.saved_seconds = 0.0
+
+    def stats(self) -> dict[str, Any]:
+        """Returns the cache counters, hit ratio and model time saved."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "skipped": self.skipped,
+                "evictions": self.evictions,
+                "latency_saved_seconds": round(self.saved_seconds, 3),
+            }
+
+
+_cache: ResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Returns the process-wide response cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
+
+
+def cached_response(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> LlmResponse | None:
+    """Answers a repeated question from the cache instead of the model.
+
+    Only the model call answering a new user message is looked up.
+
+    Args:
+        callback_context: The answering agent's callback context.
+        llm_request: The request about to be sent to the model.
+
+    Returns:
+        The cached answer, or None to call the model.
+    """
+    user_content = callback_context.user_content
+    if (
+        not RESPONSE_CACHE_ENABLED
+        or not user_content
+        or not llm_request.contents
+        or llm_request.contents[-1] != user_content
+    ):
+        return None
+    key = response_cache_key(callback_context.agent_name, llm_request.contents)
+    content = get_response_cache().lookup(callback_context.invocation_id, key)
+    if content is None:
+        return None
+    logging.info(f"Answered {callback_context.agent_name} from the response cache")
+    return LlmResponse(content=content.model_copy(deep=True))
+
+
+def store_response(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> LlmResponse | None:
+    """Caches the model's answer to a question that missed the cache.
+
+    Args:
+        callback_context: The answering agent's callback context.
+        llm_response: The model's response.
+
+    Returns:
+        None, so the response is used as it is.
+    """
+    if not RESPONSE_CACHE_ENABLED or llm_response.partial:
+        return None
+    content = None
+    if llm_response.content and not llm_response.error_code:
+        # Thoughts are not part of the answer
+        parts = [part for part in llm_response.content.parts or [] if not part.thought]
+        if parts and all(part.text for part in parts):
+            content = types.Content(
+                role=llm_response.content.role,
+                parts=[part.model_copy(deep=True) for part in parts],
+            )
+    get_response_cache().store(callback_context.invocation_id, content)
+    return None
@@ -0,0 +1,442 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide registry for the MCP toolbox toolset used by the sub-agents.
+
+The tools are coroutines: ADK awaits them on its event loop and runs the
+independent tool calls of one model turn concurrently. They are invoked
+through the async `ToolboxClient`, over one keep-alive `aiohttp` connection
+pool per event loop, instead of blocking a thread per call.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Sequence
+from inspect import Signature
+from typing import Any
+
+import aiohttp
+import yaml
+from toolbox_core import ToolboxClient
+from toolbox_core.protocol import ParameterSchema, ToolSchema
+from toolbox_core.utils import create_func_docstring
+
+from app.utils.local_toolbox import LOCAL_TOOLBOX_SCHEME
+from app.utils.toolbox_balancer import ToolboxBalancer, ToolboxEndpoint
+from app.utils.user_cache import get_user_cache
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "tools")
+TOOLBOX_URL = os.environ.get("TOOLBOX_URL", "https://toolbox-4wmotx3yxa-ey.a.run.app")
+# Comma-separated toolbox endpoints, in order of preference, balanced by
+# `ToolboxBalancer`; e.g. a local sidecar followed by the Cloud Run service
+TOOLBOX_URLS = os.environ.get("TOOLBOX_URLS", TOOLBOX_URL)
+TOOLSET_NAME = "health-assistant-toolset"
+TOOLS_FILE = os.path.join(TOOLS_DIR, "tools.yaml")
+SCHEMA_CACHE_DIR = os.environ.get(
+    "TOOLBOX_SCHEMA_CACHE_DIR", os.path.join(TOOLS_DIR, ".toolbox_cache")
+)
+# Per-user reads served from the shared user cache, and the writes that
+# invalidate a user's cached reads
+CACHED_READ_TOOLS = frozenset({"get_fitness_data_for_user"})
+USER_WRITE_TOOLS = frozenset(
+    {"register_user", "add_workout_plan", "add_weekly_workout_plan"}
+)
+# Writes that create a user, recorded in the registered email index
+REGISTRATION_TOOLS = frozenset({"register_user"})
+# Connection pool shared by the toolbox calls of an event loop
+TOOLBOX_MAX_CONNECTIONS = int(os.environ.get("TOOLBOX_MAX_CONNECTIONS", "64"))
+TOOLBOX_KEEPALIVE_SECONDS = float(os.environ.get("TOOLBOX_KEEPALIVE_SECONDS", "60"))
+
+
+class LazyToolboxTool:
+    """An async stand-in for a toolbox tool that is built from a cached schema.
+
+    It exposes the same introspection attributes as `ToolboxTool`
+    (`__name__`, `__doc__`, `__signature__`, `__annotations__`) so ADK can build
+    the function declaration, but only loads the real tool on the first call.
+    Per-user reads go through the shared user cache, per-user writes
+    invalidate it, and registrations are written through to the email index.
+    """
+
+    def __init__(
+        self, registry: "ToolboxRegistry", name: str, schema: ToolSchema
+    ) -> None:
+        params = [p for p in schema.parameters if not p.authSources]
+        ordered = itertools.chain(
+            (p for p in params if p.required), (p for p in params if not p.required)
+        )
+        inspect_params = [p.to_param() for p in ordered]
+
+        self._registry = registry
+        self.__name__ = name
+        self.__qualname__ = f"{self.__class__.__qualname__}.{name}"
+        self.__doc__ = create_func_docstring(schema.description, params)
+        self.__signature__ = Signature(parameters=inspect_params, return_annotation=str)
+        self.__annotations__ = {p.name: p.annotation for p in inspect_params}
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> str:
+        email = self.__signature__.bind_partial(*args, **kwargs).arguments.get("email")
+
+        async def invoke() -> str:
+            return await self._registry.invoke(self.__name__, *args, **kwargs)
+
+        if not email:
+            return await invoke()
+        if self.__name__ in CACHED_READ_TOOLS:
+            return await get_user_cache().get_or_load_async(
+                email, self.__name__, invoke
+            )
+        try:
+            result = await invoke()
+        finally:
+            if self.__name__ in USER_WRITE_TOOLS:
+                get_user_cache().invalidate(email)
+        if self.__name__ in REGISTRATION_TOOLS:
+            from app.utils.user_index import get_user_index
+
+            get_user_index().add(email)
+        return result
+
+
+class ToolboxRegistry:
+    """Loads a toolbox toolset once per process and shares it across agents.
+
+    Tool schemas are persisted to a local JSON file, so building the agent graph
+    on a warm cache does not touch the network. On a cold cache the schemas are
+    seeded from the bundled `tools.yaml` the server is deployed with. The actual
+    toolbox client is only created when a tool is invoked for the first time,
+    and a schema drift detected at that point rewrites the cache.
+
+    An `aiohttp` session is bound to the event loop that created it, and
+    callers such as `Runner.run` start a new loop per request. Like
+    `ToolboxSyncClient`, the registry therefore runs the async client on one
+    background loop of its own, where the pooled session and the loaded
+    toolsets live for the life of the process, and callers await the calls
+    from whichever loop they run on. With several endpoints, every call goes
+    to the one picked by a `ToolboxBalancer`, which that loop health-checks. A call that cannot connect is
+    retried on another endpoint; any other failure is not, since the writes
+    are not idempotent. A `sqlite://` URL runs the tools with `LocalToolbox`
+    instead, shared by all loops and called in a worker thread.
+    """
+
+    def __init__(
+        self,
+        url: str = TOOLBOX_URLS,
+        toolset: str = TOOLSET_NAME,
+        cache_dir: str | None = SCHEMA_CACHE_DIR,
+        tools_file: str | None = TOOLS_FILE,
+    ) -> None:
+        """
+        Args:
+            url: Base URL of the toolbox server, several comma-separated URLs
+                to balance across, or a `sqlite:///path` URL to run the tools
+                locally with `LocalToolbox`.
+            toolset: Name of the toolset to load.
+            cache_dir: Directory holding the schema cache file. `None` disables
+                the on-disk cache.
+            tools_file: Toolbox `tools.yaml` used to seed the schemas on a cold
+                cache. `None` always asks the server instead.
+        """
+        self.url = url
+        self.toolset = toolset
+        self.tools_file = tools_file
+        self.cache_path = (
+            os.path.join(cache_dir, f"{toolset}.json") if cache_dir else None
+        )
+        self._lock = threading.Lock()
+        self._schemas: dict[str, ToolSchema] | None = None
+        self._local_tools: dict[str, Callable[..., Any]] | None = None
+        self.urls = [u.strip() for u in url.split(",") if u.strip()]
+        self.balancer = ToolboxBalancer(self.urls)
+        # Client state, only touched from the background loop
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._client_session: aiohttp.ClientSession | None = None
+        # Endpoint URL -> task loading the toolset from it
+        self._endpoint_tools: dict[str, asyncio.Task] = {}
+        self._health_checks: asyncio.Task | None = None
+        self._lazy_tools: dict[str, LazyToolboxTool] = {}
+
+    def tools(self, names: Sequence[str] | None = None) -> list[LazyToolboxTool]:
+        """Returns lazily-resolved tools, optionally restricted to `names`."""
+        schemas = self.schemas()
+        selected = list(schemas) if names is None else list(names)
+        missing = [name for name in selected if name not in schemas]
+        if missing:
+            raise ValueError(
+                f"Tools not found in toolset '{self.toolset}': {', '.join(missing)}"
+            )
+        with self._lock:
+            for name in selected:
+                if name not in self._lazy_tools:
+                    self._lazy_tools[name] = LazyToolboxTool(self, name, schemas[name])
+        return [self._lazy_tools[name] for name in selected]
+
+    def schemas(self) -> dict[str, ToolSchema]:
+        """Returns the tool schemas, from the cache file or from the server."""
+        if self._schemas is None:
+            with self._lock:
+                if self._schemas is None:
+                    self._schemas = self._read_cache() or self._read_tools_file()
+        if self._schemas is None:
+            # Neither a cache nor a tools file: ask the server, on a private
+            # event loop since the caller may be running one already
+            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+                pool.submit(asyncio.run, self._fetch_schemas()).result()
+        assert self._schemas is not None
+        return self._schemas
+
+    async def invoke(self, name: str, *args: Any, **kwargs: Any) -> str:
+        """Calls a toolbox tool, loading the toolset on first use."""
+        if self.url.startswith(LOCAL_TOOLBOX_SCHEME):
+            tool = (await self._local_toolset())[name]
+            # Local tools run blocking statements
+            return await asyncio.to_thread(tool, *args, **kwargs)
+
+        future = asyncio.run_coroutine_threadsafe(
+            self._invoke_remote(name, *args, **kwargs), self._background_loop()
+        )
+        # Cancelling the caller cancels the call on the background loop
+        return await asyncio.wrap_future(future)
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        """Returns the loop running the async client, starting it if needed."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="toolbox-client", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.close)
+            return self._loop
+
+    async def _invoke_remote(self, name: str, *args: Any, **kwargs: Any) -> str:
+        """Calls a toolbox server tool; runs on the background loop."""
+        self._start_health_checks()
+        failed: list[ToolboxEndpoint] = []
+        while True:
+            endpoint = self.balancer.acquire(exclude=failed)
+            start = time.monotonic()
+            try:
+                tools = await self._endpoint_toolset(endpoint.url)
+                result = await tools[name](*args, **kwargs)
+            except aiohttp.ClientConnectorError:
+                # The call never reached the endpoint, so another one may serve it
+                self.balancer.release(endpoint, time.monotonic() - start, ok=False)
+                failed.append(endpoint)
+                if len(failed) == len(self.balancer.endpoints):
+                    raise
+                continue
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                self.balancer.release(endpoint, time.monotonic() - start, ok=False)
+                raise
+            except asyncio.CancelledError:
+                self.balancer.release(endpoint, None)
+                raise
+            except Exception:
+                # The endpoint answered, with a tool error
+                self.balancer.release(endpoint, time.monotonic() - start)
+                raise
+            self.balancer.release(endpoint, time.monotonic() - start)
+            return result
+
+    async def _endpoint_toolset(self, url: str) -> dict[str, Callable[..., Any]]:
+        """Returns an endpoint's toolset, loaded once."""
+        task = self._endpoint_tools.get(url)
+        if task is None or (
+            task.done() and (task.cancelled() or task.exception() is not None)
+        ):
+            # Concurrent first calls share one load
+            task = asyncio.get_running_loop().create_task(self._load_toolset(url))
+            self._endpoint_tools[url] = task
+        return await asyncio.shield(task)
+
+    async def _load_toolset(self, url: str) -> dict[str, Callable[..., Any]]:
+        """Loads an endpoint's toolset with the pooled session."""
+        client = ToolboxClient(url, session=self._session())
+        tools = await client.load_toolset(self.toolset)
+        self._update_schemas(tools)
+        return {tool.__name__: tool for tool in tools}
+
+    def _start_health_checks(self) -> None:
+        if len(self.balancer.endpoints) < 2 or self._health_checks is not None:
+            return
+        self._health_checks = asyncio.get_running_loop().create_task(
+            self.balancer.run_health_checks(self._session())
+        )
+
+    async def _local_toolset(self) -> dict[str, Callable[..., Any]]:
+        if self._local_tools is None:
+            from app.utils.local_toolbox import LocalToolbox
+
+            def load() -> list[Any]:
+                toolbox = LocalToolbox.from_url(self.url, self.tools_file or TOOLS_FILE)
+                return toolbox.load_toolset(self.toolset)
+
+            tools = await asyncio.to_thread(load)
+            self._update_schemas(tools)
+            with self._lock:
+                if self._local_tools is None:
+                    self._local_tools = {tool.__name__: tool for tool in tools}
+        return self._local_tools
+
+    async def _fetch_schemas(self) -> None:
+        if self.url.startswith(LOCAL_TOOLBOX_SCHEME):
+            await self._local_toolset()
+            return
+        async with aiohttp.ClientSession() as session:
+            endpoint = self.balancer.endpoints[0]
+            client = ToolboxClient(endpoint.url, session=session)
+            self._update_schemas(await client.load_toolset(self.toolset))
+
+    def _session(self) -> aiohttp.ClientSession:
+        if self._client_session is None or self._client_session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=TOOLBOX_MAX_CONNECTIONS,
+                keepalive_timeout=TOOLBOX_KEEPALIVE_SECONDS,
+            )
+            self._client_session = aiohttp.ClientSession(connector=connector)
+        return self._client_session
+
+    async def _close_client(self) -> None:
+        """Drops the client state; runs on the background loop."""
+        if self._health_checks is not None:
+            self._health_checks.cancel()
+        self._health_checks = None
+        self._endpoint_tools.clear()
+        if self._client_session is not None:
+            await self._client_session.close()
+        self._client_session = None
+
+    def close(self) -> None:
+        """Closes the pooled session and stops the background loop.
+
+        The next call starts them again, e.g. after a fork.
+        """
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None:
+            return
+        atexit.unregister(self.close)
+        asyncio.run_coroutine_threadsafe(self._close_client(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    async def aclose(self) -> None:
+        """Like `close`, for async callers, e.g. on server shutdown."""
+        await asyncio.to_thread(self.close)
+
+    def _update_schemas(self, tools: Sequence[Any]) -> None:
+        """Refreshes the schema cache if the loaded tools differ from it."""
+        schemas = {
+            tool.__name__: ToolSchema(
+                description=tool._description, parameters=list(tool._params)
+            )
+            for tool in tools
+        }
+        with self._lock:
+            if schemas == self._schemas:
+                if self.cache_path and not os.path.exists(self.cache_path):
+                    self._write_cache(schemas)
+                return
+            if self._schemas is not None:
+                logging.warning(
+                    f"Toolbox schema for '{self.toolset}' differs from the local copy"
+                )
+            self._schemas = schemas
+            self._write_cache(schemas)
+
+    def _read_cache(self) -> dict[str, ToolSchema] | None:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+            if cached.get("url") != self.url:
+                return None
+            return {
+                name: ToolSchema.model_validate(schema)
+                for name, schema in cached["tools"].items()
+            }
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable toolbox schema cache: {e}")
+            return None
+
+    def _read_tools_file(self) -> dict[str, ToolSchema] | None:
+        if not self.tools_file or not os.path.exists(self.tools_file):
+            return None
+        try:
+            with open(self.tools_file) as f:
+                config = yaml.safe_load(f)
+            return {
+                name: ToolSchema(
+                    description=config["tools"][name]["description"],
+                    parameters=[
+                        ParameterSchema.model_validate({"required": True, **param})
+                        for param in config["tools"][name].get("parameters", [])
+                    ],
+                )
+                for name in config["toolsets"][self.toolset]
+            }
+        except (OSError, ValueError, KeyError, yaml.YAMLError) as e:
+            logging.warning(
+                f"Could not read toolbox schemas from {self.tools_file}: {e}"
+            )
+            return None
+
+    def _write_cache(self, schemas: dict[str, ToolSchema]) -> None:
+        if not self.cache_path:
+            return
+        payload = {
+            "url": self.url,
+            "toolset": self.toolset,
+            "tools": {name: schema.model_dump() for name, schema in schemas.items()},
+        }
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(payload, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logging.warning(f"Could not write toolbox schema cache: {e}")
+
+
+_registry: ToolboxRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_toolbox_registry() -> ToolboxRegistry:
+    """Returns the process-wide toolbox registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ToolboxRegistry()
+    return _registry
+
+
+def get_toolbox_tools(*names: str) -> list[LazyToolboxTool]:
+    """Returns the shared toolbox tools, all of them when no names are given."""
+    return get_toolbox_registry().tools(names or None)
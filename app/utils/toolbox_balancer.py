@@ -0,0 +1,288 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Client-side load balancing across toolbox server replicas.
+
+TOOLBOX_URLS lists the endpoints in order of preference, e.g. a local
+sidecar (see `app/tools/docker-compose.yml`) followed by Cloud Run replicas.
+`ToolboxBalancer` picks an endpoint for every tool call:
+
+- Least outstanding requests, weighted by latency: the endpoint with the
+  lowest `(outstanding + 1) * latency` wins, where latency is an
+  exponentially weighted moving average of its recent calls. Ties go to the
+  endpoint listed first.
+- Slow start: an endpoint without a latency estimate yet, on startup or
+  after an ejection, takes one call at a time until its first call returns,
+  so a cold replica does not soak up a burst of calls.
+- Ejection: an endpoint whose latency exceeds TOOLBOX_SLOW_FACTOR times the
+  best endpoint's over TOOLBOX_SLOW_MIN_CALLS calls, or TOOLBOX_FAR_SLOW_FACTOR
+  times on any call including its first, or that fails
+  TOOLBOX_EJECT_FAILURES calls in a row, is taken out of rotation for
+  TOOLBOX_EJECT_SECONDS. It comes back with a
+  fresh latency estimate, unless it keeps failing its health checks.
+- Active health checks: `run_health_checks` probes every endpoint every
+  TOOLBOX_HEALTH_CHECK_SECONDS and skips endpoints that fail the probe.
+
+The last available endpoint is never ejected, and when every endpoint is
+out of rotation the least bad one is used rather than failing the call.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+TOOLBOX_HEALTH_CHECK_SECONDS = float(
+    os.environ.get("TOOLBOX_HEALTH_CHECK_SECONDS", "10")
+)
+TOOLBOX_HEALTH_CHECK_TIMEOUT = float(
+    os.environ.get("TOOLBOX_HEALTH_CHECK_TIMEOUT", "2")
+)
+TOOLBOX_EJECT_SECONDS = float(os.environ.get("TOOLBOX_EJECT_SECONDS", "30"))
+TOOLBOX_EJECT_FAILURES = int(os.environ.get("TOOLBOX_EJECT_FAILURES", "3"))
+TOOLBOX_SLOW_FACTOR = float(os.environ.get("TOOLBOX_SLOW_FACTOR", "3"))
+# Calls an endpoint needs before it can be ejected for being slow
+TOOLBOX_SLOW_MIN_CALLS = int(os.environ.get("TOOLBOX_SLOW_MIN_CALLS", "5"))
+# Latency relative to the best endpoint that ejects an endpoint on one call
+TOOLBOX_FAR_SLOW_FACTOR = float(os.environ.get("TOOLBOX_FAR_SLOW_FACTOR", "5"))
+# Weight of the latest call in the latency average
+LATENCY_SMOOTHING = 0.3
+
+
+@dataclass(eq=False)
+class ToolboxEndpoint:
+    """A toolbox server replica and what the balancer knows about it.
+
+    Attributes:
+        url: Base URL of the toolbox server.
+        outstanding: Calls in flight.
+        latency: Moving average of the call latency in seconds, None until
+            the first call completes.
+        calls: Calls completed since the latency was last reset.
+        failures: Consecutive failed calls.
+        healthy: Whether the last health check passed.
+        ejected_until: Clock time at which an ejection ends, 0 if not ejected.
+        ejections: Number of times the endpoint was ejected.
+    """
+
+    url: str
+    outstanding: int = 0
+    latency: float | None = None
+    calls: int = 0
+    failures: int = 0
+    healthy: bool = True
+    ejected_until: float = 0.0
+    ejections: int = 0
+
+
+class ToolboxBalancer:
+    """Latency-weighted least-outstanding-requests balancer with ejection."""
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        eject_seconds: float = TOOLBOX_EJECT_SECONDS,
+        eject_failures: int = TOOLBOX_EJECT_FAILURES,
+        slow_factor: float = TOOLBOX_SLOW_FACTOR,
+        slow_min_calls: int = TOOLBOX_SLOW_MIN_CALLS,
+        far_slow_factor: float = TOOLBOX_FAR_SLOW_FACTOR,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            urls: Endpoint base URLs, in order of preference.
+            eject_seconds: How long an ejected endpoint stays out of rotation.
+            eject_failures: Consecutive failed calls that eject an endpoint.
+            slow_factor: Latency, relative to the fastest available endpoint,
+                above which an endpoint is ejected.
+            slow_min_calls: Calls an endpoint needs before it can be ejected
+                for being slow.
+            far_slow_factor: Latency, relative to the fastest available
+                endpoint, above which an endpoint is ejected even before
+                `slow_min_calls` calls, e.g. a cold replica on its first call.
+            clock: Monotonic clock, replaceable in tests.
+        """
+        if not urls:
+            raise ValueError("At least one toolbox endpoint is required")
+        self.endpoints = [ToolboxEndpoint(url.rstrip("/")) for url in urls]
+        self.eject_seconds = eject_seconds
+        self.eject_failures = eject_failures
+        self.slow_factor = slow_factor
+        self.slow_min_calls = slow_min_calls
+        self.far_slow_factor = far_slow_factor
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def acquire(self, exclude: Iterable[ToolboxEndpoint] = ()) -> ToolboxEndpoint:
+        """Picks the endpoint for a call and counts the call as outstanding.
+
+        Args:
+            exclude: Endpoints not to pick, e.g. ones that already failed the
+                call. Ignored if it would leave no endpoint.
+
+        Returns:
+            The endpoint to call; pass it to `release` when the call is done.
+        """
+        excluded = set(map(id, exclude))
+        with self._lock:
+            now = self._clock()
+            candidates = [e for e in self.endpoints if id(e) not in excluded]
+            available = [
+                e for e in candidates or self.endpoints if self._available(e, now)
+            ]
+            if not available:
+                # Everything is out of rotation: prefer the earliest to return
+                pool = candidates or self.endpoints
+                available = [min(pool, key=lambda e: (not e.healthy, e.ejected_until))]
+            # Slow start: one call at a time until the latency is known
+            ready = [e for e in available if e.latency is not None or not e.outstanding]
+            if ready:
+                known = [e.latency for e in ready if e.latency is not None]
+                # Endpoints without calls yet are assumed as fast as the fastest
+                default = min(known) if known else 1.0
+                endpoint = min(
+                    ready,
+                    key=lambda e: (
+                        (e.outstanding + 1)
+                        * (e.latency if e.latency is not None else default)
+                    ),
+                )
+            else:
+                # Every endpoint awaits its first call: go by preference
+                endpoint = available[0]
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(
+        self, endpoint: ToolboxEndpoint, seconds: float | None, ok: bool = True
+    ) -> None:
+        """Records the outcome of a call made with `acquire`.
+
+        Args:
+            endpoint: The endpoint that served the call.
+            seconds: How long the call took, or None if it was cancelled.
+            ok: False if the endpoint could not be reached or did not answer.
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            if seconds is None:
+                return
+            if not ok:
+                endpoint.failures += 1
+                if endpoint.failures >= self.eject_failures:
+                    self._eject_locked(endpoint)
+                return
+            endpoint.failures = 0
+            endpoint.calls += 1
+            if endpoint.latency is None:
+                endpoint.latency = seconds
+            else:
+                endpoint.latency += LATENCY_SMOOTHING * (seconds - endpoint.latency)
+            factor = (
+                self.slow_factor
+                if endpoint.calls >= self.slow_min_calls
+                else self.far_slow_factor
+            )
+            now = self._clock()
+            others = [
+                e.latency
+                for e in self.endpoints
+                if e is not endpoint
+                and e.latency is not None
+                and self._available(e, now)
+            ]
+            if others and endpoint.latency > factor * min(others):
+                self._eject_locked(endpoint)
+
+    def record_health(self, endpoint: ToolboxEndpoint, ok: bool) -> None:
+        """Records the result of a health check of an endpoint."""
+        with self._lock:
+            endpoint.healthy = ok
+            if not ok and endpoint.ejected_until:
+                # Keep failing endpoints out until they pass a check
+                endpoint.ejected_until = max(
+                    endpoint.ejected_until, self._clock() + self.eject_seconds
+                )
+
+    def _available(self, endpoint: ToolboxEndpoint, now: float) -> bool:
+        if endpoint.ejected_until:
+            if endpoint.ejected_until > now:
+                return False
+            # Back in rotation with a fresh start
+            endpoint.ejected_until = 0.0
+            endpoint.latency = None
+            endpoint.calls = endpoint.failures = 0
+        return endpoint.healthy
+
+    def _eject_locked(self, endpoint: ToolboxEndpoint) -> None:
+        now = self._clock()
+        if endpoint.ejected_until > now:
+            # Calls still in flight return after the ejection
+            return
+        if not any(
+            self._available(e, now) for e in self.endpoints if e is not endpoint
+        ):
+            return
+        endpoint.ejected_until = now + self.eject_seconds
+        endpoint.ejections += 1
+
+    async def run_health_checks(
+        self,
+        session: Any,
+        interval: float = TOOLBOX_HEALTH_CHECK_SECONDS,
+        timeout: float = TOOLBOX_HEALTH_CHECK_TIMEOUT,
+    ) -> None:
+        """Probes every endpoint forever, every `interval` seconds.
+
+        Args:
+            session: `aiohttp` session to probe with.
+            interval: Seconds between two rounds of probes.
+            timeout: Seconds after which a probe fails.
+        """
+        import aiohttp
+
+        async def probe(endpoint: ToolboxEndpoint) -> None:
+            try:
+                async with session.get(
+                    f"{endpoint.url}/", timeout=aiohttp.ClientTimeout(total=timeout)
+                ) as response:
+                    ok = response.status < 500
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                ok = False
+            self.record_health(endpoint, ok)
+
+        while True:
+            await asyncio.gather(*(probe(endpoint) for endpoint in self.endpoints))
+            await asyncio.sleep(interval)
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Returns the state of every endpoint."""
+        with self._lock:
+            now = self._clock()
+            return [
+                {
+                    "url": e.url,
+                    "outstanding": e.outstanding,
+                    "latency_ms": round(e.latency * 1000, 1)
+                    if e.latency is not None
+                    else None,
+                    "healthy": e.healthy,
+                    "ejected": e.ejected_until > now,
+                    "ejections": e.ejections,
+                }
+                for e in self.endpoints
+            ]
@@ -0,0 +1,201 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Read-through cache of per-user data shared by the fitness and nutrition tools.
+
+The same user's profile and fitness data are read by several tools, often
+several times in one conversation. `UserDataCache` keeps the result of each
+read per user, under the name of the read, for a limited time and for a
+bounded number of users. Tools that write a user's data call `invalidate`,
+which drops everything cached for that user, and a read that was already in
+flight when the write happened is not stored.
+
+Hits, misses and the load time the hits saved are kept as counters; `stats`
+returns them and every lookup records the outcome on the current trace span.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+USER_CACHE_TTL_SECONDS = float(os.environ.get("USER_CACHE_TTL_SECONDS", "300"))
+USER_CACHE_MAX_USERS = int(os.environ.get("USER_CACHE_MAX_USERS", "1024"))
+
+T = TypeVar("T")
+
+
+@dataclass(eq=False)
+class _UserEntry:
+    # Read name -> (value, expires at, seconds the load took)
+    values: dict[str, tuple[Any, float, float]] = field(default_factory=dict)
+
+
+def normalize_email(email: str) -> str:
+    """Returns the cache key of a user's email."""
+    return email.strip().casefold()
+
+
+def _record_on_span(kind: str, hit: bool, saved_seconds: float) -> None:
+    from opentelemetry import trace
+
+    span = trace.get_current_span()
+    span.set_attribute("user_cache.kind", kind)
+    span.set_attribute("user_cache.hit", hit)
+    if hit:
+        span.set_attribute("user_cache.saved_ms", round(saved_seconds * 1000, 1))
+
+
+class UserDataCache:
+    """TTL- and size-bounded read-through cache keyed by user email."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = USER_CACHE_TTL_SECONDS,
+        max_users: int = USER_CACHE_MAX_USERS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            ttl_seconds: How long a cached read stays valid.
+            max_users: Number of users kept; the least recently used user is
+                evicted beyond that.
+            clock: Monotonic clock, replaceable in tests.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self._clock = clock
+        self._users: OrderedDict[str, _UserEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+
+    def get_or_load(self, email: str, kind: str, load: Callable[[], T]) -> T:
+        """Returns a user's cached read, loading and caching it on a miss.
+
+        Args:
+            email: The user the read belongs to.
+            kind: Name of the read, e.g. the tool or query it comes from.
+            load: Performs the read. A result of None is not cached.
+
+        Returns:
+            The cached or freshly loaded result.
+        """
+        hit, value, entry = self._lookup(email, kind)
+        if hit:
+            return value
+        start = self._clock()
+        value = load()
+        self._store(email, kind, entry, value, start)
+        return value
+
+    async def get_or_load_async(
+        self, email: str, kind: str, load: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Like `get_or_load`, for reads that are coroutines."""
+        hit, value, entry = self._lookup(email, kind)
+        if hit:
+            return value
+        start = self._clock()
+        value = await load()
+        self._store(email, kind, entry, value, start)
+        return value
+
+    def _lookup(self, email: str, kind: str) -> tuple[bool, Any, _UserEntry]:
+        """Returns whether a read is cached, its value, and the user's entry."""
+        key = normalize_email(email)
+        now = self._clock()
+        with self._lock:
+            entry = self._users.get(key)
+            cached = entry.values.get(kind) if entry else None
+            if cached is not None and cached[1] > now:
+                self._users.move_to_end(key)
+                self.hits += 1
+                self.saved_seconds += cached[2]
+                value, _, load_seconds = cached
+                hit = True
+            else:
+                self.misses += 1
+                if entry is None:
+                    entry = self._users[key] = _UserEntry()
+                    self._evict_locked()
+                value, load_seconds, hit = None, 0.0, False
+        _record_on_span(kind, hit, load_seconds)
+        return hit, value, entry
+
+    def _store(
+        self, email: str, kind: str, entry: _UserEntry, value: Any, start: float
+    ) -> None:
+        load_seconds = self._clock() - start
+        if value is None:
+            return
+        key = normalize_email(email)
+        with self._lock:
+            # An invalidation replaces the entry: the value may predate the write
+            if self._users.get(key) is entry:
+                self._users.move_to_end(key)
+                entry.values[kind] = (value, start + self.ttl_seconds, load_seconds)
+
+    def _evict_locked(self) -> None:
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, email: str) -> None:
+        """Drops everything cached for a user, e.g. after writing their data."""
+        key = normalize_email(email)
+        with self._lock:
+            self._users.pop(key, None)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drops all cached reads and resets the counters."""
+        with self._lock:
+            self._users.clear()
+            self.hits = self.misses = self.invalidations = self.evictions = 0
+            self.saved_seconds = 0.0
+
+    def stats(self) -> dict[str, Any]:
+        """Returns the cache counters, hit ratio and load time saved."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "users": len(self._users),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "latency_saved_seconds": round(self.saved_seconds, 3),
+            }
+
+
+_cache: UserDataCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_user_cache() -> UserDataCache:
+    """Returns the process-wide user data cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = UserDataCache()
+    return _cache
@@ -0,0 +1,171 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-process index of registered user emails.
+
+`is_user_registered` answers from a set of the emails in `user_profiles`
+instead of listing every user into the model's context. The set is loaded on
+first use and refreshed in the background once it is older than
+USER_INDEX_REFRESH_SECONDS; lookups never wait for a refresh, and a failed
+refresh is retried after USER_INDEX_RETRY_SECONDS. Registrations
+made through this worker are written through immediately, while those made
+by other workers show up with the next refresh.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+
+from app.utils.clients import get_bigquery_client
+from app.utils.environment import get_project_id
+from app.utils.fitness_data import FITNESS_DATASET
+from app.utils.user_cache import normalize_email
+
+USER_PROFILES_TABLE = "user_profiles"
+USER_INDEX_REFRESH_SECONDS = float(os.environ.get("USER_INDEX_REFRESH_SECONDS", "60"))
+USER_INDEX_RETRY_SECONDS = float(os.environ.get("USER_INDEX_RETRY_SECONDS", "10"))
+
+
+def load_registered_emails() -> Iterable[str]:
+    """Reads every registered email from BigQuery."""
+    table = f"{get_project_id()}.{FITNESS_DATASET}.{USER_PROFILES_TABLE}"
+    rows = get_bigquery_client().query(f"SELECT DISTINCT email FROM `{table}`")
+    return (row["email"] for row in rows)
+
+
+class UserEmailIndex:
+    """Set of registered emails with background refresh and write-through."""
+
+    def __init__(
+        self,
+        load: Callable[[], Iterable[str]] = load_registered_emails,
+        refresh_seconds: float = USER_INDEX_REFRESH_SECONDS,
+        retry_seconds: float = USER_INDEX_RETRY_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            load: Returns every registered email.
+            refresh_seconds: Age after which a lookup triggers a refresh.
+            retry_seconds: Delay before a lookup retries a failed refresh.
+            clock: Monotonic clock, replaceable in tests.
+        """
+        self._load = load
+        self.refresh_seconds = refresh_seconds
+        self.retry_seconds = retry_seconds
+        self._clock = clock
+        self._emails: set[str] | None = None
+        # Emails added since the running refresh started reading
+        self._added_during_refresh: set[str] = set()
+        self.loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._first_load_lock = threading.Lock()
+        self._refreshing = False
+
+    def contains(self, email: str) -> bool:
+        """Returns whether an email is registered, as of the last refresh."""
+        if self._emails is None:
+            with self._first_load_lock:
+                if self._emails is None:
+                    self.refresh()
+        elif self._clock() - self.loaded_at > self.refresh_seconds:
+            self._refresh_in_background()
+        assert self._emails is not None
+        return normalize_email(email) in self._emails
+
+    def add(self, email: str) -> None:
+        """Records a registration made by this worker."""
+        key = normalize_email(email)
+        with self._lock:
+            if self._emails is not None:
+                self._emails.add(key)
+            if self._refreshing:
+                self._added_during_refresh.add(key)
+
+    def refresh(self) -> None:
+        """Reloads the index from the source."""
+        with self._lock:
+            self._refreshing = True
+        try:
+            started = self._clock()
+            emails = {normalize_email(email) for email in self._load()}
+            with self._lock:
+                self._emails = emails | self._added_during_refresh
+                self.loaded_at = started
+        finally:
+            with self._lock:
+                self._refreshing = False
+                self._added_during_refresh = set()
+
+    def __len__(self) -> int:
+        return len(self._emails or ())
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run() -> None:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ Could not refresh the user index: {e}")
+                with self._lock:
+                    # The stale index keeps answering until the retry is due
+                    self.loaded_at = (
+                        self._clock() - self.refresh_seconds + self.retry_seconds
+                    )
+
+        threading.Thread(target=run, name="user-index-refresh", daemon=True).start()
+
+
+_index: UserEmailIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_user_index() -> UserEmailIndex:
+    """Returns the process-wide registered email index."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = UserEmailIndex()
+    return _index
+
+
+async def is_user_registered(email: str) -> dict:
+    """Checks whether a user with this email is already registered.
+
+    Use this before registering a user instead of listing all users.
+
+    Args:
+        email: The email of the user to check.
+
+    Returns:
+        Dictionary with the status and whether the email is registered.
+    """
+    try:
+        index = get_user_index()
+        # The first lookup loads the index from BigQuery, off the event loop
+        registered = await asyncio.to_thread(index.contains, email)
+        print(f"🔎 {email} is {'already' if registered else 'not yet'} registered")
+        return {"status": "success", "email": email, "registered": registered}
+
+    except Exception as e:
+        error_message = f"Could not check the registration: {e!s}"
+        print(f"❌ {error_message}")
+        return {"status": "error", "message": error_message}
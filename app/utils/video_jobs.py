@@ -0,0 +1,630 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Asynchronous Veo video generation jobs with a background poller.
+
+Submitting a job only starts the long-running Veo operation and returns
+immediately. A single daemon thread per manager polls all running operations
+with an exponential backoff, and stores the finished video in GCS, so no
+request thread ever waits for a generation to complete.
+
+Requests are content-addressed: identical (normalized) requests share one job,
+and finished videos are stored in the bucket under a key derived from the
+request, so a request that was rendered before is answered from GCS without
+calling Veo again.
+
+Video bytes never touch the local disk. On Vertex AI, Veo writes the video
+straight to the bucket. Otherwise the downloaded bytes are kept in one buffer
+that is streamed to GCS and shared with the inline artifact. Finished jobs
+are kept for VEO_JOB_TTL_SECONDS, and the buffer of a video stored in GCS
+only for VEO_BUFFER_TTL_SECONDS, after which artifacts read the GCS object.
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any
+
+from app.utils.clients import get_genai_client, get_storage_client
+
+VEO_MODEL = "veo-3.0-generate-001"
+VIDEO_BUCKET_NAME = "qwiklabs-gcp-00-a489584c5286-adk-videos"
+VIDEO_MIME_TYPE = "video/mp4"
+VIDEO_CACHE_PREFIX = "veo_cache"
+# Batch scheduling limits, kept below the Veo per-project quota by default
+MAX_CONCURRENT_JOBS = int(os.environ.get("VEO_MAX_CONCURRENT_JOBS", "8"))
+SUBMITS_PER_MINUTE = float(os.environ.get("VEO_SUBMITS_PER_MINUTE", "10"))
+# How long finished jobs and batches, and the buffers of stored videos, are kept
+JOB_TTL_SECONDS = float(os.environ.get("VEO_JOB_TTL_SECONDS", "3600"))
+BUFFER_TTL_SECONDS = float(os.environ.get("VEO_BUFFER_TTL_SECONDS", "300"))
+
+
+def video_cache_key(prompt: str, aspect_ratio: str, negative_prompt: str = "") -> str:
+    """Returns the content address of a Veo request.
+
+    Case and whitespace differences in the prompts do not change the key.
+    """
+
+    def normalize(text: str) -> str:
+        return " ".join(text.split()).casefold()
+
+    request = [
+        VEO_MODEL,
+        normalize(prompt),
+        aspect_ratio.strip(),
+        normalize(negative_prompt),
+    ]
+    return hashlib.sha256(json.dumps(request).encode()).hexdigest()
+
+
+@dataclasses.dataclass
+class VideoJob:
+    """State of one Veo generation request."""
+
+    job_id: str
+    prompt: str
+    aspect_ratio: str
+    operation: Any
+    submitted_at: float
+    status: str = "running"
+    poll_interval: float = 0.0
+    next_poll_at: float = 0.0
+    polls: int = 0
+    finished_at: float | None = None
+    filename: str | None = None
+    gcs_url: str | None = None
+    public_url: str | None = None
+    error: str | None = None
+    cache_key: str | None = None
+    cached: bool = False
+    size_bytes: int | None = None
+    # Downloaded video, only kept until it has been saved as an artifact
+    video_bytes: bytes | None = dataclasses.field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status != "running"
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.submitted_at
+
+
+@dataclasses.dataclass
+class VideoBatch:
+    """A list of Veo requests that the manager submits as capacity allows.
+
+    `jobs[i]` is None while request `i` is still queued, and `errors[i]` is set
+    if it could not be submitted.
+    """
+
+    batch_id: str
+    requests: list[tuple[str, str, str]]
+    jobs: list[VideoJob | None]
+    errors: list[str | None]
+    submitted_at: float
+
+    def is_finished(self, index: int) -> bool:
+        job = self.jobs[index]
+        return self.errors[index] is not None or (job is not None and job.done)
+
+    @property
+    def done(self) -> bool:
+        return all(self.is_finished(i) for i in range(len(self.requests)))
+
+    @property
+    def finished_at(self) -> float | None:
+        if not self.done:
+            return None
+        return max(
+            (job.finished_at for job in self.jobs if job is not None),
+            default=self.submitted_at,
+        )
+
+
+class VideoJobManager:
+    """Submits Veo generations and polls them to completion in the background."""
+
+    def __init__(
+        self,
+        client: Any = None,
+        storage_client: Any = None,
+        bucket_name: str = VIDEO_BUCKET_NAME,
+        initial_interval: float = 15.0,
+        max_interval: float = 30.0,
+        backoff: float = 1.5,
+        max_concurrent: int = MAX_CONCURRENT_JOBS,
+        submits_per_minute: float = SUBMITS_PER_MINUTE,
+        job_ttl_seconds: float = JOB_TTL_SECONDS,
+        buffer_ttl_seconds: float = BUFFER_TTL_SECONDS,
+    ) -> None:
+        """
+        Args:
+            client: `genai.Client`-like object exposing `models.generate_videos`,
+                `operations.get` and `files.download`. Defaults to the shared
+                client.
+            storage_client: Cloud Storage client. Defaults to the shared client.
+            bucket_name: Bucket the finished videos are uploaded to.
+            initial_interval: Seconds before the first status poll of a job.
+            max_interval: Upper bound of the poll interval.
+            backoff: Factor the poll interval grows by after every poll.
+            max_concurrent: Running generations above which batch requests
+                stay queued.
+            submits_per_minute: Rate at which batch requests are submitted.
+            job_ttl_seconds: How long finished jobs and batches, with their
+                buffers, are kept.
+            buffer_ttl_seconds: How long the buffer of a video stored in GCS
+                is kept for artifacts.
+        """
+        self._client = client
+        self._storage_client = storage_client
+        self.bucket_name = bucket_name
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self._jobs: dict[str, VideoJob] = {}
+        self._by_key: dict[str, VideoJob] = {}
+        self.max_concurrent = max_concurrent
+        self.submit_interval = 60.0 / submits_per_minute
+        self.job_ttl_seconds = job_ttl_seconds
+        self.buffer_ttl_seconds = buffer_ttl_seconds
+        self._batches: dict[str, VideoBatch] = {}
+        self._queue: deque[tuple[VideoBatch, int]] = deque()
+        self._next_submit_at = 0.0
+        self._quota_backoff = self.submit_interval
+        self._cond = threading.Condition()
+        self._poller: threading.Thread | None = None
+        self._scheduler: threading.Thread | None = None
+
+    @property
+    def client(self) -> Any:
+        return self._client or get_genai_client()
+
+    @property
+    def storage_client(self) -> Any:
+        return self._storage_client or get_storage_client()
+
+    def submit(
+        self, prompt: str, aspect_ratio: str = "16:9", negative_prompt: str = ""
+    ) -> VideoJob:
+        """Starts a Veo generation and returns its job without waiting for it.
+
+        Identical requests are collapsed: a request already running or finished
+        in this process returns that job, and a request whose video is in the
+        cache bucket returns a job that has already succeeded.
+        """
+        from google.genai import types
+
+        key = video_cache_key(prompt, aspect_ratio, negative_prompt)
+        with self._cond:
+            self._evict_expired()
+            job = self._by_key.get(key)
+            if job is not None and job.status != "failed":
+                # Wait for the leader to start the generation or hit the cache
+                while job.operation is None and not job.done:
+                    self._cond.wait()
+                if job.status != "failed":
+                    return job
+            job = VideoJob(
+                job_id=uuid.uuid4().hex[:12],
+                prompt=prompt,
+                aspect_ratio=aspect_ratio,
+                operation=None,
+                submitted_at=time.monotonic(),
+                cache_key=key,
+            )
+            self._jobs[job.job_id] = job
+            self._by_key[key] = job
+
+        try:
+            cached = self.storage_client.bucket(self.bucket_name).get_blob(
+                self._cache_blob(key).name
+            )
+            if cached is not None:
+                gcs_url = f"gs://{self.bucket_name}/{cached.name}"
+                print(f"♻️ Reusing cached video: {gcs_url}")
+                self._complete(
+                    job,
+                    "succeeded",
+                    gcs_url=gcs_url,
+                    size_bytes=cached.size,
+                    cached=True,
+                )
+                return job
+        except Exception as e:
+            logging.warning(f"Video cache lookup failed: {e}")
+
+        try:
+            config = types.GenerateVideosConfig(
+                aspect_ratio=aspect_ratio,
+                negative_prompt=negative_prompt if negative_prompt else None,
+                # Let Vertex AI write the video to the bucket instead of returning it
+                output_gcs_uri=(
+                    f"gs://{self.bucket_name}/veo_jobs/{job.job_id}/"
+                    if getattr(self.client, "vertexai", False)
+                    else None
+                ),
+            )
+            operation = self.client.models.generate_videos(
+                model=VEO_MODEL, prompt=prompt, config=config
+            )
+        except Exception as e:
+            self._complete(job, "failed", error=f"Video generation failed: {e}")
+            raise
+        self._track(job, operation)
+        return job
+
+    def attach(
+        self,
+        job_id: str,
+        operation_name: str,
+        prompt: str,
+        aspect_ratio: str,
+        cache_key: str | None = None,
+    ) -> VideoJob:
+        """Resumes tracking a job that was submitted by another worker."""
+        from google.genai import types
+
+        with self._cond:
+            self._evict_expired()
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return job
+            job = VideoJob(
+                job_id=job_id,
+                prompt=prompt,
+                aspect_ratio=aspect_ratio,
+                operation=None,
+                submitted_at=time.monotonic(),
+                cache_key=cache_key,
+            )
+            self._jobs[job_id] = job
+        self._track(
+            job, types.GenerateVideosOperation(name=operation_name), poll_now=True
+        )
+        return job
+
+    def submit_batch(self, requests: list[tuple[str, str, str]]) -> VideoBatch:
+        """Queues (prompt, aspect_ratio, negative_prompt) requests as one batch.
+
+        Requests are submitted in order by a scheduler thread, at most
+        `submits_per_minute` at a time and while fewer than `max_concurrent`
+        generations are running. Submissions rejected for quota are retried
+        with an exponential backoff.
+        """
+        batch = VideoBatch(
+            batch_id=uuid.uuid4().hex[:12],
+            requests=list(requests),
+            jobs=[None] * len(requests),
+            errors=[None] * len(requests),
+            submitted_at=time.monotonic(),
+        )
+        with self._cond:
+            self._evict_expired()
+            self._batches[batch.batch_id] = batch
+            self._queue.extend((batch, i) for i in range(len(requests)))
+            if self._scheduler is None:
+                self._scheduler = threading.Thread(
+                    target=self._schedule, name="veo-batch-scheduler", daemon=True
+                )
+                self._scheduler.start()
+            self._cond.notify_all()
+        return batch
+
+    def get_batch(self, batch_id: str) -> VideoBatch | None:
+        with self._cond:
+            return self._batches.get(batch_id)
+
+    def wait_batch(
+        self, batch: VideoBatch, seen: set[int], timeout: float | None = None
+    ) -> list[int]:
+        """Blocks until a request outside `seen` finishes, or the timeout expires.
+
+        Returns:
+            Indices of all finished requests that are not in `seen`.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                finished = [
+                    i
+                    for i in range(len(batch.requests))
+                    if i not in seen and batch.is_finished(i)
+                ]
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if finished or batch.done or (remaining is not None and remaining <= 0):
+                    return finished
+                self._cond.wait(remaining)
+
+    def get(self, job_id: str) -> VideoJob | None:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id: str, timeout: float | None = None) -> VideoJob:
+        """Blocks until the job is done or the timeout expires."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            job = self._jobs[job_id]
+            while not job.done:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return job
+
+    def _track(self, job: VideoJob, operation: Any, poll_now: bool = False) -> None:
+        now = time.monotonic()
+        with self._cond:
+            job.operation = operation
+            job.poll_interval = self.initial_interval
+            job.next_poll_at = now if poll_now else now + self.initial_interval
+            if self._poller is None:
+                self._poller = threading.Thread(
+                    target=self._run, name="veo-job-poller", daemon=True
+                )
+                self._poller.start()
+            self._cond.notify_all()
+
+    def _complete(self, job: VideoJob, status: str, **fields: Any) -> None:
+        with self._cond:
+            for name, value in fields.items():
+                setattr(job, name, value)
+            if job.gcs_url:
+                job.public_url = f"https://storage.googleapis.com/{job.gcs_url.removeprefix('gs://')}"
+            if job.filename is None:
+                # Content-derived, so the same video keeps the same name
+                job.filename = f"veo_video_{(job.cache_key or job.job_id)[:16]}.mp4"
+            job.status = status
+            job.finished_at = time.monotonic()
+            if status == "failed" and self._by_key.get(job.cache_key) is job:
+                # Let the next identical request try again
+                del self._by_key[job.cache_key]
+            self._cond.notify_all()
+
+    def _evict_expired(self) -> None:
+        """Drops expired jobs, batches and buffers; called with the lock held."""
+        now = time.monotonic()
+        for job in list(self._jobs.values()):
+            if not job.done:
+                continue
+            age = now - job.finished_at
+            if job.gcs_url and age > self.buffer_ttl_seconds:
+                # Artifacts read the stored object from now on
+                job.video_bytes = None
+            if age > self.job_ttl_seconds:
+                job.video_bytes = None
+                del self._jobs[job.job_id]
+                if self._by_key.get(job.cache_key) is job:
+                    del self._by_key[job.cache_key]
+        for batch_id, batch in list(self._batches.items()):
+            finished_at = batch.finished_at
+            if finished_at is not None and now - finished_at > self.job_ttl_seconds:
+                del self._batches[batch_id]
+
+    def _cache_blob(self, key: str) -> Any:
+        return self.storage_client.bucket(self.bucket_name).blob(
+            f"{VIDEO_CACHE_PREFIX}/{key}.mp4"
+        )
+
+    def _schedule(self) -> None:
+        while True:
+            with self._cond:
+                if not self._queue:
+                    self._scheduler = None
+                    return
+                running = sum(
+                    1
+                    for job in self._jobs.values()
+                    if not job.done and job.operation is not None
+                )
+                wait = self._next_submit_at - time.monotonic()
+                if running >= self.max_concurrent or wait > 0:
+                    # Woken up early whenever a job finishes
+                    self._cond.wait(max(wait, 0) or None)
+                    continue
+                batch, index = self._queue.popleft()
+            try:
+                job = self.submit(*batch.requests[index])
+            except Exception as e:
+                with self._cond:
+                    if _is_quota_error(e):
+                        logging.warning(f"Veo quota exhausted, retrying: {e}")
+                        self._queue.appendleft((batch, index))
+                        self._next_submit_at = time.monotonic() + self._quota_backoff
+                        self._quota_backoff = min(self._quota_backoff * 2, 300.0)
+                    else:
+                        batch.errors[index] = f"Video generation failed: {e}"
+                        self._cond.notify_all()
+                continue
+            with self._cond:
+                batch.jobs[index] = job
+                self._next_submit_at = time.monotonic() + self.submit_interval
+                self._quota_backoff = self.submit_interval
+                self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                running = [
+                    job
+                    for job in self._jobs.values()
+                    if not job.done and job.operation is not None
+                ]
+                if not running:
+                    self._poller = None
+                    return
+                now = time.monotonic()
+                due = [job for job in running if job.next_poll_at <= now]
+                if not due:
+                    self._cond.wait(min(job.next_poll_at for job in running) - now)
+                    continue
+            for job in due:
+                self._poll(job)
+
+    def _poll(self, job: VideoJob) -> None:
+        try:
+            job.operation = self.client.operations.get(job.operation)
+        except Exception as e:
+            # Transient errors are retried on the next, backed-off poll
+            logging.warning(f"Polling video job {job.job_id} failed: {e}")
+        job.polls += 1
+        if job.operation.done:
+            self._finish(job)
+        else:
+            job.poll_interval = min(job.poll_interval * self.backoff, self.max_interval)
+            job.next_poll_at = time.monotonic() + job.poll_interval
+
+    def _finish(self, job: VideoJob) -> None:
+        operation = job.operation
+        try:
+            if operation.error or not (
+                operation.response and operation.response.generated_videos
+            ):
+                raise RuntimeError(
+                    f"no video was produced ({operation.error})"
+                    if operation.error
+                    else "no video was produced"
+                )
+            video = operation.response.generated_videos[0].video
+            if video.uri and video.uri.startswith("gs://"):
+                # Veo already stored the video in the bucket
+                gcs_url, size_bytes = self._store_in_cache(job, video.uri)
+                video_bytes = None
+            else:
+                if not video.video_bytes:
+                    self.client.files.download(file=video)
+                # Keep the only reference, so the buffer is freed with the job's
+                video_bytes, video.video_bytes = video.video_bytes, None
+                gcs_url = self._upload(job, video_bytes)
+                size_bytes = len(video_bytes)
+        except Exception as e:
+            error = f"Video generation failed: {e}"
+            print(f"❌ {error}")
+            self._complete(job, "failed", error=error)
+            return
+        self._complete(
+            job,
+            "succeeded",
+            gcs_url=gcs_url,
+            size_bytes=size_bytes,
+            video_bytes=video_bytes,
+        )
+
+    def _upload(self, job: VideoJob, video_bytes: bytes) -> str | None:
+        try:
+            if job.cache_key:
+                blob = self._cache_blob(job.cache_key)
+            else:
+                blob = self.storage_client.bucket(self.bucket_name).blob(
+                    f"veo_jobs/{job.job_id}.mp4"
+                )
+            # BytesIO shares the buffer of the bytes object instead of copying it
+            blob.upload_from_file(io.BytesIO(video_bytes), content_type=VIDEO_MIME_TYPE)
+            gcs_url = f"gs://{self.bucket_name}/{blob.name}"
+            print(f"☁️ Video uploaded to GCS: {gcs_url}")
+            return gcs_url
+        except Exception as e:
+            print(f"⚠️ Could not upload to GCS: {e}")
+            return None
+
+    def _store_in_cache(self, job: VideoJob, gcs_url: str) -> tuple[str, int | None]:
+        """Moves a video written by Veo to its cache key, server-side.
+
+        A job resumed by another worker finds the video already moved.
+
+        Returns:
+            The GCS URL of the video and its size, if known.
+        """
+        bucket_name, _, blob_name = gcs_url.removeprefix("gs://").partition("/")
+        if not job.cache_key or bucket_name != self.bucket_name:
+            return gcs_url, None
+        try:
+            bucket = self.storage_client.bucket(bucket_name)
+            cache_name = self._cache_blob(job.cache_key).name
+            cached = bucket.get_blob(cache_name)
+            if cached is None and bucket.get_blob(blob_name) is not None:
+                cached = bucket.rename_blob(bucket.blob(blob_name), cache_name)
+            if cached is None:
+                raise RuntimeError(f"{gcs_url} no longer exists")
+            return f"gs://{bucket_name}/{cached.name}", cached.size
+        except Exception as e:
+            print(f"⚠️ Could not cache video: {e}")
+            return gcs_url, None
+
+    async def save_artifact(self, job: VideoJob, tool_context: Any) -> int:
+        """Saves a finished video as an artifact of the tool's session.
+
+        The artifact references the stored GCS object when the artifact service
+        accepts that. Otherwise it inlines the job's buffer, which is only
+        fetched from GCS if the video never passed through this worker.
+
+        Returns:
+            The artifact version.
+        """
+        from google.genai import types
+
+        video_bytes = job.video_bytes
+        if video_bytes is None and job.gcs_url:
+            try:
+                return await tool_context.save_artifact(
+                    job.filename,
+                    types.Part(
+                        file_data=types.FileData(
+                            file_uri=job.gcs_url, mime_type=VIDEO_MIME_TYPE
+                        )
+                    ),
+                )
+            except ValueError:
+                # e.g. GcsArtifactService, which only stores inline data
+                bucket_name, _, blob_name = job.gcs_url.removeprefix("gs://").partition(
+                    "/"
+                )
+                blob = self.storage_client.bucket(bucket_name).blob(blob_name)
+                video_bytes = await asyncio.to_thread(blob.download_as_bytes)
+        version = await tool_context.save_artifact(
+            job.filename,
+            types.Part(
+                inline_data=types.Blob(mime_type=VIDEO_MIME_TYPE, data=video_bytes)
+            ),
+        )
+        if job.gcs_url:
+            # The stored object serves later sessions; release the buffer
+            job.video_bytes = None
+        return version
+
+
+def _is_quota_error(error: Exception) -> bool:
+    return getattr(error, "code", None) == 429 or "RESOURCE_EXHAUSTED" in str(error)
+
+
+_manager: VideoJobManager | None = None
+_manager_lock = threading.Lock()
+
+
+def get_video_job_manager() -> VideoJobManager:
+    """Returns the process-wide video job manager."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = VideoJobManager()
+    return _manager
@@ -1,13 +1,10 @@
-import os
-import google.auth
 from google.adk.agents import Agent
-from nutrition_agent.sub_agents.diet_planner_agent import diet_planner_agent
+
+from app.utils.environment import init_environment
 from nutrition_agent.sub_agents.diet_image_agent import diet_image_agent
+from nutrition_agent.sub_agents.diet_planner_agent import diet_planner_agent
 
-_, project_id = google.auth.default()
-os.environ.setdefault("GOOGLE_CLOUD_PROJECT", project_id)
-os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "global")
-os.environ.setdefault("GOOGLE_GENAI_USE_VERTEXAI", "True")
+init_environment()
 
 
 # Create the nutrition root agent with sub-agents
@@ -24,4 +21,4 @@ For general nutrition questions, you can handle them directly.""",
     description="Nutrition coordinator agent that delegates to specialized diet planning and visualization sub-agents.",
     tools=[],
     sub_agents=[diet_planner_agent, diet_image_agent],
-)
\ No newline at end of file
+)
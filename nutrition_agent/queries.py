@@ -0,0 +1,188 @@
+"""Named, parameterized queries shared by the nutrition sub-agents.
+
+Every query is a fixed statement with `@name` parameters, so BigQuery can
+serve repeated reads from its result cache, and the tools never inline user
+input into SQL. The diet planner and the diet image tools read the same
+column superset of the user's latest profile through `get_user_profile`,
+which goes through the shared user cache, so one conversation fetches it
+once.
+
+The backend that runs the statements is pluggable: `BigQueryBackend` is the
+default, and `SQLiteBackend` runs the same statements offline against a local
+database whose tables are named like the BigQuery ones.
+"""
+
+import os
+import threading
+import time
+from typing import Any
+
+from app.utils.clients import get_bigquery_client
+from app.utils.environment import get_project_id
+from app.utils.user_cache import get_user_cache
+
+NUTRITION_DATASET = os.environ.get("NUTRITION_DATASET", "health_data")
+USER_FITNESS_TABLE = "user_fitness_data"
+# Set to use a local SQLite database instead of BigQuery
+NUTRITION_SQLITE_PATH = os.environ.get("NUTRITION_SQLITE_PATH")
+
+# Columns of the user's profile that any nutrition tool needs
+PROFILE_COLUMNS = (
+    "name",
+    "age",
+    "weight",
+    "target_weight",
+    "height",
+    "goal",
+    "dietary_restrictions",
+    "activity_level",
+    "exercise_frequency",
+    "BMI",
+)
+
+QUERIES = {
+    "latest_user_profile": f"""
+        SELECT {", ".join(PROFILE_COLUMNS)}
+        FROM `{{user_fitness_table}}`
+        WHERE email = @email
+        ORDER BY date DESC
+        LIMIT 1
+    """,
+}
+
+
+def user_fitness_table() -> str:
+    """Returns the fully qualified table of the users' fitness profiles."""
+    return f"{get_project_id()}.{NUTRITION_DATASET}.{USER_FITNESS_TABLE}"
+
+
+class BigQueryBackend:
+    """Runs queries on BigQuery with query parameters."""
+
+    def __init__(self, client: Any = None) -> None:
+        """
+        Args:
+            client: BigQuery client. Defaults to the shared client.
+        """
+        self._client = client
+
+    def run(self, statement: str, parameters: dict[str, Any]) -> list[dict[str, Any]]:
+        from google.cloud import bigquery
+
+        types = {bool: "BOOL", int: "INT64", float: "FLOAT64", str: "STRING"}
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter(name, types[type(value)], value)
+                for name, value in parameters.items()
+            ]
+        )
+        client = self._client or get_bigquery_client()
+        return [
+            dict(row.items()) for row in client.query(statement, job_config=job_config)
+        ]
+
+
+class SQLiteBackend:
+    """Runs the same queries on a local SQLite database.
+
+    SQLite accepts the backtick-quoted table names and `@name` parameters of
+    the BigQuery statements as they are, so tables only need to be created
+    under the fully qualified BigQuery name.
+    """
+
+    def __init__(self, path: str = ":memory:", latency_seconds: float = 0.0) -> None:
+        """
+        Args:
+            path: SQLite database file, or ":memory:".
+            latency_seconds: Delay added to every query, to stand in for the
+                round trip to BigQuery in benchmarks.
+        """
+        import sqlite3
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.latency_seconds = latency_seconds
+        self.statements = 0
+        self._lock = threading.Lock()
+
+    def load_rows(self, table: str, rows: list[dict[str, Any]]) -> None:
+        """Creates a table named like a BigQuery table and inserts rows into it.
+
+        Args:
+            table: Fully qualified BigQuery table name.
+            rows: Rows to insert; the columns are those of the first row.
+        """
+        columns = list(rows[0])
+        quoted = ", ".join(f'"{column}"' for column in columns)
+        with self._lock, self.connection:
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS `{table}` ({quoted})")
+            self.connection.executemany(
+                f"INSERT INTO `{table}` ({quoted}) VALUES ({', '.join('?' * len(columns))})",
+                [tuple(row[column] for column in columns) for row in rows],
+            )
+
+    def run(self, statement: str, parameters: dict[str, Any]) -> list[dict[str, Any]]:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        with self._lock:
+            self.statements += 1
+            cursor = self.connection.execute(statement, parameters)
+            return [dict(row) for row in cursor.fetchall()]
+
+
+_backend: Any = None
+_backend_lock = threading.Lock()
+
+
+def get_query_backend() -> Any:
+    """Returns the process-wide query backend."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if NUTRITION_SQLITE_PATH:
+                    _backend = SQLiteBackend(NUTRITION_SQLITE_PATH)
+                else:
+                    _backend = BigQueryBackend()
+    return _backend
+
+
+def set_query_backend(backend: Any) -> None:
+    """Replaces the query backend, e.g. with a `SQLiteBackend` offline.
+
+    Passing None restores the default backend on next use.
+    """
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def run_query(name: str, **parameters: Any) -> list[dict[str, Any]]:
+    """Runs a named query.
+
+    Args:
+        name: Key of the query in `QUERIES`.
+        **parameters: Values of the query's `@name` parameters.
+
+    Returns:
+        The result rows as dictionaries.
+    """
+    statement = QUERIES[name].format(user_fitness_table=user_fitness_table())
+    return get_query_backend().run(statement, parameters)
+
+
+def get_user_profile(email: str) -> dict[str, Any] | None:
+    """Returns the user's latest profile, or None for an unknown user.
+
+    Args:
+        email: User email
+
+    Returns:
+        Dictionary with the `PROFILE_COLUMNS` of the user's latest record.
+    """
+
+    def load() -> dict[str, Any] | None:
+        rows = run_query("latest_user_profile", email=email)
+        return rows[0] if rows else None
+
+    return get_user_cache().get_or_load(email, "nutrition_profile", load)
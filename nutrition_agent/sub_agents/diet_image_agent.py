@@ -1,22 +1,69 @@
 """Diet image generation sub-agent that creates visual meal plans."""
 
-import os
-import datetime
-import base64
+import asyncio
+import hashlib
+import json
+
 from google.adk.agents import Agent
 from google.adk.tools.tool_context import ToolContext
-from google.cloud import bigquery, storage
-from google import genai
-from google.genai import types
-import google.auth
 
-_, project_id = google.auth.default()
+from app.utils.clients import get_genai_client, get_storage_client
+from app.utils.media_artifacts import save_media_artifact
+from app.utils.media_renditions import get_media_post_processor, rendition_urls
+from app.utils.media_spool import get_media_spool
+from nutrition_agent.queries import get_user_profile
+
+BUCKET_NAME = "qwiklabs-gcp-00-a489584c5286-adk-videos"
+IMAGE_MODEL = "gemini-2.5-flash-image-preview"
+# Profile fields the infographic prompt depends on
+PROFILE_FINGERPRINT_FIELDS = (
+    "name",
+    "goal",
+    "weight",
+    "target_weight",
+    "activity_level",
+    "dietary_restrictions",
+)
+
+
+def profile_fingerprint(user, meal_type: str) -> str:
+    """Returns a hash of everything the diet plan infographic depends on.
+
+    Args:
+        user: Latest profile of the user, see `get_user_profile`
+        meal_type: Type of meal plan to visualize
+
+    Returns:
+        Hex digest that changes whenever any fingerprinted field changes.
+    """
+    profile = {field: user[field] for field in PROFILE_FINGERPRINT_FIELDS}
+    profile["meal_type"] = " ".join(meal_type.split()).casefold()
+    profile["model"] = IMAGE_MODEL
+    return hashlib.sha256(
+        json.dumps(profile, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def _load_cached_image(bucket, filename: str) -> bytes | None:
+    """Returns a previously generated infographic from the spool or the bucket."""
+    spool = get_media_spool()
+    path = spool.get(filename)
+    if path is not None:
+        return path.read_bytes()
+    try:
+        blob = bucket.get_blob(filename)
+        if blob is None:
+            return None
+        data = blob.download_as_bytes()
+        spool.write_as(filename, data)
+        return data
+    except Exception as e:
+        print(f"⚠️ Diet plan cache lookup failed: {e}")
+        return None
 
 
-def generate_diet_plan_image(
-    email: str,
-    meal_type: str = "full day meal plan",
-    tool_context: ToolContext = None
+async def generate_diet_plan_image(
+    email: str, meal_type: str = "full day meal plan", tool_context: ToolContext = None
 ) -> dict:
     """Generates visual diet plan image based on user's BigQuery data.
 
@@ -26,32 +73,43 @@ def generate_diet_plan_image(
         tool_context: ADK tool context
 
     Returns:
-        Dictionary with image generation status and details.
+        Dictionary with image generation status and a reference to the image
+        artifact.
     """
     try:
-        # Fetch user data from BigQuery
-        bq_client = bigquery.Client()
-        query = f"""
-        SELECT name, weight, target_weight, goal, dietary_restrictions, activity_level
-        FROM `{project_id}.health_data.user_fitness_data`
-        WHERE email = '{email}'
-        ORDER BY date DESC
-        LIMIT 1
-        """
-        
-        results = list(bq_client.query(query))
-        if not results:
+        # Shared, cached profile read (see nutrition_agent.queries)
+        # Blocking reads, calls and writes run off the event loop, which
+        # serves other sessions
+        user = await asyncio.to_thread(get_user_profile, email)
+        if user is None:
             return {"status": "error", "message": f"No data found for {email}"}
-        
-        user = results[0]
-        
+
+        # Unchanged profiles get their existing infographic back
+        filename = f"diet_plan_{profile_fingerprint(user, meal_type)[:16]}.png"
+        bucket = get_storage_client().bucket(BUCKET_NAME)
+        public_url = f"https://storage.googleapis.com/{BUCKET_NAME}/{filename}"
+        cached_image = await asyncio.to_thread(_load_cached_image, bucket, filename)
+        if cached_image is not None:
+            print(f"♻️ Reusing diet plan image for: {email}")
+            artifact = await save_media_artifact(
+                tool_context, filename, cached_image, "image/png", public_url
+            )
+            return {
+                "status": "success",
+                "message": f"Diet plan image created for {user['name']}!",
+                "artifact": artifact,
+                "renditions": rendition_urls(filename, BUCKET_NAME),
+                "user_goal": user["goal"],
+                "cached": True,
+            }
+
         # Create diet plan image prompt
-        prompt = f"""Create a beautiful, appetizing {meal_type} infographic for {user.name}:
+        prompt = f"""Create a beautiful, appetizing {meal_type} infographic for {user["name"]}:
 
-Goal: {user.goal}
-Weight: {user.weight}kg → {user.target_weight}kg
-Activity: {user.activity_level}
-Restrictions: {user.dietary_restrictions}
+Goal: {user["goal"]}
+Weight: {user["weight"]}kg → {user["target_weight"]}kg
+Activity: {user["activity_level"]}
+Restrictions: {user["dietary_restrictions"]}
 
 Make it:
 - Visually appealing with food photos
@@ -61,66 +119,62 @@ Make it:
 - Professional nutrition infographic style"""
 
         print(f"🥗 Generating diet plan image for: {email}")
-        
+
         # Generate image using Gemini 2.5 Flash Image
-        client = genai.Client()
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-image-preview",
+        client = get_genai_client()
+        response = await asyncio.to_thread(
+            client.models.generate_content,
+            model=IMAGE_MODEL,
             contents=[prompt],
         )
-        
+
         # Process response
         for part in response.candidates[0].content.parts:
             if part.inline_data:
-                # Save locally
-                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"diet_plan_{timestamp}.png"
-                
-                from PIL import Image
-                from io import BytesIO
-                image = Image.open(BytesIO(part.inline_data.data))
-                image.save(filename)
-                
-                # Upload to GCS
+                # Save the image as returned by the model to the media spool
+                path = await asyncio.to_thread(
+                    get_media_spool().write_as, filename, part.inline_data.data
+                )
+
+                # Upload to GCS, where it also serves as the cached infographic
+                renditions = {}
                 try:
-                    bucket_name = "qwiklabs-gcp-00-a489584c5286-adk-videos"
-                    storage_client = storage.Client()
-                    bucket = storage_client.bucket(bucket_name)
                     blob = bucket.blob(filename)
-                    blob.upload_from_filename(filename)
-                    gcs_url = f"gs://{bucket_name}/{filename}"
+                    await asyncio.to_thread(
+                        blob.upload_from_filename, path, content_type="image/png"
+                    )
+                    gcs_url = f"gs://{BUCKET_NAME}/{filename}"
                     print(f"☁️ Diet plan uploaded to: {gcs_url}")
+
+                    # Thumbnail and WebP/AVIF versions are made off-thread
+                    get_media_post_processor().submit(path)
+                    renditions = rendition_urls(filename, BUCKET_NAME)
                 except Exception as e:
+                    public_url = None
                     print(f"⚠️ GCS upload failed: {e}")
-                
-                # Save as artifact
-                if tool_context:
-                    try:
-                        image_part = types.Part(
-                            inline_data=types.Blob(
-                                mime_type="image/png",
-                                data=part.inline_data.data
-                            )
-                        )
-                        tool_context.save_artifact(filename, image_part)
-                    except Exception as e:
-                        print(f"⚠️ Artifact save failed: {e}")
-                
-                # Return base64
-                image_base64 = base64.b64encode(part.inline_data.data).decode('utf-8')
-                
+
+                # Save as artifact and return a reference instead of the bytes
+                artifact = await save_media_artifact(
+                    tool_context,
+                    filename,
+                    part.inline_data.data,
+                    "image/png",
+                    public_url,
+                )
+
                 return {
                     "status": "success",
-                    "message": f"Diet plan image created for {user.name}!",
-                    "filename": filename,
-                    "base64_image": image_base64,
-                    "user_goal": user.goal
+                    "message": f"Diet plan image created for {user['name']}!",
+                    "artifact": artifact,
+                    "renditions": renditions,
+                    "user_goal": user["goal"],
+                    "cached": False,
                 }
-        
+
         return {"status": "error", "message": "No image generated"}
-        
+
     except Exception as e:
-        return {"status": "error", "message": f"Failed: {str(e)}"}
+        return {"status": "error", "message": f"Failed: {e!s}"}
 
 
 # Create the diet image sub-agent
@@ -137,4 +191,4 @@ WORKFLOW:
 Create professional nutrition visuals with food photos, calorie counts, and meal layouts!""",
     description="Creates visual diet plan infographics based on user data from BigQuery.",
     tools=[generate_diet_plan_image],
-)
\ No newline at end of file
+)
@@ -1,18 +1,13 @@
 """Diet planning sub-agent that fetches user data and creates personalized meal plans."""
 
-import os
 from google.adk.agents import Agent
 from google.adk.tools.tool_context import ToolContext
-from google.cloud import bigquery
-import google.auth
 
-_, project_id = google.auth.default()
+from app.utils.fitness_rollups import get_fitness_rollup_for_user
+from nutrition_agent.queries import get_user_profile
 
 
-def get_user_nutrition_plan(
-    email: str,
-    tool_context: ToolContext = None
-) -> dict:
+def get_user_nutrition_plan(email: str, tool_context: ToolContext = None) -> dict:
     """Fetches user data from BigQuery and creates personalized diet plan.
 
     Args:
@@ -23,39 +18,28 @@ def get_user_nutrition_plan(
         Dictionary with nutrition plan and user data.
     """
     try:
-        # Fetch user data from BigQuery
-        bq_client = bigquery.Client()
-        query = f"""
-        SELECT name, age, weight, target_weight, height, goal, dietary_restrictions, 
-               activity_level, exercise_frequency, BMI
-        FROM `{project_id}.health_data.user_fitness_data`
-        WHERE email = '{email}'
-        ORDER BY date DESC
-        LIMIT 1
-        """
-        
-        results = list(bq_client.query(query))
-        if not results:
+        # Shared, cached profile read (see nutrition_agent.queries)
+        user = get_user_profile(email)
+        if user is None:
             return {"status": "error", "message": f"No data found for {email}"}
-        
-        user = results[0]
+
         return {
             "status": "success",
             "user_data": {
-                "name": user.name,
-                "age": user.age,
-                "weight": user.weight,
-                "target_weight": user.target_weight,
-                "height": user.height,
-                "goal": user.goal,
-                "dietary_restrictions": user.dietary_restrictions,
-                "activity_level": user.activity_level,
-                "bmi": user.BMI
-            }
+                "name": user["name"],
+                "age": user["age"],
+                "weight": user["weight"],
+                "target_weight": user["target_weight"],
+                "height": user["height"],
+                "goal": user["goal"],
+                "dietary_restrictions": user["dietary_restrictions"],
+                "activity_level": user["activity_level"],
+                "bmi": user["BMI"],
+            },
         }
-        
+
     except Exception as e:
-        return {"status": "error", "message": f"Failed to fetch data: {str(e)}"}
+        return {"status": "error", "message": f"Failed to fetch data: {e!s}"}
 
 
 # Create the diet planning sub-agent
@@ -67,14 +51,15 @@ diet_planner_agent = Agent(
 WORKFLOW:
 1. Ask for user's email
 2. Use get_user_nutrition_plan tool to fetch their BigQuery data
-3. Create personalized diet plan based on their:
+3. Use get_fitness_rollup_for_user to get their recent activity (average steps and calories burned, weight trend)
+4. Create personalized diet plan based on their:
    - Weight goals (current vs target)
-   - Activity level and exercise frequency
+   - Activity level and exercise frequency, checked against their recent activity
    - Dietary restrictions
    - BMI and health status
    - Age and lifestyle
 
 Provide detailed meal plans with calorie counts, macros, and timing recommendations.""",
     description="Expert nutrition sub-agent that creates personalized diet plans based on user data from BigQuery.",
-    tools=[get_user_nutrition_plan],
-)
\ No newline at end of file
+    tools=[get_user_nutrition_plan, get_fitness_rollup_for_user],
+)
@@ -0,0 +1,121 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of `AgentEngineApp.clone()` followed by `set_up()`.
+
+"before" reproduces the previous clone path: re-import `root_agent`, build a
+fresh app and create a new Cloud Logging client, tracer provider and exporter.
+Clients are created but never used, so anonymous credentials stand in for the
+application default ones and this runs offline. The app's own telemetry is
+created once per process and shared by its clones, so it is stubbed out like
+in the unit tests, and the services are in memory.
+"""
+
+import statistics
+import time
+from collections.abc import Callable
+
+import google.auth
+import pytest
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.sessions import InMemorySessionService
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import logging as google_cloud_logging
+from google.cloud.aiplatform import initializer
+from opentelemetry.sdk.trace import TracerProvider, export
+from vertexai.preview.reasoning_engines import AdkApp
+
+from app import agent_engine_app
+from app.agent_engine_app import AgentEngineApp
+from app.utils.tracing import CloudTraceLoggingSpanExporter
+
+ROUNDS = 10
+
+
+@pytest.fixture
+def template(monkeypatch: pytest.MonkeyPatch) -> AgentEngineApp:
+    monkeypatch.setattr(
+        google.auth,
+        "default",
+        lambda *args, **kwargs: (AnonymousCredentials(), "test-project"),
+    )
+    # set_up() writes these into os.environ; register them for restoring.
+    monkeypatch.setenv("GOOGLE_CLOUD_PROJECT", "test-project")
+    monkeypatch.setenv("GOOGLE_CLOUD_LOCATION", "us-central1")
+    monkeypatch.setenv("GOOGLE_GENAI_USE_VERTEXAI", "1")
+    monkeypatch.setattr(initializer.global_config, "_project", "test-project")
+    monkeypatch.setattr(agent_engine_app, "_init_telemetry", lambda: None)
+    from app.agent import root_agent
+
+    app = AgentEngineApp(
+        agent=root_agent,
+        session_service_builder=InMemorySessionService,
+        artifact_service_builder=InMemoryArtifactService,
+    )
+    app.set_up()
+    return app
+
+
+def _legacy_clone_and_set_up(app: AgentEngineApp) -> AdkApp:
+    from app.agent import root_agent
+
+    template_attributes = app._tmpl_attrs
+    clone = AdkApp(
+        agent=root_agent,
+        enable_tracing=bool(template_attributes.get("enable_tracing", False)),
+        session_service_builder=template_attributes.get("session_service_builder"),
+        artifact_service_builder=template_attributes.get("artifact_service_builder"),
+        env_vars=template_attributes.get("env_vars"),
+    )
+    clone.set_up()
+    clone.logger = google_cloud_logging.Client().logger(__name__)
+    provider = TracerProvider()
+    provider.add_span_processor(
+        export.BatchSpanProcessor(
+            CloudTraceLoggingSpanExporter(project_id=template_attributes["project"])
+        )
+    )
+    return clone
+
+
+def _median_ms(fn: Callable[[], object]) -> float:
+    samples = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def test_clone_and_set_up_latency(template: AgentEngineApp) -> None:
+    def shared_clone() -> None:
+        template._new_clone().set_up()
+
+    def pooled_clone() -> None:
+        template.clone().set_up()
+
+    before = _median_ms(lambda: _legacy_clone_and_set_up(template))
+    after = _median_ms(shared_clone)
+
+    pool = template.warm_clone_pool(ROUNDS)
+    deadline = time.monotonic() + 30
+    while pool._ready.qsize() < ROUNDS and time.monotonic() < deadline:
+        time.sleep(0.05)
+    pooled = _median_ms(pooled_clone)
+
+    print(
+        f"clone+set_up median over {ROUNDS}: before={before:.2f}ms "
+        f"shared clients={after:.2f}ms pooled={pooled:.2f}ms"
+    )
+    assert pooled < before
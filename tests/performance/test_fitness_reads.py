@@ -0,0 +1,114 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Fitness data reads on a synthetic multi-year history, before and after.
+
+The local fitness source holds five years of daily rows for a few hundred
+users. "before" is the old path: every row of the user, materialized as one
+Python object per row, which is what iterating a BigQuery `RowIterator` does.
+"after" reads through `read_fitness_data` as Arrow: the full history for the
+summary, and a 90-day window of two columns for the planner's detail reads.
+Time is the median of a few rounds; memory is the peak of Python allocations.
+"""
+
+import datetime
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+
+import numpy as np
+import pyarrow as pa
+
+from app.utils.fitness_data import FitnessQuery, LocalFitnessSource, read_fitness_data
+from app.utils.fitness_summary import summarize_fitness_rows
+
+YEARS = 5
+USERS = 200
+ROUNDS = 5
+EMAIL = "user0@example.com"
+
+
+def _history() -> pa.Table:
+    rng = np.random.default_rng(7)
+    days = 365 * YEARS
+    n = days * USERS
+    start = np.datetime64("2020-01-01")
+    return pa.table(
+        {
+            "email": np.repeat([f"user{u}@example.com" for u in range(USERS)], days),
+            "date": pa.array(np.tile(start + np.arange(days), USERS), pa.date32()),
+            "weight_kg": rng.normal(80, 8, n).round(1),
+            "resting_heart_rate": rng.normal(62, 5, n).round(),
+            "systolic_bp": rng.normal(122, 8, n).round(),
+            "diastolic_bp": rng.normal(79, 5, n).round(),
+            "sleep_hours": rng.normal(7, 0.8, n).round(1),
+            "steps": rng.normal(8_500, 2_500, n).round(),
+            "calories_burned": rng.normal(2_300, 250, n).round(),
+            "experience_level": np.repeat(["Intermediate"], n),
+            "dietary_restrictions": np.repeat(["none"], n),
+        }
+    )
+
+
+def _measure(fn: Callable[[], object]) -> tuple[float, float]:
+    samples = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(samples), peak / 2**20
+
+
+def test_arrow_reads_on_a_multi_year_history() -> None:
+    table = _history()
+    source = LocalFitnessSource(table)
+    last_day = datetime.date(2020, 1, 1) + datetime.timedelta(days=365 * YEARS - 1)
+
+    def legacy() -> object:
+        # SELECT * ... WHERE email = @email, iterated row by row
+        import pyarrow.compute as pc
+
+        rows = table.filter(pc.equal(table["email"], EMAIL)).to_pylist()
+        return summarize_fitness_rows(rows)
+
+    def full_history() -> object:
+        return summarize_fitness_rows(
+            read_fitness_data(FitnessQuery(email=EMAIL), source).table
+        )
+
+    def window() -> object:
+        query = FitnessQuery(
+            email=EMAIL,
+            start_date=last_day - datetime.timedelta(days=89),
+            columns=("weight_kg", "steps"),
+            max_rows=90,
+        )
+        return read_fitness_data(query, source).table.to_pylist()
+
+    before_ms, before_mb = _measure(legacy)
+    summary_ms, summary_mb = _measure(full_history)
+    window_ms, window_mb = _measure(window)
+    print(
+        f"\n{table.num_rows} rows, {USERS} users x {YEARS} years: summary of one "
+        f"user via Python rows {before_ms:.0f} ms / {before_mb:.1f} MiB, via Arrow "
+        f"{summary_ms:.0f} ms / {summary_mb:.1f} MiB; 90-day 2-column window "
+        f"{window_ms:.1f} ms / {window_mb:.2f} MiB"
+    )
+    assert summary_mb < before_mb
+    assert window_ms < before_ms
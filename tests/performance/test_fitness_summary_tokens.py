@@ -0,0 +1,73 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Prompt tokens the planners receive for a long-history user, raw versus summary.
+
+"before" is the `get_fitness_data_for_user` result: every row of three years
+of daily measurements, serialized as the tool response. "after" is the
+`get_fitness_summary_for_user` summary of the same rows. Prompt tokens are
+estimated at 4 characters per token; the summary's own CPU time is reported
+next to them.
+"""
+
+import datetime
+import json
+import random
+import time
+
+from app.utils.fitness_summary import summarize_fitness_rows
+
+YEARS = 3
+CHARS_PER_TOKEN = 4
+
+
+def _history() -> list[dict]:
+    rng = random.Random(7)
+    start = datetime.date(2022, 1, 1)
+    rows = []
+    for day in range(365 * YEARS):
+        rows.append(
+            {
+                "email": "ada@example.com",
+                "date": (start + datetime.timedelta(days=day)).isoformat(),
+                "weight_kg": round(92 - day * 0.01 + rng.gauss(0, 0.4), 1),
+                "resting_heart_rate": round(66 - day * 0.005 + rng.gauss(0, 2)),
+                "systolic_bp": round(rng.gauss(124, 6)),
+                "diastolic_bp": round(rng.gauss(80, 4)),
+                "sleep_hours": round(rng.gauss(7, 0.8), 1),
+                "steps": max(0, round(rng.gauss(8_500, 2_500))),
+                "calories_burned": round(rng.gauss(2_300, 250)),
+                "experience_level": "Intermediate",
+                "preferred_workout_types": "strength, running",
+                "dietary_restrictions": "none",
+            }
+        )
+    return rows
+
+
+def test_summary_cuts_planner_prompt_tokens() -> None:
+    rows = _history()
+    start = time.perf_counter()
+    summary = summarize_fitness_rows(rows)
+    summary_ms = (time.perf_counter() - start) * 1000
+
+    before = len(json.dumps({"result": rows})) // CHARS_PER_TOKEN
+    after = (
+        len(json.dumps({"status": "success", "summary": summary})) // CHARS_PER_TOKEN
+    )
+    print(
+        f"\n{len(rows)} daily rows: prompt ~{before} -> ~{after} tokens "
+        f"({before / after:.0f}x), summarized in {summary_ms:.0f} ms"
+    )
+    assert after * 10 < before
@@ -0,0 +1,79 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+CPU time per generated image on the request thread, before and after.
+
+"before" reproduces the previous image tools: decode the PNG with PIL,
+re-encode it to a file, and read that file back into a base64 string. "after"
+spools the original bytes as they are. The CPU time of the renditions, which
+now run in the post-processing pool, is reported separately.
+"""
+
+import base64
+import os
+import statistics
+import time
+from collections.abc import Callable
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+
+from app.utils.media_renditions import render
+from app.utils.media_spool import MediaSpool
+
+ROUNDS = 5
+
+
+def _generated_png() -> bytes:
+    # Noise compresses like a photo-like model output, unlike a flat color
+    image = Image.frombytes("RGB", (1024, 1024), os.urandom(1024 * 1024 * 3))
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _cpu_ms(fn: Callable[[], object]) -> float:
+    samples = []
+    for _ in range(ROUNDS):
+        start = time.process_time()
+        fn()
+        samples.append((time.process_time() - start) * 1000)
+    return statistics.median(samples)
+
+
+def test_request_thread_cpu_per_image(tmp_path: Path) -> None:
+    data = _generated_png()
+    spool = MediaSpool(str(tmp_path / "spool"))
+
+    def legacy() -> None:
+        filename = tmp_path / "gym_progress.png"
+        Image.open(BytesIO(data)).save(filename)
+        with open(filename, "rb") as f:
+            base64.b64encode(f.read()).decode("utf-8")
+
+    def spooled() -> None:
+        spool.write(data, "gym_progress", ".png")
+
+    before = _cpu_ms(legacy)
+    after = _cpu_ms(spooled)
+    original = spool.write(data, "gym_progress", ".png")
+    renditions_ms = statistics.median(
+        render(str(original))[1] * 1000 for _ in range(ROUNDS)
+    )
+    print(
+        f"\nCPU per 1024x1024 image on the request thread: before {before:.1f} ms, "
+        f"after {after:.1f} ms; renditions in the pool: {renditions_ms:.1f} ms"
+    )
+    assert after < before
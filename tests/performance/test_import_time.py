@@ -0,0 +1,97 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Import-time budget for `app.agent`.
+
+ADK itself is imported first and excluded from the budget, so the numbers only
+cover what this project adds on top of it: importing `app.agent` and building
+`root_agent`. Override the budgets with APP_IMPORT_BUDGET_S and
+APP_BUILD_BUDGET_S.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+IMPORT_BUDGET_S = float(os.environ.get("APP_IMPORT_BUDGET_S", "0.5"))
+BUILD_BUDGET_S = float(os.environ.get("APP_BUILD_BUDGET_S", "0.5"))
+HEAVY_MODULES = (
+    "PIL",
+    "google.cloud.bigquery",
+    "google.cloud.storage",
+    "numpy",
+    "pandas",
+)
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import google.adk.agents
+t1 = time.perf_counter()
+baseline = set(sys.modules)
+import app.agent
+t2 = time.perf_counter()
+app.agent.root_agent
+t3 = time.perf_counter()
+print(json.dumps({
+    "adk_s": t1 - t0,
+    "import_s": t2 - t1,
+    "build_s": t3 - t2,
+    "new_modules": sorted(set(sys.modules) - baseline),
+}))
+"""
+
+
+def _run_probe(tmp_path: Path) -> tuple[dict, list[tuple[int, str]]]:
+    env = {
+        **os.environ,
+        # Keep the probe offline: no credentials lookup, no toolbox download.
+        "GOOGLE_CLOUD_PROJECT": os.environ.get("GOOGLE_CLOUD_PROJECT", "test-project"),
+        "TOOLBOX_SCHEMA_CACHE_DIR": str(tmp_path),
+    }
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=Path(__file__).parents[2],
+        check=True,
+    )
+    app_self_times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = (field.strip() for field in line[12:].split("|"))
+        if name.split(".")[0] == "app" and self_us.isdigit():
+            app_self_times.append((int(self_us), name))
+    return json.loads(result.stdout.strip().splitlines()[-1]), sorted(
+        app_self_times, reverse=True
+    )
+
+
+def test_app_agent_import_budget(tmp_path: Path) -> None:
+    """Fails when importing `app.agent` or building the graph regresses."""
+    timings, app_self_times = _run_probe(tmp_path)
+    print(
+        f"adk={timings['adk_s']:.3f}s import={timings['import_s']:.3f}s "
+        f"build={timings['build_s']:.3f}s slowest app modules (us): "
+        f"{app_self_times[:5]}"
+    )
+
+    assert timings["import_s"] < IMPORT_BUDGET_S, timings
+    assert timings["build_s"] < BUILD_BUDGET_S, timings
+    heavy = [m for m in timings["new_modules"] if m.startswith(HEAVY_MODULES)]
+    assert not heavy, f"app.agent imported heavy modules eagerly: {heavy}"
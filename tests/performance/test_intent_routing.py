@@ -0,0 +1,169 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Accuracy and cost of the gym assistant's rule-based fast path.
+
+LABELED_MESSAGES pairs user messages with the sub-agent that should handle
+them, or None for messages the assistant should answer or route itself
+(general wellness questions, several intents at once). For the fast path:
+
+- precision: fast-routed messages sent to the right sub-agent. A wrong fast
+  route is the costly error, since the model never sees the message.
+- coverage: messages for a sub-agent that skip the routing model call. The
+  others still reach the right sub-agent through the model, just slower.
+
+Every covered message saves one `gemini-2.5-flash` turn in `gym_assistant`;
+the rules themselves cost microseconds.
+"""
+
+import time
+
+from app.utils.intent_router import classify_intent
+
+LABELED_MESSAGES: list[tuple[str, str | None]] = [
+    # fitness_planning_agent
+    ("Can you create a weekly workout plan for me?", "fitness_planning_agent"),
+    ("I need a training plan for my first half marathon", "fitness_planning_agent"),
+    ("Build me a strength program for three days a week", "fitness_planning_agent"),
+    ("Plan my week of workouts, email jo@example.com", "fitness_planning_agent"),
+    ("What should my gym routine look like to lose fat?", "fitness_planning_agent"),
+    ("Give me a new exercise schedule", "fitness_planning_agent"),
+    ("Coach me for the next month", "fitness_planning_agent"),
+    ("Update my weekly schedule, I only train on weekends", "fitness_planning_agent"),
+    ("I want a personalized fitness program", "fitness_planning_agent"),
+    ("Can you plan my training for the next two weeks?", "fitness_planning_agent"),
+    ("Suggest exercises for my lower back", "fitness_planning_agent"),
+    # video_generation_agent
+    ("Make a Veo video of a sunrise run", "video_generation_agent"),
+    ("Generate a video of someone doing burpees", "video_generation_agent"),
+    ("Create a short clip of a yoga flow on the beach", "video_generation_agent"),
+    ("Can you animate a kettlebell swing?", "video_generation_agent"),
+    ("I'd like some footage of a mountain bike ride", "video_generation_agent"),
+    ("What's the status of my video?", "video_generation_agent"),
+    ("Make three videos: a plank, a squat and a lunge", "video_generation_agent"),
+    ("Use Veo 3 to show a perfect deadlift", "video_generation_agent"),
+    ("Could you render a clip of a rowing stroke?", "video_generation_agent"),
+    ("Is my video ready yet?", "video_generation_agent"),
+    (
+        "Show me what a good pull-up looks like, as a short film",
+        "video_generation_agent",
+    ),
+    # bigquery_agent
+    ("Show me my steps data for last week", "bigquery_agent"),
+    ("List all users", "bigquery_agent"),
+    ("How many users are in the database?", "bigquery_agent"),
+    ("What was my weight on Monday? I'm jo@example.com", "bigquery_agent"),
+    ("Get my heart rate history", "bigquery_agent"),
+    ("Fetch the sleep records for jo@example.com", "bigquery_agent"),
+    ("Display my fitness data", "bigquery_agent"),
+    ("What were my steps yesterday?", "bigquery_agent"),
+    ("Pull my health data please", "bigquery_agent"),
+    ("How did I sleep this week?", "bigquery_agent"),
+    # user_registration_agent
+    ("I want to register, my email is a@b.c", "user_registration_agent"),
+    ("Sign me up please", "user_registration_agent"),
+    ("Can you create an account for me?", "user_registration_agent"),
+    ("Am I registered? jo@example.com", "user_registration_agent"),
+    ("I'm a new user, 34 years old, 180 cm, 82 kg", "user_registration_agent"),
+    ("Registration for sam@example.com please", "user_registration_agent"),
+    ("Make my profile, I'm a beginner", "user_registration_agent"),
+    ("I'd like to join", "user_registration_agent"),
+    ("Please sign me up, I'm jo@example.com", "user_registration_agent"),
+    (
+        "First time here, how do I get started? jo@example.com",
+        "user_registration_agent",
+    ),
+    # gym_progress_agent
+    ("Generate a funny progress picture", "gym_progress_agent"),
+    ("Make a progress image for jo@example.com", "gym_progress_agent"),
+    ("Use Nano Banana on my gains", "gym_progress_agent"),
+    ("Create a motivational image of my progress", "gym_progress_agent"),
+    ("Show me a picture of my gym progress", "gym_progress_agent"),
+    ("I want a progress meme", "gym_progress_agent"),
+    ("Draw how far I've come this month", "gym_progress_agent"),
+    # wellness_bundle_agent
+    ("I want a workout plan and a diet plan for this week", "wellness_bundle_agent"),
+    ("Give me my wellness bundle", "wellness_bundle_agent"),
+    ("Plan my meals and my training for next week", "wellness_bundle_agent"),
+    ("Nutrition and exercise plan for jo@example.com", "wellness_bundle_agent"),
+    (
+        "Can I get a training schedule and a meal plan for March?",
+        "wellness_bundle_agent",
+    ),
+    ("Sort out both my food and my gym week, jo@example.com", "wellness_bundle_agent"),
+    # The assistant answers or routes these itself
+    ("How much protein should I eat?", None),
+    ("Hi!", None),
+    ("Is it bad to run every day?", None),
+    ("Thanks, that's all", None),
+    ("What's a good stretch after squats?", None),
+    ("Make a video of my workout plan", None),
+    ("Register me and then plan my week", None),
+    ("Don't make a video, just plan my week", None),
+    ("Show me my data and then make a progress picture", None),
+    ("Not now, maybe later", None),
+    ("How do I avoid shin splints?", None),
+    ("What can you do?", None),
+    # Everyday questions that mention a sub-agent's nouns
+    ("Is a video game good exercise?", None),
+    ("Is a fitness tracker clip worth it?", None),
+    ("I watched a video on deadlift form, is rounding my back okay?", None),
+    ("Should I film my lifts to check my form?", None),
+    ("I registered last week but forgot my email", None),
+    ("My friend signed up last month and loves it", None),
+    ("Is it worth signing up for a marathon this year?", None),
+    ("How do new users usually get started with lifting?", None),
+    ("How many calories does a 30 minute jog burn?", None),
+    ("Can I do squats with a knee injury?", None),
+    ("Is a progress bar on the treadmill accurate?", None),
+    ("What data does a smartwatch collect during sleep?", None),
+    ("Is exercise or diet more important for weight loss?", None),
+    ("Should I eat a meal before or after training?", None),
+    ("What nutrition matters most on workout days?", None),
+    ("Does fitness depend more on diet than on exercise?", None),
+]
+
+
+def test_fast_path_accuracy_on_labeled_messages() -> None:
+    start = time.perf_counter()
+    predictions = [classify_intent(message) for message, _ in LABELED_MESSAGES]
+    micros = (time.perf_counter() - start) / len(LABELED_MESSAGES) * 1e6
+
+    routed = [
+        (predicted, label)
+        for predicted, (_, label) in zip(predictions, LABELED_MESSAGES, strict=True)
+        if predicted is not None
+    ]
+    wrong = [
+        (message, predicted, label)
+        for predicted, (message, label) in zip(
+            predictions, LABELED_MESSAGES, strict=True
+        )
+        if predicted is not None and predicted != label
+    ]
+    for_agents = sum(label is not None for _, label in LABELED_MESSAGES)
+    precision = 1 - len(wrong) / len(routed)
+    coverage = (len(routed) - len(wrong)) / for_agents
+    print(
+        f"\n{len(LABELED_MESSAGES)} labeled messages: {len(routed)} fast-routed, "
+        f"precision {precision:.0%}, coverage {coverage:.0%} of {for_agents} "
+        f"sub-agent requests; {len(routed)} gemini-2.5-flash routing turns "
+        f"skipped at {micros:.0f} us per message"
+    )
+    for message, predicted, label in wrong:
+        print(f"   {message!r}: {predicted}, expected {label}")
+
+    assert precision >= 0.95
+    assert coverage >= 0.6
+    assert micros < 1000
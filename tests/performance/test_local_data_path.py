@@ -0,0 +1,104 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Data-path timings of the toolset on the local SQLite toolbox.
+
+Fills an in-memory database with synthetic users holding three years of
+daily fitness data each, then times the read tools and a week of workout
+plans written with one `add_weekly_workout_plan` call against seven
+`add_workout_plan` calls. These are local execution costs only: they
+exclude the toolbox server and BigQuery round trips.
+"""
+
+import datetime
+import json
+import statistics
+import time
+from collections.abc import Callable
+
+import pytest
+
+from app.utils import local_toolbox
+from app.utils.local_toolbox import LocalToolbox
+from app.utils.toolbox import TOOLS_FILE, TOOLSET_NAME
+
+USERS = 200
+DAYS = 3 * 365
+REPEATS = 20
+
+
+def _median_ms(call: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def test_local_toolset_timings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(local_toolbox, "LOCAL_TOOLBOX_USERS", USERS)
+    monkeypatch.setattr(local_toolbox, "LOCAL_TOOLBOX_DAYS", DAYS)
+    start = time.perf_counter()
+    toolbox = LocalToolbox(TOOLS_FILE)
+    elapsed = time.perf_counter() - start
+    print(f"\nGenerated {USERS} users x {DAYS} days in {elapsed:.1f}s")
+    tools = {tool.__name__: tool for tool in toolbox.load_toolset(TOOLSET_NAME)}
+
+    rows = json.loads(tools["get_fitness_data_for_user"](email="user7@example.com"))
+    assert len(rows) == DAYS
+    read_ms = _median_ms(
+        lambda: tools["get_fitness_data_for_user"](email="user7@example.com")
+    )
+    list_ms = _median_ms(tools["list_distinct_users"])
+
+    dates = [
+        (datetime.date(2030, 1, 6) + datetime.timedelta(days=i)).isoformat()
+        for i in range(7)
+    ]
+    day = {
+        "goal": "Strength",
+        "warm_up_phase": "Jog",
+        "main_workout_phase": "Squats",
+        "cool_down_phase": "Stretch",
+    }
+
+    def daily_plans() -> None:
+        for date in dates:
+            tools["add_workout_plan"](
+                email="a@example.com", date=date, day="Monday", **day
+            )
+
+    def weekly_plan() -> None:
+        tools["add_weekly_workout_plan"](
+            email="b@example.com",
+            dates=dates,
+            days=["Monday"] * 7,
+            goals=[day["goal"]] * 7,
+            warm_up_phases=[day["warm_up_phase"]] * 7,
+            main_workout_phases=[day["main_workout_phase"]] * 7,
+            cool_down_phases=[day["cool_down_phase"]] * 7,
+        )
+
+    statements = toolbox.statements
+    daily_ms = _median_ms(daily_plans)
+    weekly_ms = _median_ms(weekly_plan)
+    assert toolbox.statements - statements == 8 * REPEATS
+
+    print(f"get_fitness_data_for_user ({DAYS} rows): {read_ms:.2f} ms")
+    print(f"list_distinct_users ({USERS} users): {list_ms:.2f} ms")
+    print(
+        f"week of plans: 7x add_workout_plan {daily_ms:.2f} ms, "
+        f"add_weekly_workout_plan {weekly_ms:.2f} ms"
+    )
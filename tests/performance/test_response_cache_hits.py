@@ -0,0 +1,117 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Hit rate and latency of the gym assistant's response cache.
+
+TURNS users each open a session with one question, drawn with a skew from
+QUESTIONS: a few general wellness questions in several phrasings, and some
+that carry the user's email and must always reach the model. The model is a
+stand-in answering in MODEL_SECONDS.
+"""
+
+import asyncio
+import random
+import statistics
+import time
+from collections.abc import AsyncGenerator
+
+import pytest
+from google.adk.agents import Agent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from app.utils import response_cache
+from app.utils.response_cache import ResponseCache
+
+MODEL_SECONDS = 0.1
+TURNS = 100
+
+QUESTIONS = [
+    [
+        "How much protein do I need?",
+        "how much protein do i need??",
+        "Hi, how much protein do I need",
+    ],
+    ["Is stretching before running good?", "is stretching before running good"],
+    ["How many hours should I sleep?", "How many hours should I sleep, please?"],
+    ["What should I eat before a workout?"],
+    ["How do I avoid shin splints?"],
+    ["Is creatine safe?", "is creatine safe ?"],
+    ["What's my protein target? I'm user{number}@example.com"],
+]
+
+
+class SlowLlm(BaseLlm):
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(MODEL_SECONDS)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text="Answer")])
+        )
+
+
+def test_repeated_questions_hit_the_response_cache(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cache = ResponseCache()
+    monkeypatch.setattr(response_cache, "_cache", cache)
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE_ENABLED", True)
+    agent = Agent(
+        name="gym_assistant",
+        model=SlowLlm(model="stand-in"),
+        before_model_callback=response_cache.cached_response,
+        after_model_callback=response_cache.store_response,
+    )
+    runner = InMemoryRunner(agent=agent)
+    rng = random.Random(0)
+    # Earlier questions are asked more often
+    weights = [1 / (rank + 1) for rank in range(len(QUESTIONS))]
+
+    async def turns() -> list[float]:
+        latencies = []
+        for number in range(TURNS):
+            (phrasings,) = rng.choices(QUESTIONS, weights)
+            message = rng.choice(phrasings).format(number=number)
+            session = await runner.session_service.create_session(
+                app_name=runner.app_name, user_id=f"user{number}"
+            )
+            start = time.perf_counter()
+            async for _ in runner.run_async(
+                user_id=f"user{number}",
+                session_id=session.id,
+                new_message=types.Content(
+                    role="user", parts=[types.Part(text=message)]
+                ),
+            ):
+                pass
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    latencies = asyncio.run(turns())
+    stats = cache.stats()
+    fast = sorted(latency for latency in latencies if latency < MODEL_SECONDS)
+    slow = sorted(latency for latency in latencies if latency >= MODEL_SECONDS)
+    print(
+        f"\n{TURNS} turns, {MODEL_SECONDS * 1000:.0f} ms model: "
+        f"hit ratio {stats['hit_ratio']:.0%} ({stats['hits']} hits, "
+        f"{stats['misses']} misses, {stats['skipped']} skipped with user data); "
+        f"hits p50 {statistics.median(fast) * 1000:.1f} ms, "
+        f"model turns p50 {statistics.median(slow) * 1000:.0f} ms, "
+        f"{stats['latency_saved_seconds']:.1f} s of model time saved"
+    )
+    assert stats["hits"] == len(fast)
+    assert stats["hit_ratio"] > 0.8
+    assert statistics.median(fast) < 0.01
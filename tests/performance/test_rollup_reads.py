@@ -0,0 +1,95 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Cost of a user's health context as their history grows, before and after.
+
+"before" reads every raw `fitness_data` row of the user, as each turn did.
+"after" is one incremental rollup run after a day of new data, and the
+`get_fitness_rollup_for_user` read of the precomputed row. Both run on the
+local SQLite toolbox with synthetic data, without the user cache.
+"""
+
+import datetime
+import json
+import statistics
+import time
+
+import pytest
+
+from app.utils import fitness_rollups, local_toolbox, user_cache
+from app.utils.fitness_rollups import (
+    SQLiteRollupStore,
+    get_fitness_rollup_for_user,
+    run_rollup_job,
+)
+from app.utils.local_toolbox import LocalToolbox
+from app.utils.toolbox import TOOLS_FILE, TOOLSET_NAME
+from app.utils.user_cache import UserDataCache
+
+USERS = 50
+HISTORY_DAYS = (90, 365, 3 * 365)
+REPEATS = 50
+
+
+def test_rollup_reads_stay_flat(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(local_toolbox, "LOCAL_TOOLBOX_USERS", USERS)
+    # A zero TTL times every read against the store
+    monkeypatch.setattr(user_cache, "_cache", UserDataCache(ttl_seconds=0))
+    read_ms = []
+    for days in HISTORY_DAYS:
+        monkeypatch.setattr(local_toolbox, "LOCAL_TOOLBOX_DAYS", days)
+        toolbox = LocalToolbox(TOOLS_FILE)
+        store = SQLiteRollupStore(toolbox.connection)
+        monkeypatch.setattr(fitness_rollups, "_store", store)
+        (raw_read,) = [
+            tool
+            for tool in toolbox.load_toolset(TOOLSET_NAME)
+            if tool.__name__ == "get_fitness_data_for_user"
+        ]
+        backfill = run_rollup_job()
+
+        tomorrow = backfill["watermark"] + datetime.timedelta(days=1)
+        toolbox.connection.executemany(
+            f"INSERT INTO `{toolbox.tables['fitness_data']}` (email, date, steps) "
+            "VALUES (?, ?, 9000)",
+            [(f"user{i}@example.com", tomorrow.isoformat()) for i in range(USERS)],
+        )
+        start = time.perf_counter()
+        incremental = run_rollup_job()
+        incremental_ms = (time.perf_counter() - start) * 1000
+
+        timings = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            raw = raw_read(email="user3@example.com")
+            timings.append(time.perf_counter() - start)
+        raw_ms = statistics.median(timings) * 1000
+        timings = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            rollup = get_fitness_rollup_for_user("user3@example.com")
+            timings.append(time.perf_counter() - start)
+        read_ms.append(statistics.median(timings) * 1000)
+
+        print(
+            f"\n{days} days of history: raw read {raw_ms:.2f} ms, "
+            f"{len(raw)} chars; rollup read {read_ms[-1]:.3f} ms, "
+            f"{len(json.dumps(rollup))} chars; incremental run read "
+            f"{incremental['raw_rows']} rows in {incremental_ms:.1f} ms "
+            f"(backfill read {backfill['raw_rows']})"
+        )
+        # The lookback window plus the watermark day and the new day
+        lookback = fitness_rollups.ROLLUP_LOOKBACK_DAYS
+        assert incremental["raw_rows"] == USERS * (lookback + 2)
+    assert max(read_ms) < 5 * statistics.median(read_ms)
@@ -0,0 +1,170 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Session size and prompt size per turn after one diet plan image.
+
+"before" replays the previous `generate_diet_plan_image` result, which carried
+the PNG as `base64_image`. "after" runs the current tool against local fakes,
+so its result holds only the artifact reference. Every later turn re-sends the
+session history, built here with ADK's own content assembly. Prompt tokens
+are estimated at 4 characters per token.
+"""
+
+import asyncio
+import base64
+import json
+import os
+from collections.abc import Iterator
+from io import BytesIO
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from google.adk.events import Event
+from google.adk.flows.llm_flows.contents import _get_contents
+from google.adk.sessions import Session
+from google.genai import types
+from PIL import Image
+
+from app.utils import clients, media_renditions, media_spool, user_cache
+
+LATER_TURNS = 5
+CHARS_PER_TOKEN = 4
+AGENT = "diet_image_agent"
+
+
+def _generated_png() -> bytes:
+    image = Image.frombytes("RGB", (1024, 1024), os.urandom(1024 * 1024 * 3))
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class FakeToolContext:
+    def __init__(self) -> None:
+        self.state: dict[str, Any] = {}
+
+    async def save_artifact(self, filename: str, artifact: Any) -> int:
+        return 0
+
+
+@pytest.fixture
+def fake_clients(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[bytes]:
+    png = _generated_png()
+    monkeypatch.setenv("GOOGLE_CLOUD_PROJECT", "test-project")
+    # Imported here: the nutrition_agent package resolves the project on import
+    from nutrition_agent import queries
+
+    backend = queries.SQLiteBackend()
+    backend.load_rows(
+        queries.user_fitness_table(),
+        [
+            {
+                "email": "ada@example.com",
+                "date": "2025-01-01",
+                **dict.fromkeys(queries.PROFILE_COLUMNS),
+                "name": "Ada",
+                "weight": 70,
+                "target_weight": 65,
+                "goal": "lose weight",
+                "dietary_restrictions": "none",
+                "activity_level": "active",
+            }
+        ],
+    )
+    monkeypatch.setattr(queries, "_backend", backend)
+    monkeypatch.setattr(user_cache, "_cache", user_cache.UserDataCache())
+    image_part = SimpleNamespace(inline_data=SimpleNamespace(data=png), text=None)
+    response = SimpleNamespace(
+        candidates=[SimpleNamespace(content=SimpleNamespace(parts=[image_part]))]
+    )
+    blob = SimpleNamespace(upload_from_filename=lambda *args, **kwargs: None)
+    clients.register_client_factory(
+        "genai",
+        lambda: SimpleNamespace(
+            models=SimpleNamespace(generate_content=lambda **kwargs: response)
+        ),
+    )
+    clients.register_client_factory(
+        "storage",
+        lambda: SimpleNamespace(
+            bucket=lambda name: SimpleNamespace(
+                blob=lambda n: blob, get_blob=lambda n: None
+            )
+        ),
+    )
+    monkeypatch.setattr(media_spool, "_spool", media_spool.MediaSpool(str(tmp_path)))
+    processor = media_renditions.MediaPostProcessor(max_workers=1)
+    monkeypatch.setattr(media_renditions, "_post_processor", processor)
+    yield png
+    processor.shutdown()
+    clients.reset_clients()
+
+
+def _event(author: str, role: str, part: types.Part) -> Event:
+    return Event(author=author, content=types.Content(role=role, parts=[part]))
+
+
+def _session_with(result: dict) -> Session:
+    call = types.FunctionCall(
+        id="call-1", name="generate_diet_plan_image", args={"email": "ada@example.com"}
+    )
+    response = types.FunctionResponse(id="call-1", name=call.name, response=result)
+    events = [
+        _event("user", "user", types.Part(text="Show me my diet plan")),
+        _event(AGENT, "model", types.Part(function_call=call)),
+        _event(AGENT, "user", types.Part(function_response=response)),
+    ]
+    for turn in range(LATER_TURNS):
+        events.append(_event("user", "user", types.Part(text=f"Follow-up {turn}")))
+        events.append(_event(AGENT, "model", types.Part(text="Sure, here you go.")))
+    return Session(id="s", app_name="nutrition_agent", user_id="u", events=events)
+
+
+def _measure(result: dict) -> tuple[int, int]:
+    session = _session_with(result)
+    session_bytes = len(session.model_dump_json())
+    contents = _get_contents(None, session.events, AGENT)
+    prompt_chars = len(
+        json.dumps([c.model_dump(mode="json", exclude_none=True) for c in contents])
+    )
+    return session_bytes, prompt_chars // CHARS_PER_TOKEN
+
+
+def test_media_reference_keeps_sessions_small(fake_clients: bytes) -> None:
+    # Imported here: the nutrition_agent package resolves the project on import
+    from nutrition_agent.sub_agents.diet_image_agent import generate_diet_plan_image
+
+    legacy = {
+        "status": "success",
+        "message": "Diet plan image created for Ada!",
+        "filename": "diet_plan_20250101_120000.png",
+        "base64_image": base64.b64encode(fake_clients).decode("utf-8"),
+        "user_goal": "lose weight",
+    }
+    current = asyncio.run(
+        generate_diet_plan_image("ada@example.com", tool_context=FakeToolContext())
+    )
+    assert current["status"] == "success"
+    assert "base64_image" not in current
+
+    before_session, before_tokens = _measure(legacy)
+    after_session, after_tokens = _measure(current)
+    print(
+        f"\nafter one {len(fake_clients) // 1024} KiB image: session "
+        f"{before_session // 1024} KiB -> {after_session // 1024} KiB; prompt per "
+        f"later turn ~{before_tokens} -> ~{after_tokens} tokens"
+    )
+    assert after_tokens * 100 < before_tokens
@@ -0,0 +1,111 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Throughput of concurrent sessions calling `get_fitness_data_for_user`.
+
+A local toolbox server (`create_toolbox_app` over synthetic data, with
+INVOKE_SECONDS of added latency standing in for BigQuery) runs in its own
+thread. SESSIONS sessions share one event loop, like the ADK server, and each
+reads CALLS users' fitness data in turn.
+
+"before" calls the tools of a `ToolboxSyncClient` from the sessions, which
+blocks the event loop for every round trip. "after" awaits the registry's
+async tools over the pooled session.
+"""
+
+import asyncio
+import socket
+import threading
+import time
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import pytest
+from aiohttp import web
+from toolbox_core import ToolboxSyncClient
+
+from app.utils import local_toolbox, user_cache
+from app.utils.local_toolbox import LocalToolbox, create_toolbox_app
+from app.utils.toolbox import TOOLS_FILE, TOOLSET_NAME, ToolboxRegistry
+from app.utils.user_cache import UserDataCache
+
+USERS = 50
+DAYS = 90
+INVOKE_SECONDS = 0.02
+SESSIONS = 20
+CALLS = 5
+
+
+@pytest.fixture
+def toolbox_url(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    monkeypatch.setattr(local_toolbox, "LOCAL_TOOLBOX_USERS", USERS)
+    monkeypatch.setattr(local_toolbox, "LOCAL_TOOLBOX_DAYS", DAYS)
+    # A zero TTL sends every read to the server
+    monkeypatch.setattr(user_cache, "_cache", UserDataCache(ttl_seconds=0))
+    app = create_toolbox_app(LocalToolbox(TOOLS_FILE), INVOKE_SECONDS)
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{port}"
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+async def _sessions(read: Callable[[str], Any]) -> float:
+    """Runs the sessions concurrently; returns the tool calls per second."""
+
+    async def session(number: int) -> None:
+        for call in range(CALLS):
+            result = read(f"user{(number * CALLS + call) % USERS}@example.com")
+            if asyncio.iscoroutine(result):
+                result = await result
+            assert result.startswith("[")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session(number) for number in range(SESSIONS)))
+    return SESSIONS * CALLS / (time.perf_counter() - start)
+
+
+def test_concurrent_sessions_throughput(toolbox_url: str) -> None:
+    client = ToolboxSyncClient(toolbox_url)
+    tools = {tool.__name__: tool for tool in client.load_toolset(TOOLSET_NAME)}
+    sync_read = tools["get_fitness_data_for_user"]
+    before = asyncio.run(_sessions(lambda email: sync_read(email=email)))
+    client.close()
+
+    registry = ToolboxRegistry(url=toolbox_url, cache_dir=None)
+    (async_read,) = registry.tools(["get_fitness_data_for_user"])
+
+    async def pooled() -> float:
+        try:
+            return await _sessions(lambda email: async_read(email=email))
+        finally:
+            await registry.aclose()
+
+    after = asyncio.run(pooled())
+    print(
+        f"\n{SESSIONS} sessions x {CALLS} calls, {INVOKE_SECONDS * 1000:.0f} ms "
+        f"per call: ToolboxSyncClient {before:.0f} calls/s, "
+        f"async ToolboxClient {after:.0f} calls/s ({after / before:.1f}x)"
+    )
+    assert after > 2 * before
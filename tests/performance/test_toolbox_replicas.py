@@ -0,0 +1,141 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Tail latency of toolbox calls with a cold replica among the endpoints.
+
+Two local toolbox servers (`create_toolbox_app` over synthetic data) run in
+their own thread: a warm one answering in WARM_SECONDS and a cold one, like a
+Cloud Run instance that just started, answering in COLD_SECONDS. SESSIONS
+sessions on one event loop each make CALLS calls to
+`get_fitness_data_for_user`.
+
+"before" spreads the calls round robin over both endpoints. "after" lets the
+registry's `ToolboxBalancer` pick: slow start sends the cold replica a single
+call, and that call, far slower than the warm replica's, ejects it. The cold
+replica thus serves exactly one of the SESSIONS * CALLS calls, well under the
+1% that p99 could land on.
+"""
+
+import asyncio
+import itertools
+import socket
+import statistics
+import threading
+import time
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import pytest
+from aiohttp import web
+
+from app.utils import local_toolbox, user_cache
+from app.utils.local_toolbox import LocalToolbox, create_toolbox_app
+from app.utils.toolbox import TOOLS_FILE, ToolboxRegistry
+from app.utils.user_cache import UserDataCache
+
+USERS = 20
+DAYS = 30
+WARM_SECONDS = 0.02
+COLD_SECONDS = 0.3
+SESSIONS = 10
+CALLS = 50
+
+
+@pytest.fixture
+def toolbox_urls(monkeypatch: pytest.MonkeyPatch) -> Iterator[tuple[str, str]]:
+    monkeypatch.setattr(local_toolbox, "LOCAL_TOOLBOX_USERS", USERS)
+    monkeypatch.setattr(local_toolbox, "LOCAL_TOOLBOX_DAYS", DAYS)
+    # A zero TTL sends every read to the server
+    monkeypatch.setattr(user_cache, "_cache", UserDataCache(ttl_seconds=0))
+    toolbox = LocalToolbox(TOOLS_FILE)
+
+    loop = asyncio.new_event_loop()
+    runners, urls = [], []
+    for latency in (WARM_SECONDS, COLD_SECONDS):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        runner = web.AppRunner(create_toolbox_app(toolbox, latency))
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+        runners.append(runner)
+        urls.append(f"http://127.0.0.1:{port}")
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield urls[0], urls[1]
+    for runner in runners:
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+async def _sessions(read: Callable[[str], Any]) -> list[float]:
+    """Runs the sessions concurrently; returns every call's latency."""
+    latencies: list[float] = []
+
+    async def session(number: int) -> None:
+        for call in range(CALLS):
+            start = time.perf_counter()
+            result = await read(f"user{(number * CALLS + call) % USERS}@example.com")
+            latencies.append(time.perf_counter() - start)
+            assert result.startswith("[")
+
+    await asyncio.gather(*(session(number) for number in range(SESSIONS)))
+    return latencies
+
+
+def _percentiles(latencies: list[float]) -> tuple[float, float]:
+    cuts = statistics.quantiles(latencies, n=100)
+    return cuts[49] * 1000, cuts[98] * 1000
+
+
+def test_balancer_keeps_p99_off_the_cold_replica(
+    toolbox_urls: tuple[str, str],
+) -> None:
+    registries = [ToolboxRegistry(url=url, cache_dir=None) for url in toolbox_urls]
+    replicas = itertools.cycle(
+        [registry.tools(["get_fitness_data_for_user"])[0] for registry in registries]
+    )
+
+    async def round_robin() -> list[float]:
+        try:
+            return await _sessions(lambda email: next(replicas)(email=email))
+        finally:
+            for registry in registries:
+                await registry.aclose()
+
+    before = _percentiles(asyncio.run(round_robin()))
+
+    registry = ToolboxRegistry(url=",".join(toolbox_urls), cache_dir=None)
+    (read,) = registry.tools(["get_fitness_data_for_user"])
+
+    async def balanced() -> list[float]:
+        try:
+            return await _sessions(lambda email: read(email=email))
+        finally:
+            await registry.aclose()
+
+    after = _percentiles(asyncio.run(balanced()))
+    cold = registry.balancer.endpoints[1]
+    print(
+        f"\n{SESSIONS} sessions x {CALLS} calls, warm replica "
+        f"{WARM_SECONDS * 1000:.0f} ms, cold replica {COLD_SECONDS * 1000:.0f} ms: "
+        f"round robin p50 {before[0]:.0f} ms / p99 {before[1]:.0f} ms, "
+        f"balanced p50 {after[0]:.0f} ms / p99 {after[1]:.0f} ms "
+        f"({cold.calls} calls to the cold replica)"
+    )
+    assert (cold.calls, cold.ejections) == (1, 1)
+    assert after[0] < before[0]
+    assert after[1] < COLD_SECONDS * 1000
@@ -0,0 +1,121 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Hit ratio and latency saved by the shared user cache over typical conversations.
+
+Each conversation reads the user's fitness data a few times through the
+toolbox, writes a workout plan, reads the fitness data again, and fetches the
+nutrition profile a few times from a local query backend. Every query and
+toolbox round trip takes READ_SECONDS. "before" runs with a TTL of zero, i.e. without caching.
+"""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+from toolbox_core.protocol import ParameterSchema
+
+from app.utils import toolbox, user_cache
+from app.utils.toolbox import ToolboxRegistry
+
+READ_SECONDS = 0.02
+CONVERSATIONS = 10
+EMAIL_PARAM = ParameterSchema(name="email", type="string", description="User email.")
+
+
+class SlowTool:
+    def __init__(self, name: str) -> None:
+        self.__name__ = name
+        self._description = name
+        self._params = [EMAIL_PARAM]
+
+    async def __call__(self, **kwargs: Any) -> str:
+        await asyncio.sleep(READ_SECONDS)
+        return "[]"
+
+
+class SlowToolboxClient:
+    def __init__(self, url: str, session: Any = None) -> None:
+        pass
+
+    async def load_toolset(self, name: str) -> list[SlowTool]:
+        return [SlowTool(n) for n in ("get_fitness_data_for_user", "add_workout_plan")]
+
+
+@pytest.fixture
+def slow_backends(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("GOOGLE_CLOUD_PROJECT", "test-project")
+    monkeypatch.setattr(toolbox, "ToolboxClient", SlowToolboxClient)
+    # Imported here: the nutrition_agent package resolves the project on import
+    from nutrition_agent import queries
+
+    backend = queries.SQLiteBackend(latency_seconds=READ_SECONDS)
+    backend.load_rows(
+        queries.user_fitness_table(),
+        [
+            {
+                "email": f"user{i}@example.com",
+                "date": "2025-01-01",
+                **dict.fromkeys(queries.PROFILE_COLUMNS, 1),
+            }
+            for i in range(CONVERSATIONS)
+        ],
+    )
+    monkeypatch.setattr(queries, "_backend", backend)
+
+
+def _conversations(tmp_path: Path, ttl_seconds: float) -> tuple[float, dict]:
+    # Imported here: the nutrition_agent package resolves the project on import
+    from nutrition_agent.sub_agents.diet_planner_agent import get_user_nutrition_plan
+
+    cache = user_cache.UserDataCache(ttl_seconds=ttl_seconds)
+    user_cache._cache = cache
+    registry = ToolboxRegistry(
+        url="http://toolbox", cache_dir=str(tmp_path), tools_file=None
+    )
+    read, write = registry.tools()
+
+    async def conversations() -> None:
+        for i in range(CONVERSATIONS):
+            email = f"user{i}@example.com"
+            for _ in range(3):
+                await read(email=email)
+            await write(email=email)
+            await read(email=email)
+            for _ in range(3):
+                get_user_nutrition_plan(email)
+        await registry.aclose()
+
+    start = time.perf_counter()
+    asyncio.run(conversations())
+    return time.perf_counter() - start, cache.stats()
+
+
+def test_user_cache_hit_ratio_and_latency_saved(
+    slow_backends: None, tmp_path: Path
+) -> None:
+    try:
+        before_s, _ = _conversations(tmp_path / "before", ttl_seconds=0)
+        after_s, stats = _conversations(tmp_path / "after", ttl_seconds=300)
+    finally:
+        user_cache._cache = None
+    print(
+        f"\n{CONVERSATIONS} conversations: {before_s:.2f}s -> {after_s:.2f}s; hit "
+        f"ratio {stats['hit_ratio']:.0%}, {stats['latency_saved_seconds']:.2f}s of "
+        f"reads saved, {stats['invalidations']} invalidations"
+    )
+    assert stats["hit_ratio"] > 0.5
+    assert after_s < before_s
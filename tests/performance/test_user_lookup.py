@@ -0,0 +1,59 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Registration check cost as the user base grows, before and after.
+
+"before" is the `list_distinct_users` result the model had to read before
+every registration: all emails, so its prompt tokens grow with the user base.
+"after" is `is_user_registered` on a warm index: the lookup time and the
+size of its result. Prompt tokens are estimated at 4 characters per token.
+"""
+
+import json
+import statistics
+import time
+
+from app.utils.user_index import UserEmailIndex
+
+USER_COUNTS = (1_000, 100_000, 1_000_000)
+LOOKUPS = 10_000
+CHARS_PER_TOKEN = 4
+
+
+def test_registration_check_stays_flat() -> None:
+    lookup_us = []
+    for count in USER_COUNTS:
+        emails = [f"user{i}@example.com" for i in range(count)]
+        index = UserEmailIndex(lambda emails=emails: emails)
+        index.contains("warm@example.com")
+
+        start = time.perf_counter()
+        for i in range(LOOKUPS):
+            index.contains(f"user{i * 7 % (2 * count)}@example.com")
+        lookup_us.append((time.perf_counter() - start) / LOOKUPS * 1e6)
+
+        before = len(json.dumps([{"email": e} for e in emails])) // CHARS_PER_TOKEN
+        after = (
+            len(
+                json.dumps(
+                    {"status": "success", "email": emails[0], "registered": True}
+                )
+            )
+            // CHARS_PER_TOKEN
+        )
+        print(
+            f"\n{count} users: list_distinct_users ~{before} tokens; "
+            f"is_user_registered ~{after} tokens, {lookup_us[-1]:.2f} us per lookup"
+        )
+    assert max(lookup_us) < 5 * statistics.median(lookup_us)
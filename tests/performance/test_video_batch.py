@@ -0,0 +1,102 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Wall-clock time of a weekly plan's clips, one by one versus as one batch.
+
+A fake Veo client finishes each generation after a fixed, per-clip duration,
+scaled down from the usual 2-3 minutes. A batch should take about as long as
+its slowest clip instead of the sum of all of them.
+"""
+
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from app.utils.video_jobs import VideoJobManager
+
+# Seconds per clip, standing in for minutes
+CLIP_SECONDS = [0.6, 0.9, 0.7, 1.0, 0.8, 0.6, 0.9]
+
+
+class TimedClient:
+    def __init__(self) -> None:
+        self.vertexai = False
+        self.finish_at: dict[str, float] = {}
+        self.models = SimpleNamespace(generate_videos=self._generate_videos)
+        self.operations = SimpleNamespace(get=self._get)
+        self.files = SimpleNamespace(download=self._download)
+
+    def _generate_videos(self, prompt: str, **kwargs: Any) -> Any:
+        name = f"operations/{len(self.finish_at)}"
+        self.finish_at[name] = time.monotonic() + CLIP_SECONDS[int(prompt.split()[-1])]
+        return SimpleNamespace(name=name, done=False)
+
+    def _get(self, operation: Any) -> Any:
+        if time.monotonic() < self.finish_at[operation.name]:
+            return operation
+        video = SimpleNamespace(uri=None, video_bytes=None)
+        return SimpleNamespace(
+            name=operation.name,
+            done=True,
+            error=None,
+            response=SimpleNamespace(generated_videos=[SimpleNamespace(video=video)]),
+        )
+
+    def _download(self, file: Any) -> None:
+        file.video_bytes = b"mp4"
+
+
+class NullStorage:
+    name = "null"
+
+    def bucket(self, name: str) -> Any:
+        return SimpleNamespace(blob=lambda blob_name: self, get_blob=lambda name: None)
+
+    def upload_from_file(self, file_obj: Any, content_type: str) -> None:
+        pass
+
+
+def _manager() -> VideoJobManager:
+    return VideoJobManager(
+        client=TimedClient(),
+        storage_client=NullStorage(),
+        initial_interval=0.05,
+        max_interval=0.1,
+        submits_per_minute=6000,
+    )
+
+
+def test_weekly_batch_takes_about_the_slowest_clip() -> None:
+    prompts = [(f"day {i}", "16:9", "") for i in range(len(CLIP_SECONDS))]
+
+    manager = _manager()
+    start = time.monotonic()
+    for request in prompts:
+        manager.wait(manager.submit(*request).job_id)
+    serial_s = time.monotonic() - start
+
+    manager = _manager()
+    start = time.monotonic()
+    batch = manager.submit_batch(prompts)
+    seen: set[int] = set()
+    while not batch.done:
+        seen.update(manager.wait_batch(batch, seen, timeout=10))
+    batch_s = time.monotonic() - start
+
+    print(
+        f"\n{len(prompts)} clips: one by one {serial_s:.2f}s, batch {batch_s:.2f}s, "
+        f"slowest clip {max(CLIP_SECONDS):.2f}s"
+    )
+    assert batch_s < max(CLIP_SECONDS) * 1.5
+    assert batch_s < serial_s / 3
@@ -0,0 +1,131 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Peak RSS per finished Veo video, before and after the streaming pipeline.
+
+"before" reproduces the previous path: save the downloaded video to the
+working directory, upload that file, read it back and wrap the copy in an
+inline artifact. "after" runs `VideoJobManager`, which streams the downloaded
+buffer to GCS and shares it with the artifact. Each pipeline runs in a fresh
+process against in-memory fakes. The probe resets the kernel's peak RSS
+counter after its imports, since a forked process starts with its parent's
+(e.g. pytest's), and reports the peak above that baseline. Override the video size with VIDEO_BENCHMARK_MB.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+VIDEO_MB = int(os.environ.get("VIDEO_BENCHMARK_MB", "64"))
+
+PROBE = """
+import asyncio, io, json, os, sys, types as pytypes
+from google.genai import types
+from app.utils.video_jobs import VideoJob, VideoJobManager
+
+size = int(sys.argv[2]) * 2**20
+chunk = 8 * 2**20
+
+
+class Blob:
+    def __init__(self, name=""):
+        self.name = name
+
+    def upload_from_file(self, file_obj, content_type=None):
+        while file_obj.read(chunk):
+            pass
+
+    def upload_from_filename(self, filename):
+        with open(filename, "rb") as f:
+            self.upload_from_file(f)
+
+
+storage = pytypes.SimpleNamespace(bucket=lambda name: pytypes.SimpleNamespace(blob=Blob))
+
+
+class ToolContext:
+    artifacts = {}
+
+    async def save_artifact(self, filename, artifact):
+        self.artifacts[filename] = artifact
+
+
+def download(file):
+    file.video_bytes = os.urandom(size)
+
+
+def status_kb(field):
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field))
+
+
+def legacy():
+    video = types.Video()
+    download(video)
+    video.save("veo_video.mp4")
+    Blob().upload_from_filename("veo_video.mp4")
+    with open("veo_video.mp4", "rb") as f:
+        video_bytes = f.read()
+    part = types.Part(inline_data=types.Blob(mime_type="video/mp4", data=video_bytes))
+    asyncio.run(ToolContext().save_artifact("veo_video.mp4", part))
+    os.remove("veo_video.mp4")
+
+
+def streaming():
+    client = pytypes.SimpleNamespace(files=pytypes.SimpleNamespace(download=download))
+    manager = VideoJobManager(client=client, storage_client=storage)
+    video = types.Video()
+    operation = pytypes.SimpleNamespace(
+        error=None,
+        response=pytypes.SimpleNamespace(generated_videos=[pytypes.SimpleNamespace(video=video)]),
+    )
+    job = VideoJob("job", "prompt", "16:9", operation, submitted_at=0.0)
+    manager._finish(job)
+    asyncio.run(manager.save_artifact(job, ToolContext()))
+
+
+# Reset VmHWM, the peak RSS, to the current RSS
+with open("/proc/self/clear_refs", "w") as f:
+    f.write("5")
+baseline = status_kb("VmRSS")
+{"legacy": legacy, "streaming": streaming}[sys.argv[1]]()
+peak = status_kb("VmHWM")
+print(json.dumps({"peak_mb": (peak - baseline) / 1024}))
+"""
+
+
+def _peak_mb(pipeline: str, tmp_path: str) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, pipeline, str(VIDEO_MB)],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": os.getcwd()},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])["peak_mb"]
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+def test_streaming_pipeline_peak_rss(tmp_path: str) -> None:
+    before = _peak_mb("legacy", tmp_path)
+    after = _peak_mb("streaming", tmp_path)
+    print(
+        f"\npeak RSS per {VIDEO_MB} MB video: "
+        f"before {before:.0f} MB, after {after:.0f} MB"
+    )
+    assert after < before
@@ -0,0 +1,125 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+End-to-end latency of a training week plus a diet plan.
+
+The planners' models are stand-ins answering in WORKOUT_SECONDS and
+DIET_SECONDS, and each read of the user's data takes READ_SECONDS.
+
+"before" runs the two flows one after the other, each reading the user's data
+itself, like the fitness planning and nutrition conversations. "after" runs
+the wellness bundle: one read, then both planners in parallel.
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+from google.adk.agents import BaseAgent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from app.sub_agents import wellness_bundle_agent
+from app.sub_agents.wellness_bundle_agent import (
+    WellnessBundleAgent,
+    WellnessDataAgent,
+    create_wellness_bundle_agent,
+)
+
+READ_SECONDS = 0.1
+WORKOUT_SECONDS = 0.6
+DIET_SECONDS = 0.4
+
+
+class SlowLlm(BaseLlm):
+    seconds: float
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(self.seconds)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=self.model)])
+        )
+
+
+@pytest.fixture(autouse=True)
+def slow_reads(monkeypatch: pytest.MonkeyPatch) -> None:
+    def load_profile(email: str) -> dict[str, Any]:
+        time.sleep(READ_SECONDS)
+        return {"name": "Jo"}
+
+    def load_fitness(email: str) -> dict[str, Any]:
+        time.sleep(READ_SECONDS)
+        return {"status": "success", "rollup": {"steps_mean_7d": 9000}}
+
+    monkeypatch.setattr(wellness_bundle_agent, "_load_profile", load_profile)
+    monkeypatch.setattr(wellness_bundle_agent, "_load_fitness", load_fitness)
+
+
+def _planners() -> tuple[WellnessBundleAgent, list[Any]]:
+    bundle = create_wellness_bundle_agent()
+    planners = bundle.sub_agents[1].sub_agents
+    for planner, seconds in zip(planners, (WORKOUT_SECONDS, DIET_SECONDS), strict=True):
+        planner.model = SlowLlm(model=planner.name, seconds=seconds)
+    return bundle, planners
+
+
+def _time_turn(agent: BaseAgent) -> float:
+    runner = InMemoryRunner(agent=agent)
+
+    async def turn() -> float:
+        session = await runner.session_service.create_session(
+            app_name=runner.app_name, user_id="user"
+        )
+        message = types.Content(
+            role="user", parts=[types.Part(text="Plan my week, jo@example.com")]
+        )
+        start = time.perf_counter()
+        async for _ in runner.run_async(
+            user_id="user", session_id=session.id, new_message=message
+        ):
+            pass
+        return time.perf_counter() - start
+
+    return asyncio.run(turn())
+
+
+def test_bundle_takes_about_as_long_as_the_slower_planner() -> None:
+    _, (workout, diet) = _planners()
+    workout.parent_agent = diet.parent_agent = None
+    one_after_the_other = WellnessBundleAgent(
+        name="separate_flows",
+        sub_agents=[
+            WellnessDataAgent(name="workout_data"),
+            workout,
+            WellnessDataAgent(name="diet_data"),
+            diet,
+        ],
+    )
+    before = _time_turn(one_after_the_other)
+
+    bundle, _ = _planners()
+    after = _time_turn(bundle)
+    print(
+        f"\nworkout model {WORKOUT_SECONDS * 1000:.0f} ms, diet model "
+        f"{DIET_SECONDS * 1000:.0f} ms, reads {READ_SECONDS * 1000:.0f} ms: "
+        f"separate flows {before * 1000:.0f} ms, bundle {after * 1000:.0f} ms "
+        f"({before / after:.1f}x)"
+    )
+    assert after < READ_SECONDS + WORKOUT_SECONDS + 0.2
+    assert after < before
@@ -0,0 +1,81 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+import pytest
+from google.adk.agents import Agent
+from google.adk.artifacts import InMemoryArtifactService
+from google.cloud.aiplatform import initializer
+
+from app import agent_engine_app
+from app.agent_engine_app import AgentEngineApp
+
+
+@pytest.fixture
+def template(monkeypatch: pytest.MonkeyPatch) -> AgentEngineApp:
+    monkeypatch.setenv("GOOGLE_CLOUD_PROJECT", "test-project")
+    monkeypatch.setenv("GOOGLE_CLOUD_LOCATION", "us-central1")
+    monkeypatch.setenv("GOOGLE_GENAI_USE_VERTEXAI", "1")
+    monkeypatch.setattr(initializer.global_config, "_project", "test-project")
+    monkeypatch.setattr(agent_engine_app, "_init_telemetry", lambda: None)
+    built = []
+
+    def artifact_service_builder() -> InMemoryArtifactService:
+        built.append(1)
+        return InMemoryArtifactService()
+
+    app = AgentEngineApp(
+        agent=Agent(name="test_agent", model="gemini-2.5-flash"),
+        artifact_service_builder=artifact_service_builder,
+    )
+    app.set_up()
+    app.built = built
+    return app
+
+
+def test_clone_shares_agent_graph_and_services(template: AgentEngineApp) -> None:
+    clone = template.clone()
+    clone.set_up()
+
+    assert clone._tmpl_attrs["agent"] is template._tmpl_attrs["agent"]
+    assert (
+        clone._tmpl_attrs["artifact_service"]
+        is template._tmpl_attrs["artifact_service"]
+    )
+    assert len(template.built) == 1
+
+
+def test_clone_pool_hands_out_set_up_apps(template: AgentEngineApp) -> None:
+    pool = template.warm_clone_pool(2)
+    deadline = time.monotonic() + 5
+    while pool._ready.qsize() < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    clone = template.clone()
+
+    assert clone is not template
+    assert clone._is_set_up
+    assert "runner" in clone._tmpl_attrs
+
+
+def test_clones_made_without_the_pool_start_no_pool(
+    template: AgentEngineApp, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(agent_engine_app, "CLONE_POOL_SIZE", 2)
+
+    clone = template.clone()
+    clone.set_up()
+
+    assert clone._clone_pool is None
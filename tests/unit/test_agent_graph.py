@@ -0,0 +1,51 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any
+
+import google.auth
+import pytest
+
+from app import agent
+from app.utils import environment
+
+
+def test_root_agent_is_built_lazily_with_one_credentials_lookup(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls = []
+
+    def fake_default(*args: Any, **kwargs: Any) -> tuple[None, str]:
+        calls.append(1)
+        return None, "test-project"
+
+    monkeypatch.setattr(google.auth, "default", fake_default)
+    monkeypatch.delenv("GOOGLE_CLOUD_PROJECT", raising=False)
+    environment.get_project_id.cache_clear()
+    agent.get_root_agent.cache_clear()
+
+    root = agent.root_agent
+
+    assert root is agent.get_root_agent()
+    assert [a.name for a in root.sub_agents] == [
+        "fitness_planning_agent",
+        "video_generation_agent",
+        "bigquery_agent",
+        "user_registration_agent",
+        "gym_progress_agent",
+        "wellness_bundle_agent",
+    ]
+    assert len(calls) == 1
+    agent.get_root_agent.cache_clear()
+    environment.get_project_id.cache_clear()
@@ -0,0 +1,50 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils import clients
+
+
+@pytest.fixture(autouse=True)
+def restore_clients() -> Iterator[None]:
+    clients.reset_clients()
+    yield
+    clients.reset_clients()
+
+
+def test_clients_are_created_once_across_threads() -> None:
+    created = []
+
+    def factory() -> object:
+        created.append(object())
+        return created[-1]
+
+    clients.register_client_factory("bigquery", factory)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: clients.get_bigquery_client(), range(64)))
+
+    assert len(created) == 1
+    assert all(result is created[0] for result in results)
+
+
+def test_register_client_factory_replaces_existing_client() -> None:
+    clients.register_client_factory("storage", lambda: "first")
+    assert clients.get_storage_client() == "first"
+
+    clients.register_client_factory("storage", lambda: "fake")
+    assert clients.get_storage_client() == "fake"
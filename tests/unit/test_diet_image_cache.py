@@ -0,0 +1,178 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from app.utils import clients, media_renditions, media_spool, user_cache
+
+
+class FakeStorage:
+    def __init__(self) -> None:
+        self.objects: dict[str, bytes] = {}
+
+    def bucket(self, name: str) -> Any:
+        return SimpleNamespace(blob=self._blob, get_blob=self._get_blob)
+
+    def _blob(self, name: str) -> Any:
+        def upload_from_filename(path: Path, content_type: str) -> None:
+            self.objects[name] = Path(path).read_bytes()
+
+        return SimpleNamespace(
+            upload_from_filename=upload_from_filename,
+            download_as_bytes=lambda: self.objects[name],
+        )
+
+    def _get_blob(self, name: str) -> Any:
+        return self._blob(name) if name in self.objects else None
+
+
+class FakeGenai:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0.0
+        self.models = SimpleNamespace(generate_content=self._generate_content)
+
+    def _generate_content(self, **kwargs: Any) -> Any:
+        self.calls += 1
+        time.sleep(self.seconds)
+        part = SimpleNamespace(inline_data=SimpleNamespace(data=b"png %d" % self.calls))
+        return SimpleNamespace(
+            candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))]
+        )
+
+
+class FakeToolContext:
+    def __init__(self) -> None:
+        self.state: dict[str, Any] = {}
+
+    async def save_artifact(self, filename: str, artifact: Any) -> int:
+        return 0
+
+
+PROFILE = {
+    "email": "ada@example.com",
+    "date": "2025-01-01",
+    "name": "Ada",
+    "age": 36,
+    "weight": 70,
+    "target_weight": 65,
+    "height": 170,
+    "goal": "lose weight",
+    "dietary_restrictions": "none",
+    "activity_level": "active",
+    "exercise_frequency": 4,
+    "BMI": 24.2,
+}
+
+
+@pytest.fixture
+def fakes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[tuple[Any, FakeGenai, FakeStorage]]:
+    monkeypatch.setenv("GOOGLE_CLOUD_PROJECT", "test-project")
+    # Imported here: the nutrition_agent package resolves the project on import
+    from nutrition_agent import queries
+
+    backend = queries.SQLiteBackend()
+    backend.load_rows(queries.user_fitness_table(), [PROFILE])
+    monkeypatch.setattr(queries, "_backend", backend)
+    genai, storage = FakeGenai(), FakeStorage()
+    clients.register_client_factory("genai", lambda: genai)
+    clients.register_client_factory("storage", lambda: storage)
+    monkeypatch.setattr(user_cache, "_cache", user_cache.UserDataCache())
+    monkeypatch.setattr(
+        media_spool, "_spool", media_spool.MediaSpool(str(tmp_path / "spool"))
+    )
+    monkeypatch.setattr(
+        media_renditions,
+        "_post_processor",
+        SimpleNamespace(submit=lambda path: None),
+    )
+    yield backend, genai, storage
+    clients.reset_clients()
+
+
+def _generate(meal_type: str = "full day meal plan") -> dict:
+    from nutrition_agent.sub_agents.diet_image_agent import generate_diet_plan_image
+
+    return asyncio.run(
+        generate_diet_plan_image("ada@example.com", meal_type, FakeToolContext())
+    )
+
+
+def test_unchanged_profile_reuses_the_infographic(fakes: tuple) -> None:
+    _, genai, _ = fakes
+    first = _generate()
+    second = _generate()
+
+    assert genai.calls == 1
+    assert first["cached"] is False and second["cached"] is True
+    assert second["artifact"]["name"] == first["artifact"]["name"]
+
+
+def test_changed_profile_or_meal_type_regenerates(fakes: tuple) -> None:
+    backend, genai, _ = fakes
+    first = _generate()
+    backend.connection.execute(
+        "UPDATE `test-project.health_data.user_fitness_data` SET weight = 69"
+    )
+    user_cache.get_user_cache().invalidate("ada@example.com")
+    second = _generate()
+    third = _generate("breakfast")
+
+    assert genai.calls == 3
+    assert len({r["artifact"]["name"] for r in (first, second, third)}) == 3
+
+
+def test_new_worker_reads_the_infographic_from_the_bucket(
+    fakes: tuple, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _, genai, storage = fakes
+    first = _generate()
+    monkeypatch.setattr(
+        media_spool, "_spool", media_spool.MediaSpool(str(tmp_path / "other"))
+    )
+    second = _generate()
+
+    assert genai.calls == 1
+    assert second["cached"] is True
+    assert storage.objects[second["artifact"]["name"]] == b"png 1"
+    assert second["artifact"]["size_bytes"] == first["artifact"]["size_bytes"]
+
+
+def test_generation_does_not_block_the_event_loop(fakes: tuple) -> None:
+    from nutrition_agent.sub_agents.diet_image_agent import generate_diet_plan_image
+
+    _, genai, _ = fakes
+    genai.seconds = 0.2
+
+    async def two_plans() -> float:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                generate_diet_plan_image("ada@example.com", meal, FakeToolContext())
+                for meal in ("breakfast", "dinner")
+            )
+        )
+        return time.perf_counter() - start
+
+    assert asyncio.run(two_plans()) < 0.35
+    assert genai.calls == 2
@@ -0,0 +1,129 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+from types import SimpleNamespace
+from typing import Any
+
+import pyarrow as pa
+import pytest
+
+from app.utils import fitness_data
+from app.utils.fitness_data import (
+    BigQueryFitnessSource,
+    FitnessQuery,
+    LocalFitnessSource,
+    read_fitness_data,
+)
+
+START = datetime.date(2024, 1, 1)
+
+
+def _table(days: int) -> pa.Table:
+    return pa.Table.from_pylist(
+        [
+            {
+                "email": email,
+                "date": START + datetime.timedelta(days=day),
+                "weight_kg": 80.0 - day / 10,
+                "steps": 8_000 + day,
+            }
+            for email in ("ada@example.com", "bob@example.com")
+            for day in range(days)
+        ]
+    )
+
+
+def test_local_source_applies_window_projection_and_cap() -> None:
+    source = LocalFitnessSource(_table(100), batch_rows=16)
+    query = FitnessQuery(
+        email="ada@example.com",
+        start_date=START + datetime.timedelta(days=10),
+        end_date=START + datetime.timedelta(days=59),
+        columns=("steps",),
+        max_rows=30,
+    )
+    result = read_fitness_data(query, source)
+
+    assert result.table.column_names == ["date", "steps"]
+    assert result.truncated is True
+    # The cap keeps the most recent rows of the window, oldest first
+    dates = result.table["date"].to_pylist()
+    assert dates[0] == START + datetime.timedelta(days=30)
+    assert dates[-1] == START + datetime.timedelta(days=59)
+
+
+def test_query_is_parameterized_and_rejects_bad_columns() -> None:
+    query = FitnessQuery(
+        email="x' OR '1'='1", start_date=START, columns=("steps",), max_rows=5
+    )
+    sql = query.sql("p.d.t")
+
+    assert "x'" not in sql
+    assert "`date` >= @start_date" in sql and "LIMIT 6" in sql
+    assert [p.name for p in query.parameters()] == ["email", "start_date"]
+    with pytest.raises(ValueError):
+        FitnessQuery(email="a", columns=("steps; DROP TABLE t",))
+
+
+class FakeRowIterator:
+    def __init__(self, table: pa.Table) -> None:
+        self.table = table
+        self.total_rows = table.num_rows
+        self.bqstorage_client = None
+
+    def to_arrow_iterable(self, bqstorage_client: Any = None) -> Any:
+        self.bqstorage_client = bqstorage_client
+        return iter(self.table.to_batches(max_chunksize=10))
+
+
+def _bigquery(rows: FakeRowIterator) -> Any:
+    job = SimpleNamespace(result=lambda: rows)
+    return SimpleNamespace(query=lambda sql, job_config: job)
+
+
+@pytest.mark.parametrize("days, storage_api", [(20, False), (100, True)])
+def test_large_results_stream_through_the_storage_read_api(
+    days: int, storage_api: bool
+) -> None:
+    rows = FakeRowIterator(
+        _table(days).filter(pa.array([True] * days + [False] * days))
+    )
+    storage_client = object()
+    source = BigQueryFitnessSource(
+        client=_bigquery(rows),
+        storage_client=storage_client,
+        table="p.d.t",
+        storage_api_min_rows=50,
+    )
+    result = read_fitness_data(FitnessQuery(email="ada@example.com"), source)
+
+    assert result.storage_api is storage_api
+    assert (rows.bqstorage_client is storage_client) is storage_api
+    assert result.table.num_rows == days
+
+
+def test_window_tool_returns_json_rows(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(fitness_data, "_source", LocalFitnessSource(_table(10)))
+    result = fitness_data.get_fitness_data_window(
+        "ada@example.com", start_date="2024-01-08", columns=["weight_kg"]
+    )
+
+    assert result["status"] == "success"
+    assert result["rows"] == [
+        {"date": "2024-01-08", "weight_kg": 79.3},
+        {"date": "2024-01-09", "weight_kg": 79.2},
+        {"date": "2024-01-10", "weight_kg": 79.1},
+    ]
+    assert result["truncated"] is False
@@ -0,0 +1,191 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import json
+import statistics
+
+import pytest
+
+from app.utils import fitness_rollups, local_toolbox, user_cache
+from app.utils.fitness_rollups import (
+    DAILY_ROLLUPS,
+    WEEKLY_ROLLUPS,
+    SQLiteRollupStore,
+    get_fitness_rollup_for_user,
+    run_rollup_job,
+)
+from app.utils.local_toolbox import LocalToolbox
+from app.utils.toolbox import TOOLS_FILE, TOOLSET_NAME
+from app.utils.user_cache import UserDataCache
+
+DAYS = 60
+
+
+@pytest.fixture
+def toolbox(monkeypatch: pytest.MonkeyPatch) -> LocalToolbox:
+    monkeypatch.setattr(local_toolbox, "LOCAL_TOOLBOX_USERS", 3)
+    monkeypatch.setattr(local_toolbox, "LOCAL_TOOLBOX_DAYS", DAYS)
+    monkeypatch.setattr(user_cache, "_cache", UserDataCache())
+    return LocalToolbox(TOOLS_FILE)
+
+
+@pytest.fixture
+def store(toolbox: LocalToolbox, monkeypatch: pytest.MonkeyPatch) -> SQLiteRollupStore:
+    store = SQLiteRollupStore(toolbox.connection)
+    monkeypatch.setattr(fitness_rollups, "_store", store)
+    return store
+
+
+def _raw_rows(toolbox: LocalToolbox, email: str) -> list[dict]:
+    (tool,) = [
+        tool
+        for tool in toolbox.load_toolset(TOOLSET_NAME)
+        if tool.__name__ == "get_fitness_data_for_user"
+    ]
+    return sorted(json.loads(tool(email=email)), key=lambda row: row["date"])
+
+
+def _add_measurement(toolbox: LocalToolbox, email: str, date: datetime.date) -> None:
+    toolbox.execute(
+        f"INSERT INTO `{toolbox.tables['fitness_data']}` "
+        "(email, date, weight_kg, steps) VALUES (@email, @date, 80.0, 12000)",
+        {"email": email, "date": date.isoformat()},
+    )
+
+
+def test_the_first_run_rolls_up_the_whole_history(
+    toolbox: LocalToolbox, store: SQLiteRollupStore
+) -> None:
+    result = run_rollup_job()
+    assert result["raw_rows"] == 3 * DAYS
+    assert result["users"] == 3
+
+    raw = _raw_rows(toolbox, "user1@example.com")
+    rollup = get_fitness_rollup_for_user("user1@example.com")["rollup"]
+    assert rollup["days_recorded"] == DAYS
+    assert rollup["first_date"] == raw[0]["date"]
+    assert rollup["last_date"] == raw[-1]["date"]
+    assert rollup["steps_total"] == sum(row["steps"] for row in raw)
+    assert rollup["weight_kg_latest"] == raw[-1]["weight_kg"]
+    assert rollup["steps_mean_7d"] == round(
+        statistics.fmean(row["steps"] for row in raw[-7:]), 2
+    )
+    assert rollup["sleep_hours_mean_30d"] == round(
+        statistics.fmean(row["sleep_hours"] for row in raw[-30:]), 2
+    )
+    assert len(rollup["weekly_weight_kg"]) == 8
+    assert rollup["weight_trend_kg_per_week"] is not None
+
+
+def test_later_runs_only_read_rows_after_the_watermark(
+    toolbox: LocalToolbox, store: SQLiteRollupStore
+) -> None:
+    first = run_rollup_job(lookback_days=2)
+    before = get_fitness_rollup_for_user("user0@example.com")["rollup"]
+
+    # Nothing new: only the lookback window is reread, and totals do not move
+    again = run_rollup_job(lookback_days=2)
+    assert again["raw_rows"] == 3 * 3
+    assert get_fitness_rollup_for_user("user0@example.com")["rollup"] == before
+
+    next_day = first["watermark"] + datetime.timedelta(days=1)
+    _add_measurement(toolbox, "user0@example.com", next_day)
+    result = run_rollup_job(lookback_days=2)
+    assert result["raw_rows"] == 3 * 3 + 1
+    assert result["watermark"] == next_day
+
+    after = get_fitness_rollup_for_user("user0@example.com")["rollup"]
+    assert after["days_recorded"] == before["days_recorded"] + 1
+    assert after["steps_total"] == before["steps_total"] + 12000
+    assert after["last_date"] == next_day.isoformat()
+    assert after["weight_kg_latest"] == 80.0
+
+
+def test_late_rows_within_the_lookback_replace_their_day(
+    toolbox: LocalToolbox, store: SQLiteRollupStore
+) -> None:
+    first = run_rollup_job(lookback_days=2)
+    before = get_fitness_rollup_for_user("user2@example.com")["rollup"]
+
+    _add_measurement(toolbox, "user2@example.com", first["watermark"])
+    run_rollup_job(lookback_days=2)
+    after = get_fitness_rollup_for_user("user2@example.com")["rollup"]
+    assert after["days_recorded"] == before["days_recorded"]
+    assert after["steps_total"] == before["steps_total"] + 12000
+
+
+def test_a_run_that_fails_between_upserts_is_rolled_back(
+    toolbox: LocalToolbox, store: SQLiteRollupStore, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    first = run_rollup_job(lookback_days=2)
+    before = get_fitness_rollup_for_user("user0@example.com")["rollup"]
+    next_day = first["watermark"] + datetime.timedelta(days=1)
+    _add_measurement(toolbox, "user0@example.com", next_day)
+
+    upsert = store.upsert
+    upserted: list[str] = []
+
+    def failing_upsert(table: str, rows: list[dict]) -> None:
+        if table == WEEKLY_ROLLUPS:
+            raise RuntimeError("worker lost")
+        upserted.append(table)
+        upsert(table, rows)
+
+    monkeypatch.setattr(store, "upsert", failing_upsert)
+    with pytest.raises(RuntimeError):
+        run_rollup_job(lookback_days=2)
+    assert upserted == [DAILY_ROLLUPS]
+
+    monkeypatch.setattr(store, "upsert", upsert)
+    result = run_rollup_job(lookback_days=2)
+    assert result["watermark"] == next_day
+
+    after = get_fitness_rollup_for_user("user0@example.com")["rollup"]
+    assert after["days_recorded"] == before["days_recorded"] + 1
+    assert after["steps_total"] == before["steps_total"] + 12000
+
+
+def test_only_the_rollups_of_users_with_new_rows_are_read(
+    toolbox: LocalToolbox, store: SQLiteRollupStore, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    first = run_rollup_job(lookback_days=0)
+    next_day = first["watermark"] + datetime.timedelta(days=1)
+    _add_measurement(toolbox, "user0@example.com", next_day)
+    run_rollup_job(lookback_days=0)
+
+    read: list[dict] = []
+    query = store.query
+
+    def recording_query(statement: str, parameters: dict) -> list[dict]:
+        rows = query(statement, parameters)
+        if "rollups" in statement and not statement.startswith("CREATE"):
+            read.extend(rows)
+        return rows
+
+    monkeypatch.setattr(store, "query", recording_query)
+    result = run_rollup_job(lookback_days=0)
+
+    assert result["users"] == 1
+    assert read
+    assert {row["email"] for row in read} == {"user0@example.com"}
+
+
+def test_users_without_a_rollup_are_pointed_to_the_summary(
+    store: SQLiteRollupStore,
+) -> None:
+    run_rollup_job()
+    result = get_fitness_rollup_for_user("nobody@example.com")
+    assert result["status"] == "error"
+    assert "get_fitness_summary_for_user" in result["message"]
@@ -0,0 +1,90 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+from decimal import Decimal
+from typing import Any
+
+import pyarrow as pa
+import pytest
+
+from app.utils import fitness_data, user_cache
+from app.utils.fitness_summary import (
+    get_fitness_summary_for_user,
+    summarize_fitness_rows,
+)
+
+START = datetime.date(2024, 1, 1)
+
+
+def _rows(days: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "email": "ada@example.com",
+            "date": START + datetime.timedelta(days=day),
+            "weight_kg": Decimal("90.0") - Decimal(day) / 10,
+            "resting_heart_rate": 60,
+            "sleep_hours": 6.0 if day % 2 else 8.0,
+            "steps": 12_000 if day % 3 == 0 else 6_000,
+            "experience_level": "Beginner" if day < days - 1 else "Intermediate",
+        }
+        for day in range(days)
+    ]
+
+
+def test_summary_covers_trends_windows_and_profile() -> None:
+    summary = summarize_fitness_rows(list(reversed(_rows(70))))
+
+    assert summary["records"] == 70
+    assert summary["first_date"] == "2024-01-01"
+    assert summary["last_date"] == "2024-03-10"
+    weight = summary["metrics"]["weight_kg"]
+    assert weight["latest"] == 83.1
+    assert weight["trend_per_week_30d"] == -0.7
+    assert summary["weight"]["change"] == -6.9
+    assert len(summary["weight"]["weekly_means"]) == 8
+    assert summary["metrics"]["resting_heart_rate"]["mean_30d"] == 60
+    assert summary["sleep"]["nights_under_7h_30d"] == 15
+    assert summary["steps"]["days_over_10k_30d"] == 10
+    assert summary["profile"] == {"experience_level": "Intermediate"}
+    assert "email" not in summary["metrics"]
+
+
+def test_intraday_rows_are_rolled_up_per_day() -> None:
+    rows = [
+        {"timestamp": "2024-01-01T08:00:00", "heart_rate": 72, "steps": 4_000},
+        {"timestamp": "2024-01-01T20:00:00", "heart_rate": 58, "steps": 5_000},
+        {"timestamp": "2024-01-02T08:00:00", "heart_rate": 61, "steps": 3_000},
+    ]
+    summary = summarize_fitness_rows(rows)
+
+    assert summary["days"] == 2
+    assert summary["metrics"]["resting_heart_rate"]["min"] == 58
+    assert summary["metrics"]["steps"]["max"] == 9_000
+
+
+def test_tool_summarizes_the_arrow_read(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(user_cache, "_cache", user_cache.UserDataCache())
+    monkeypatch.setattr(
+        fitness_data,
+        "_source",
+        fitness_data.LocalFitnessSource(pa.Table.from_pylist(_rows(10))),
+    )
+    found = get_fitness_summary_for_user("ada@example.com")
+    missing = get_fitness_summary_for_user("bob@example.com")
+
+    assert found["status"] == "success"
+    assert found["summary"]["records"] == 10
+    assert found["truncated"] is False
+    assert missing["status"] == "error"
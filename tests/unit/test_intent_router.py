@@ -0,0 +1,114 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from collections.abc import AsyncGenerator
+
+import pytest
+from google.adk.agents import Agent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from app.utils import intent_router
+from app.utils.intent_router import INTENT_PATTERNS, classify_intent
+
+
+class FakeLlm(BaseLlm):
+    requests: int = 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.requests += 1
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=self.model)])
+        )
+
+
+@pytest.mark.parametrize(
+    ("message", "expected"),
+    [
+        ("Can you create a weekly workout plan for me?", "fitness_planning_agent"),
+        ("Make a Veo video of a sunrise run", "video_generation_agent"),
+        ("Show me my steps data for last week", "bigquery_agent"),
+        ("I want to register, my email is a@b.c", "user_registration_agent"),
+        ("Generate a funny progress picture", "gym_progress_agent"),
+        ("A workout plan and a diet plan for this week", "wellness_bundle_agent"),
+        ("Is exercise or diet more important for weight loss?", None),
+        ("How much protein should I eat?", None),
+        ("Make a video of my workout plan", None),
+        ("Don't make a video, just plan my week", None),
+        ("Is a video game good exercise?", None),
+        ("Is a fitness tracker clip worth it?", None),
+        ("I registered last week but forgot my email", None),
+    ],
+)
+def test_clear_intents_are_classified(message: str, expected: str | None) -> None:
+    assert classify_intent(message) == expected
+
+
+def test_intents_name_the_gym_assistant_sub_agents() -> None:
+    from app.agent import SUB_AGENT_FACTORIES
+
+    names = [f.__name__.removeprefix("create_") for f in SUB_AGENT_FACTORIES]
+    assert set(INTENT_PATTERNS) == set(names)
+
+
+def _run(message: str) -> tuple[FakeLlm, FakeLlm, list[str]]:
+    router = FakeLlm(model="router")
+    video = FakeLlm(model="video")
+    root = Agent(
+        name="gym_assistant",
+        model=router,
+        instruction="Delegate.",
+        before_model_callback=intent_router.route_clear_intents,
+        sub_agents=[Agent(name="video_generation_agent", model=video)],
+    )
+    runner = InMemoryRunner(agent=root)
+
+    async def turn() -> list[str]:
+        session = await runner.session_service.create_session(
+            app_name=runner.app_name, user_id="user"
+        )
+        return [
+            event.author
+            async for event in runner.run_async(
+                user_id="user",
+                session_id=session.id,
+                new_message=types.Content(
+                    role="user", parts=[types.Part(text=message)]
+                ),
+            )
+        ]
+
+    return router, video, asyncio.run(turn())
+
+
+def test_clear_intents_transfer_without_calling_the_router_model() -> None:
+    before = intent_router.get_router_stats()
+    router, video, authors = _run("Please make a short video of a squat")
+
+    assert router.requests == 0
+    assert video.requests == 1
+    assert authors[-1] == "video_generation_agent"
+    after = intent_router.get_router_stats()
+    assert after["fast_routed"] == before["fast_routed"] + 1
+
+
+def test_other_messages_go_to_the_router_model() -> None:
+    router, video, authors = _run("How much protein should I eat?")
+
+    assert (router.requests, video.requests) == (1, 0)
+    assert authors == ["gym_assistant"]
@@ -0,0 +1,114 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from app.utils import local_toolbox
+from app.utils.local_toolbox import NO_CONTENT, LocalToolbox, to_sqlite
+from app.utils.toolbox import TOOLS_FILE, TOOLSET_NAME, ToolboxRegistry
+
+
+@pytest.fixture
+def tools(monkeypatch: pytest.MonkeyPatch) -> dict:
+    monkeypatch.setattr(local_toolbox, "LOCAL_TOOLBOX_USERS", 3)
+    toolbox = LocalToolbox(TOOLS_FILE)
+    return {tool.__name__: tool for tool in toolbox.load_toolset(TOOLSET_NAME)}
+
+
+def test_array_statements_are_rewritten_for_sqlite() -> None:
+    statement = "SELECT @xs[OFFSET(i)] FROM UNNEST(@dates) AS date WITH OFFSET AS i"
+    assert to_sqlite(statement) == (
+        "SELECT json_extract(@xs, '$[' || i || ']') FROM (SELECT value AS date, "
+        "CAST(key AS INTEGER) AS i FROM json_each(@dates))"
+    )
+    assert to_sqlite("SELECT * FROM t WHERE email IN UNNEST(@emails)") == (
+        "SELECT * FROM t WHERE email IN (SELECT value FROM json_each(@emails))"
+    )
+
+
+def test_an_empty_database_is_filled_with_synthetic_users(tools: dict) -> None:
+    users = json.loads(tools["list_distinct_users"]())
+    assert len(users) == 3
+    rows = json.loads(tools["get_fitness_data_for_user"](email=users[0]["email"]))
+    assert len(rows) == local_toolbox.LOCAL_TOOLBOX_DAYS
+    assert {"date", "weight_kg", "steps"} <= set(rows[0])
+
+
+def test_writes_run_the_tools_yaml_statements(tools: dict) -> None:
+    assert (
+        tools["register_user"](
+            email="new@example.com",
+            age=30,
+            gender="female",
+            height_cm=170,
+            current_weight_kg=70,
+            goal_weight_kg=65,
+            experience_level="Beginner",
+            workout_days_per_week=3,
+            preferred_workout_types="running",
+            fitness_goals="lose weight",
+            health_notes="",
+        )
+        == NO_CONTENT
+    )
+    users = json.loads(tools["list_distinct_users"]())
+    assert {"email": "new@example.com"} in users
+
+    days = ["Monday", "Tuesday", "Wednesday"]
+    tools["add_weekly_workout_plan"](
+        email="new@example.com",
+        dates=["2025-01-06", "2025-01-07", "2025-01-08"],
+        days=days,
+        goals=["Strength", "Cardio", "Mobility"],
+        warm_up_phases=["Jog"] * 3,
+        main_workout_phases=["Squats", "Run", "Yoga"],
+        cool_down_phases=["Stretch"] * 3,
+    )
+    toolbox = tools["add_weekly_workout_plan"]._toolbox
+    plans = toolbox.execute(
+        f"SELECT * FROM `{toolbox.tables['workout_plans']}` "
+        "WHERE email = @email ORDER BY date",
+        {"email": "new@example.com"},
+    )
+    assert [plan["day"] for plan in plans] == days
+    assert plans[1]["main_workout_phase"] == "Run"
+
+
+def test_missing_required_parameters_are_rejected(tools: dict) -> None:
+    with pytest.raises(ValueError, match="email"):
+        tools["get_fitness_data_for_user"]()
+
+
+def test_the_registry_runs_locally_for_a_sqlite_url(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(local_toolbox, "LOCAL_TOOLBOX_USERS", 2)
+    database = tmp_path / "health.db"
+    registry = ToolboxRegistry(url=f"sqlite:///{database}", cache_dir=None)
+    (list_users,) = registry.tools(["list_distinct_users"])
+
+    assert len(json.loads(asyncio.run(list_users()))) == 2
+    # The database persists, and is not refilled when reopened
+    LocalToolbox(TOOLS_FILE, str(database))
+    with sqlite3.connect(database) as connection:
+        count = connection.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'"
+        ).fetchone()[0]
+    assert count == 3
+    assert len(json.loads(asyncio.run(list_users()))) == 2
@@ -0,0 +1,85 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from io import BytesIO
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from PIL import Image
+
+from app.utils.media_renditions import (
+    MediaPostProcessor,
+    render,
+    rendition_names,
+)
+from app.utils.media_spool import MediaSpool
+
+
+def _png(size: tuple[int, int] = (640, 480)) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", size, (200, 80, 40)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class FakeStorageClient:
+    def __init__(self) -> None:
+        self.uploads: dict[str, str] = {}
+        self.threads: set[str] = set()
+
+    def bucket(self, name: str) -> Any:
+        return SimpleNamespace(blob=lambda blob_name: FakeBlob(self, blob_name))
+
+
+class FakeBlob:
+    def __init__(self, storage: FakeStorageClient, name: str) -> None:
+        self.storage = storage
+        self.name = name
+
+    def upload_from_filename(self, filename: Path, content_type: str) -> None:
+        self.storage.uploads[self.name] = content_type
+        self.storage.threads.add(threading.current_thread().name)
+
+
+def test_render_produces_thumbnail_and_full_size_renditions(tmp_path: Path) -> None:
+    original = tmp_path / "gym_progress_abc.png"
+    original.write_bytes(_png())
+
+    renditions, cpu_s = render(str(original))
+
+    assert set(renditions) == set(rendition_names(original.name))
+    thumbnail = Image.open(BytesIO(renditions["thumbnail"]))
+    assert thumbnail.format == "WEBP" and max(thumbnail.size) == 256
+    assert Image.open(BytesIO(renditions["webp"])).size == (640, 480)
+    assert cpu_s > 0
+
+
+def test_post_processor_spools_and_uploads_renditions(tmp_path: Path) -> None:
+    spool = MediaSpool(str(tmp_path), max_bytes=10 * 2**20)
+    storage = FakeStorageClient()
+    processor = MediaPostProcessor(max_workers=1, spool=spool, storage_client=storage)
+    original = spool.write(_png(), "diet_plan", ".png")
+
+    try:
+        paths = processor.submit(original).result(timeout=60)
+    finally:
+        processor.shutdown()
+
+    names = rendition_names(original.name)
+    assert {rendition: path.name for rendition, path in paths.items()} == names
+    assert all(spool.get(name) for name in names.values())
+    assert storage.uploads[names["thumbnail"]] == "image/webp"
+    # Not on the process pool's management thread
+    assert all(name.startswith("media-store") for name in storage.threads)
@@ -0,0 +1,70 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from app.utils.media_spool import MediaSpool
+
+
+def test_names_are_derived_from_content(tmp_path: Path) -> None:
+    spool = MediaSpool(str(tmp_path), max_bytes=1000)
+    first = spool.write(b"a" * 10, "gym_progress", ".png")
+    second = spool.write(b"b" * 10, "gym_progress", ".png")
+    again = spool.write(b"a" * 10, "gym_progress", ".png")
+
+    assert first != second
+    assert again == first
+    assert first.name.startswith("gym_progress_") and first.suffix == ".png"
+    assert spool.total_bytes == 20
+
+
+def test_concurrent_writes_do_not_collide(tmp_path: Path) -> None:
+    spool = MediaSpool(str(tmp_path), max_bytes=10_000)
+    with ThreadPoolExecutor(8) as pool:
+        paths = list(
+            pool.map(
+                lambda i: spool.write(bytes([i]) * 10, "diet_plan", ".png"), range(50)
+            )
+        )
+
+    assert len(set(paths)) == 50
+    assert all(path.read_bytes() == bytes([i]) * 10 for i, path in enumerate(paths))
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(p.name for p in paths)
+
+
+def test_least_recently_used_files_are_evicted(tmp_path: Path) -> None:
+    spool = MediaSpool(str(tmp_path), max_bytes=30)
+    old = spool.write(b"1" * 10, "m", ".bin")
+    used = spool.write(b"2" * 10, "m", ".bin")
+    spool.write(b"3" * 10, "m", ".bin")
+    assert spool.get(used.name) == used
+
+    newest = spool.write(b"4" * 10, "m", ".bin")
+
+    assert not old.exists()
+    assert spool.get(old.name) is None
+    assert used.exists() and newest.exists()
+    assert spool.total_bytes == 30
+
+
+def test_existing_files_count_towards_the_budget(tmp_path: Path) -> None:
+    MediaSpool(str(tmp_path), max_bytes=100).write(b"x" * 40, "m", ".bin")
+    (tmp_path / ".tmp-interrupted.bin").write_bytes(b"partial")
+
+    spool = MediaSpool(str(tmp_path), max_bytes=50)
+    spool.write(b"y" * 40, "m", ".bin")
+
+    assert spool.total_bytes == 40
+    assert len(list(tmp_path.iterdir())) == 1
@@ -0,0 +1,74 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from app.utils import user_cache
+
+
+@pytest.fixture
+def queries(monkeypatch: pytest.MonkeyPatch) -> Any:
+    monkeypatch.setenv("GOOGLE_CLOUD_PROJECT", "test-project")
+    # Imported here: the nutrition_agent package resolves the project on import
+    from nutrition_agent import queries
+
+    monkeypatch.setattr(user_cache, "_cache", user_cache.UserDataCache())
+    backend = queries.SQLiteBackend()
+    backend.load_rows(
+        queries.user_fitness_table(),
+        [
+            {
+                "email": "ada@example.com",
+                "date": date,
+                **dict.fromkeys(queries.PROFILE_COLUMNS),
+                "name": "Ada",
+                "weight": weight,
+            }
+            for date, weight in (("2025-01-01", 72), ("2025-02-01", 70))
+        ],
+    )
+    monkeypatch.setattr(queries, "_backend", backend)
+    return queries
+
+
+def test_tools_share_one_profile_fetch(queries: Any) -> None:
+    from nutrition_agent.sub_agents.diet_planner_agent import get_user_nutrition_plan
+
+    plan = get_user_nutrition_plan("ada@example.com")
+    profile = queries.get_user_profile("ada@example.com")
+
+    assert plan["user_data"]["weight"] == 70
+    assert profile["name"] == "Ada"
+    assert queries.get_query_backend().statements == 1
+    assert get_user_nutrition_plan("bob@example.com")["status"] == "error"
+
+
+def test_statements_are_fixed_and_parameterized(queries: Any) -> None:
+    calls = []
+
+    def query(statement: str, job_config: Any) -> list[Any]:
+        calls.append((statement, job_config.query_parameters))
+        return []
+
+    backend = queries.BigQueryBackend(client=SimpleNamespace(query=query))
+    queries.set_query_backend(backend)
+    for email in ("ada@example.com", "x' OR '1'='1"):
+        queries.run_query("latest_user_profile", email=email)
+
+    assert calls[0][0] == calls[1][0]
+    assert "'" not in calls[0][0]
+    assert [p.value for _, (p,) in calls] == ["ada@example.com", "x' OR '1'='1"]
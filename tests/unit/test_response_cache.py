@@ -0,0 +1,180 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from collections.abc import AsyncGenerator
+
+import pytest
+from google.adk.agents import Agent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from app.utils import response_cache
+from app.utils.response_cache import (
+    ResponseCache,
+    normalize_prompt,
+    response_cache_key,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeLlm(BaseLlm):
+    requests: int = 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.requests += 1
+        yield LlmResponse(
+            content=types.Content(
+                role="model", parts=[types.Part(text=f"Answer {self.requests}")]
+            )
+        )
+
+
+def _user(text: str) -> types.Content:
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+def _answer(text: str) -> types.Content:
+    return types.Content(role="model", parts=[types.Part(text=text)])
+
+
+@pytest.fixture
+def cache(monkeypatch: pytest.MonkeyPatch) -> ResponseCache:
+    cache = ResponseCache()
+    monkeypatch.setattr(response_cache, "_cache", cache)
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE_ENABLED", True)
+    return cache
+
+
+def test_prompts_are_normalized() -> None:
+    assert normalize_prompt("How much protein do I need?") == normalize_prompt(
+        "  hey, how MUCH protein   do i need?? Please"
+    )
+    assert normalize_prompt("Is café okay?") == "is cafe okay"
+
+
+def test_conversations_that_touched_user_data_or_tools_have_no_key() -> None:
+    question = _user("How much protein do I need?")
+    assert response_cache_key("gym_assistant", [question]) is not None
+
+    assert response_cache_key("gym_assistant", [_user("I'm jo@example.com")]) is None
+    tool_call = types.Content(
+        role="model",
+        parts=[types.Part(function_call=types.FunctionCall(name="register_user"))],
+    )
+    assert response_cache_key("gym_assistant", [tool_call, question]) is None
+    sub_agent = _user("For context: [bigquery_agent] said: 9000 steps")
+    assert response_cache_key("gym_assistant", [sub_agent, question]) is None
+
+
+def test_follow_ups_are_keyed_by_the_whole_conversation() -> None:
+    follow_up = _user("And for women?")
+    protein = [_user("How much protein do I need?"), _answer("1.6 g/kg"), follow_up]
+    sleep = [_user("How much sleep do I need?"), _answer("7-9 h"), follow_up]
+
+    assert response_cache_key("gym_assistant", protein) != response_cache_key(
+        "gym_assistant", sleep
+    )
+
+
+def test_answers_expire_and_the_least_recently_used_is_evicted() -> None:
+    clock = FakeClock()
+    cache = ResponseCache(ttl_seconds=60, max_entries=2, clock=clock)
+    for key in ("a", "b"):
+        assert cache.lookup(f"invocation-{key}", key) is None
+        cache.store(f"invocation-{key}", _answer(key))
+
+    assert cache.lookup("invocation-1", "a") == _answer("a")
+    assert cache.lookup("invocation-c", "c") is None
+    cache.store("invocation-c", _answer("c"))
+    assert cache.lookup("invocation-2", "b") is None
+    assert cache.evictions == 1
+
+    clock.now += 61
+    assert cache.lookup("invocation-3", "a") is None
+    assert cache.stats()["hits"] == 1
+
+
+def _ask(model: FakeLlm, messages: list[str]) -> list[str]:
+    agent = Agent(
+        name="gym_assistant",
+        model=model,
+        before_model_callback=response_cache.cached_response,
+        after_model_callback=response_cache.store_response,
+    )
+    runner = InMemoryRunner(agent=agent)
+
+    async def sessions() -> list[str]:
+        answers = []
+        for message in messages:
+            # Every question comes from a different user
+            session = await runner.session_service.create_session(
+                app_name=runner.app_name, user_id="user"
+            )
+            async for event in runner.run_async(
+                user_id="user", session_id=session.id, new_message=_user(message)
+            ):
+                answers.append(event.content.parts[0].text)
+        return answers
+
+    return asyncio.run(sessions())
+
+
+def test_repeated_general_questions_skip_the_model(cache: ResponseCache) -> None:
+    model = FakeLlm(model="fake")
+    answers = _ask(
+        model,
+        [
+            "How much protein do I need?",
+            "how much protein do i need??",
+            "Is stretching before running good?",
+        ],
+    )
+
+    assert answers == ["Answer 1", "Answer 1", "Answer 2"]
+    assert model.requests == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 2)
+    assert stats["hit_ratio"] == pytest.approx(1 / 3)
+
+
+def test_questions_with_user_data_always_reach_the_model(
+    cache: ResponseCache,
+) -> None:
+    model = FakeLlm(model="fake")
+    _ask(model, ["How much protein do I need? I'm jo@example.com"] * 2)
+
+    assert model.requests == 2
+    assert cache.stats()["skipped"] == 2
+
+
+def test_the_cache_is_opt_in(
+    cache: ResponseCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE_ENABLED", False)
+    model = FakeLlm(model="fake")
+    _ask(model, ["How much protein do I need?"] * 2)
+
+    assert model.requests == 2
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,179 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import inspect
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+from toolbox_core.protocol import ParameterSchema
+
+from app.utils import toolbox, user_cache
+from app.utils.toolbox import ToolboxRegistry
+
+EMAIL_PARAM = ParameterSchema(name="email", type="string", description="User email.")
+
+
+class FakeTool:
+    def __init__(self, name: str) -> None:
+        self.__name__ = name
+        self._description = f"Fake {name}."
+        self._params = [EMAIL_PARAM]
+        self.calls: list[dict[str, Any]] = []
+
+    async def __call__(self, **kwargs: Any) -> str:
+        self.calls.append(kwargs)
+        await asyncio.sleep(0.05)
+        return "[]"
+
+
+class FakeClient:
+    instances = 0
+
+    def __init__(self, url: str, session: Any = None) -> None:
+        FakeClient.instances += 1
+        FakeClient.session = session
+
+    async def load_toolset(self, name: str) -> list[FakeTool]:
+        FakeClient.tools = [
+            FakeTool("get_fitness_data_for_user"),
+            FakeTool("register_user"),
+        ]
+        return FakeClient.tools
+
+
+@pytest.fixture(autouse=True)
+def fake_client(monkeypatch: pytest.MonkeyPatch) -> None:
+    FakeClient.instances = 0
+    monkeypatch.setattr(toolbox, "ToolboxClient", FakeClient)
+    monkeypatch.setattr(user_cache, "_cache", user_cache.UserDataCache())
+
+
+def test_cold_registry_loads_once_and_writes_cache(tmp_path: Path) -> None:
+    registry = ToolboxRegistry(
+        url="http://toolbox", cache_dir=str(tmp_path), tools_file=None
+    )
+    first = registry.tools()
+    second = registry.tools(["register_user"])
+
+    assert [t.__name__ for t in first] == ["get_fitness_data_for_user", "register_user"]
+    assert second[0] is first[1]
+    assert FakeClient.instances == 1
+    assert (tmp_path / "health-assistant-toolset.json").exists()
+
+
+def test_warm_registry_resolves_on_first_call(tmp_path: Path) -> None:
+    ToolboxRegistry(
+        url="http://toolbox", cache_dir=str(tmp_path), tools_file=None
+    ).tools()
+    FakeClient.instances = 0
+
+    registry = ToolboxRegistry(url="http://toolbox", cache_dir=str(tmp_path))
+    (tool,) = registry.tools(["get_fitness_data_for_user"])
+    assert FakeClient.instances == 0
+    assert list(inspect.signature(tool).parameters) == ["email"]
+
+    assert asyncio.run(tool(email="a@b.c")) == "[]"
+    assert FakeClient.instances == 1
+
+
+def test_cold_registry_seeds_schemas_from_tools_file(tmp_path: Path) -> None:
+    registry = ToolboxRegistry(url="http://toolbox", cache_dir=str(tmp_path))
+    (tool,) = registry.tools(["register_user"])
+
+    assert FakeClient.instances == 0
+    assert "health_notes" in inspect.signature(tool).parameters
+
+
+def test_unknown_tool_raises(tmp_path: Path) -> None:
+    registry = ToolboxRegistry(url="http://toolbox", cache_dir=str(tmp_path))
+    with pytest.raises(ValueError):
+        registry.tools(["drop_table"])
+
+
+def test_user_reads_are_cached_until_the_user_is_written(tmp_path: Path) -> None:
+    registry = ToolboxRegistry(
+        url="http://toolbox", cache_dir=str(tmp_path), tools_file=None
+    )
+    read, register = registry.tools()
+
+    async def conversation() -> None:
+        await read(email="a@b.c")
+        await read(email="A@b.c ")
+        await read(email="d@e.f")
+        await register(email="a@b.c")
+        await read(email="a@b.c")
+
+    asyncio.run(conversation())
+
+    assert [call["email"] for call in FakeClient.tools[0].calls] == [
+        "a@b.c",
+        "d@e.f",
+        "a@b.c",
+    ]
+    stats = user_cache.get_user_cache().stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 3, 1)
+
+
+def test_weekly_workout_plan_takes_one_list_per_column(tmp_path: Path) -> None:
+    registry = ToolboxRegistry(url="http://toolbox", cache_dir=str(tmp_path))
+    (tool,) = registry.tools(["add_weekly_workout_plan"])
+    parameters = inspect.signature(tool).parameters
+
+    assert parameters["email"].annotation is str
+    assert all(
+        parameters[name].annotation == list[str]
+        for name in ("dates", "days", "goals", "cool_down_phases")
+    )
+
+
+def test_concurrent_tool_calls_share_a_pooled_session(tmp_path: Path) -> None:
+    registry = ToolboxRegistry(url="http://toolbox", cache_dir=str(tmp_path))
+    read, register = registry.tools(["get_fitness_data_for_user", "register_user"])
+
+    async def turn() -> float:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(read(email=f"user{i}@example.com") for i in range(10)),
+            register(email="new@example.com"),
+        )
+        elapsed = time.perf_counter() - start
+        session = FakeClient.session
+        assert session.connector.limit == toolbox.TOOLBOX_MAX_CONNECTIONS
+        await registry.aclose()
+        assert session.closed
+        return elapsed
+
+    # Eleven 50 ms calls overlap instead of taking over half a second
+    assert asyncio.run(turn()) < 0.3
+    assert FakeClient.instances == 1
+    assert len(FakeClient.tools[0].calls) == 10
+
+
+def test_requests_on_fresh_event_loops_reuse_the_session(tmp_path: Path) -> None:
+    registry = ToolboxRegistry(url="http://toolbox", cache_dir=str(tmp_path))
+    (read,) = registry.tools(["get_fitness_data_for_user"])
+
+    # Like Runner.run, every request runs on its own event loop
+    for i in range(5):
+        asyncio.run(read(email=f"user{i}@example.com"))
+    session = FakeClient.session
+
+    assert FakeClient.instances == 1
+    assert not session.closed
+    registry.close()
+    assert session.closed
+    assert registry._thread is None
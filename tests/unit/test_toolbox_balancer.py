@@ -0,0 +1,183 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+import pytest
+from toolbox_core.protocol import ParameterSchema
+
+from app.utils import toolbox, user_cache
+from app.utils.toolbox import ToolboxRegistry
+from app.utils.toolbox_balancer import ToolboxBalancer
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def _balancer(clock: FakeClock, urls: int = 2) -> ToolboxBalancer:
+    return ToolboxBalancer(
+        [f"http://replica{i}" for i in range(urls)],
+        eject_seconds=30,
+        eject_failures=3,
+        slow_factor=3,
+        slow_min_calls=5,
+        far_slow_factor=5,
+        clock=clock,
+    )
+
+
+def _call(balancer: ToolboxBalancer, url: str, seconds: float, ok: bool = True) -> None:
+    (endpoint,) = [e for e in balancer.endpoints if e.url == url]
+    endpoint.outstanding += 1
+    balancer.release(endpoint, seconds, ok=ok)
+
+
+def test_least_outstanding_requests_weighted_by_latency(clock: FakeClock) -> None:
+    balancer = _balancer(clock)
+    _call(balancer, "http://replica0", 0.01)
+    _call(balancer, "http://replica1", 0.02)
+
+    # replica0 takes calls until its queue outweighs replica1's latency
+    picks = [balancer.acquire().url for _ in range(3)]
+    assert picks == ["http://replica0", "http://replica0", "http://replica1"]
+
+
+def test_endpoints_without_a_latency_take_one_call_at_a_time(clock: FakeClock) -> None:
+    balancer = _balancer(clock)
+    _call(balancer, "http://replica0", 0.01)
+
+    picks = [balancer.acquire().url for _ in range(4)]
+    assert picks.count("http://replica1") == 1
+
+
+def test_slow_endpoints_are_ejected_then_readmitted(clock: FakeClock) -> None:
+    balancer = _balancer(clock)
+    for call in range(5):
+        _call(balancer, "http://replica0", 0.02)
+        _call(balancer, "http://replica1", 0.08)
+        # One slow call is not enough
+        assert balancer.endpoints[1].ejections == (call == 4)
+
+    slow = balancer.endpoints[1]
+    assert {balancer.acquire().url for _ in range(10)} == {"http://replica0"}
+
+    clock.now += 31
+    assert "http://replica1" in {balancer.acquire().url for _ in range(10)}
+    assert slow.latency is None
+
+
+def test_far_slower_endpoints_are_ejected_on_their_first_call(
+    clock: FakeClock,
+) -> None:
+    balancer = _balancer(clock)
+    _call(balancer, "http://replica0", 0.02)
+    cold = balancer.endpoints[1]
+    cold.outstanding += 2
+    balancer.release(cold, 0.3)
+    balancer.release(cold, 0.3)
+
+    assert cold.ejections == 1
+    assert {balancer.acquire().url for _ in range(20)} == {"http://replica0"}
+
+
+def test_failing_endpoints_are_ejected(clock: FakeClock) -> None:
+    balancer = _balancer(clock)
+    for _ in range(3):
+        _call(balancer, "http://replica0", 1.0, ok=False)
+
+    assert balancer.endpoints[0].ejections == 1
+    assert balancer.acquire().url == "http://replica1"
+
+
+def test_unhealthy_endpoints_stay_out_until_they_pass_a_check(clock: FakeClock) -> None:
+    balancer = _balancer(clock)
+    replica0 = balancer.endpoints[0]
+    balancer.record_health(replica0, ok=False)
+    assert balancer.acquire().url == "http://replica1"
+
+    balancer.record_health(replica0, ok=True)
+    assert balancer.acquire().url == "http://replica0"
+
+
+def test_the_last_endpoint_is_never_ejected(clock: FakeClock) -> None:
+    balancer = _balancer(clock, urls=1)
+    for _ in range(5):
+        _call(balancer, "http://replica0", 1.0, ok=False)
+
+    assert balancer.endpoints[0].ejections == 0
+    assert balancer.acquire().url == "http://replica0"
+
+
+class FakeTool:
+    def __init__(self, url: str) -> None:
+        self.__name__ = "get_fitness_data_for_user"
+        self._description = "Fake tool."
+        self._params = [
+            ParameterSchema(name="email", type="string", description="User email.")
+        ]
+        self.url = url
+
+    async def __call__(self, **kwargs: Any) -> str:
+        if self.url == "http://down":
+            raise aiohttp.ClientConnectorError(None, OSError("refused"))
+        return f"[{self.url!r}]"
+
+
+class FakeClient:
+    def __init__(self, url: str, session: Any = None) -> None:
+        self.url = url
+
+    async def load_toolset(self, name: str) -> list[FakeTool]:
+        return [FakeTool(self.url)]
+
+
+def test_registry_retries_calls_that_cannot_connect(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(toolbox, "ToolboxClient", FakeClient)
+    monkeypatch.setattr(user_cache, "_cache", user_cache.UserDataCache(ttl_seconds=0))
+    registry = ToolboxRegistry(
+        url="http://down,http://up", cache_dir=str(tmp_path), tools_file=None
+    )
+    (read,) = registry.tools(["get_fitness_data_for_user"])
+
+    async def no_health_checks(session: Any) -> None:
+        pass
+
+    # The fake endpoints would fail real probes
+    monkeypatch.setattr(registry.balancer, "run_health_checks", no_health_checks)
+
+    async def calls() -> list[str]:
+        try:
+            return [await read(email=f"user{i}@example.com") for i in range(5)]
+        finally:
+            await registry.aclose()
+
+    assert asyncio.run(calls()) == ["['http://up']"] * 5
+    down, up = registry.balancer.endpoints
+    assert down.ejections == 1
+    assert up.calls == 5
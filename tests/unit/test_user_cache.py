@@ -0,0 +1,73 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from app.utils.user_cache import UserDataCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_reads_expire_after_the_ttl() -> None:
+    clock = FakeClock()
+    cache = UserDataCache(ttl_seconds=10, clock=clock)
+    loads = []
+
+    def load() -> str:
+        loads.append(1)
+        clock.now += 0.5
+        return "profile"
+
+    assert cache.get_or_load("a@b.c", "profile", load) == "profile"
+    clock.now = 9
+    cache.get_or_load("a@b.c", "profile", load)
+    clock.now = 11
+    cache.get_or_load("a@b.c", "profile", load)
+
+    assert len(loads) == 2
+    stats = cache.stats()
+    assert stats["hit_ratio"] == 1 / 3
+    assert stats["latency_saved_seconds"] == 0.5
+
+
+def test_least_recently_used_users_are_evicted() -> None:
+    cache = UserDataCache(max_users=2)
+    for email in ("a", "b", "a", "c"):
+        cache.get_or_load(email, "profile", lambda e=email: e)
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.get_or_load("a", "profile", lambda: "reloaded") == "a"
+    assert cache.get_or_load("b", "profile", lambda: "reloaded") == "reloaded"
+
+
+def test_a_read_in_flight_during_a_write_is_not_cached() -> None:
+    cache = UserDataCache()
+
+    def load_racing_a_write() -> str:
+        cache.invalidate("a@b.c")
+        return "before the write"
+
+    cache.get_or_load("a@b.c", "profile", load_racing_a_write)
+    assert cache.get_or_load("a@b.c", "profile", lambda: "after") == "after"
+
+
+def test_missing_users_are_not_cached() -> None:
+    cache = UserDataCache()
+    cache.get_or_load("a@b.c", "profile", lambda: None)
+
+    assert cache.get_or_load("a@b.c", "profile", lambda: "registered") == "registered"
@@ -0,0 +1,159 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, ClassVar
+
+import pytest
+
+from app.utils import toolbox, user_index
+from app.utils.toolbox import ToolboxRegistry
+from app.utils.user_index import UserEmailIndex, is_user_registered
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lookups_refresh_in_the_background_once_stale() -> None:
+    clock = FakeClock()
+    emails = ["ada@example.com"]
+    loads = []
+
+    def load() -> Iterable[str]:
+        loads.append(1)
+        return list(emails)
+
+    index = UserEmailIndex(load, refresh_seconds=60, clock=clock)
+    assert index.contains("Ada@Example.com ")
+    emails.append("bob@example.com")
+    assert not index.contains("bob@example.com")
+
+    clock.now = 61
+    index.contains("bob@example.com")
+    for thread in threading.enumerate():
+        if thread.name == "user-index-refresh":
+            thread.join()
+    assert index.contains("bob@example.com")
+    assert len(loads) == 2
+
+
+def test_a_failed_refresh_is_retried_after_a_delay() -> None:
+    clock = FakeClock()
+    loads = []
+
+    def load() -> Iterable[str]:
+        loads.append(1)
+        if len(loads) > 1:
+            raise RuntimeError("BigQuery unavailable")
+        return ["ada@example.com"]
+
+    def lookup() -> bool:
+        registered = index.contains("ada@example.com")
+        for thread in threading.enumerate():
+            if thread.name == "user-index-refresh":
+                thread.join()
+        return registered
+
+    index = UserEmailIndex(load, refresh_seconds=60, retry_seconds=10, clock=clock)
+    assert lookup()
+
+    clock.now = 61
+    assert lookup()
+    assert lookup()
+    assert len(loads) == 2
+
+    clock.now = 72
+    assert lookup()
+    assert len(loads) == 3
+
+
+def test_the_first_load_runs_off_the_event_loop(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def slow_load() -> Iterable[str]:
+        time.sleep(0.2)
+        return ["ada@example.com"]
+
+    monkeypatch.setattr(user_index, "_index", UserEmailIndex(slow_load))
+
+    async def lookup_while_ticking() -> tuple[dict, int]:
+        ticks = 0
+
+        async def tick() -> None:
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        result = await is_user_registered("ada@example.com")
+        ticker.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(lookup_while_ticking())
+    assert result["registered"] is True
+    assert ticks >= 5
+
+
+def test_registrations_survive_a_refresh_in_flight() -> None:
+    index: UserEmailIndex
+
+    def load() -> Iterable[str]:
+        # The snapshot was read before the registration landed
+        index.add("new@example.com")
+        return ["ada@example.com"]
+
+    index = UserEmailIndex(load)
+    index.refresh()
+    assert index.contains("new@example.com")
+
+
+class FakeRegisterTool:
+    __name__ = "register_user"
+    _description = "Register."
+    _params: ClassVar[list[Any]] = []
+
+    async def __call__(self, **kwargs: Any) -> str:
+        return "ok"
+
+
+class FakeClient:
+    def __init__(self, url: str, session: Any = None) -> None:
+        pass
+
+    async def load_toolset(self, name: str) -> list[Any]:
+        return [FakeRegisterTool()]
+
+
+def test_register_user_writes_through(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(toolbox, "ToolboxClient", FakeClient)
+    monkeypatch.setattr(user_index, "_index", UserEmailIndex(lambda: []))
+    (register,) = ToolboxRegistry(url="http://toolbox", cache_dir=str(tmp_path)).tools(
+        ["register_user"]
+    )
+
+    assert asyncio.run(is_user_registered("ada@example.com"))["registered"] is False
+    asyncio.run(register(email="ada@example.com", age=36))
+    assert asyncio.run(is_user_registered("ada@example.com"))["registered"] is True
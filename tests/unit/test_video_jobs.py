@@ -0,0 +1,440 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from app.sub_agents import video_generation_agent
+from app.utils import video_jobs
+from app.utils.video_jobs import VideoJobManager, video_cache_key
+
+
+class FakeOperations:
+    """Reports an operation as done after a fixed number of polls."""
+
+    def __init__(
+        self, polls_until_done: int, error: str | None = None, uri: str | None = None
+    ) -> None:
+        self.polls_until_done = polls_until_done
+        self.error = error
+        self.uri = uri
+        self.polls: dict[str, int] = {}
+        self.poll_times: list[float] = []
+
+    def get(self, operation: Any) -> Any:
+        self.poll_times.append(time.monotonic())
+        count = self.polls[operation.name] = self.polls.get(operation.name, 0) + 1
+        if count < self.polls_until_done:
+            return SimpleNamespace(name=operation.name, done=False)
+        video = SimpleNamespace(uri=self.uri, video_bytes=None)
+        response = SimpleNamespace(generated_videos=[SimpleNamespace(video=video)])
+        return SimpleNamespace(
+            name=operation.name,
+            done=True,
+            error=self.error,
+            response=None if self.error else response,
+        )
+
+
+class FakeGenaiClient:
+    def __init__(self, operations: FakeOperations, vertexai: bool = False) -> None:
+        self.operations = operations
+        self.vertexai = vertexai
+        self.models = SimpleNamespace(generate_videos=self._generate_videos)
+        self.files = SimpleNamespace(download=self._download)
+        self.submitted: list[Any] = []
+
+    def _generate_videos(self, **kwargs: Any) -> Any:
+        self.submitted.append(kwargs["config"])
+        return SimpleNamespace(name=f"operations/{len(self.submitted)}", done=False)
+
+    def _download(self, file: Any) -> bytes:
+        file.video_bytes = b"mp4"
+        return file.video_bytes
+
+
+class FakeBlob:
+    def __init__(self, storage: "FakeStorageClient", name: str) -> None:
+        self.storage = storage
+        self.name = name
+
+    def upload_from_file(self, file_obj: Any, content_type: str) -> None:
+        self.storage.objects[self.name] = file_obj.read()
+
+    def download_as_bytes(self) -> bytes:
+        return self.storage.objects[self.name]
+
+    @property
+    def size(self) -> int:
+        return len(self.storage.objects[self.name])
+
+
+class FakeStorageClient:
+    def __init__(self) -> None:
+        self.objects: dict[str, bytes] = {}
+
+    def bucket(self, name: str) -> Any:
+        return SimpleNamespace(
+            blob=lambda blob_name: FakeBlob(self, blob_name),
+            get_blob=self._get_blob,
+            rename_blob=self._rename_blob,
+        )
+
+    def _get_blob(self, name: str) -> FakeBlob | None:
+        return FakeBlob(self, name) if name in self.objects else None
+
+    def _rename_blob(self, blob: FakeBlob, new_name: str) -> FakeBlob:
+        self.objects[new_name] = self.objects.pop(blob.name, b"")
+        return FakeBlob(self, new_name)
+
+
+class FakeToolContext:
+    def __init__(self, inline_only: bool = False) -> None:
+        self.state: dict[str, Any] = {}
+        self.artifacts: dict[str, Any] = {}
+        self.inline_only = inline_only
+
+    async def save_artifact(self, filename: str, artifact: Any) -> int:
+        if self.inline_only and not artifact.inline_data:
+            raise ValueError("Artifact must have either inline_data or text.")
+        self.artifacts[filename] = artifact
+        return len(self.artifacts) - 1
+
+
+def make_manager(
+    operations: FakeOperations, vertexai: bool = False, **kwargs: Any
+) -> VideoJobManager:
+    return VideoJobManager(
+        client=FakeGenaiClient(operations, vertexai),
+        storage_client=FakeStorageClient(),
+        initial_interval=0.01,
+        max_interval=0.05,
+        **kwargs,
+    )
+
+
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+
+
+def test_submit_returns_before_the_video_is_ready() -> None:
+    manager = make_manager(FakeOperations(polls_until_done=3))
+    job = manager.submit("a squat, side view")
+
+    assert job.status == "running"
+    job = manager.wait(job.job_id, timeout=5)
+    assert job.status == "succeeded"
+    assert job.polls == 3
+    cache_object = f"veo_cache/{job.cache_key}.mp4"
+    assert job.gcs_url == f"gs://{manager.bucket_name}/{cache_object}"
+    assert manager.storage_client.objects == {cache_object: b"mp4"}
+    assert job.video_bytes == b"mp4"
+    assert not list(Path.cwd().iterdir())
+
+
+def test_poll_interval_backs_off_up_to_the_cap() -> None:
+    operations = FakeOperations(polls_until_done=6)
+    manager = make_manager(operations, backoff=2.0)
+    job = manager.wait(manager.submit("a plank").job_id, timeout=5)
+
+    gaps = [
+        b - a
+        for a, b in zip(operations.poll_times, operations.poll_times[1:], strict=False)
+    ]
+    assert gaps[1] > gaps[0]
+    assert job.poll_interval == pytest.approx(0.05)
+
+
+def test_failed_operation_reports_the_error() -> None:
+    manager = make_manager(FakeOperations(polls_until_done=1, error="quota"))
+    job = manager.wait(manager.submit("a lunge").job_id, timeout=5)
+
+    assert job.status == "failed"
+    assert "quota" in job.error
+
+
+def test_status_tool_resumes_a_job_from_session_state(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    operations = FakeOperations(polls_until_done=2)
+    submitter = make_manager(operations)
+    monkeypatch.setattr(video_jobs, "_manager", submitter)
+    tool_context = FakeToolContext()
+
+    submitted = asyncio.run(
+        video_generation_agent.generate_veo_video(
+            "a deadlift", tool_context=tool_context
+        )
+    )
+    assert submitted["status"] == "submitted"
+    job_id = submitted["job_id"]
+
+    # A different worker only knows the job from the session state
+    worker = make_manager(operations)
+    monkeypatch.setattr(video_jobs, "_manager", worker)
+    status = asyncio.run(
+        video_generation_agent.get_veo_video_status(job_id, tool_context)
+    )
+    assert status["status"] in ("running", "success")
+
+    worker.wait(job_id, timeout=5)
+    status = asyncio.run(
+        video_generation_agent.get_veo_video_status(job_id, tool_context)
+    )
+    assert status["status"] == "success"
+    assert status["artifact"] == {
+        "name": status["artifact"]["name"],
+        "version": 0,
+        "url": f"https://storage.googleapis.com/{worker.bucket_name}/veo_cache/{video_jobs.video_cache_key('a deadlift', '16:9')}.mp4",
+        "mime_type": "video/mp4",
+        "size_bytes": 3,
+    }
+    assert list(tool_context.artifacts) == [status["artifact"]["name"]]
+
+
+def test_vertex_video_is_written_to_the_bucket_by_veo() -> None:
+    operations = FakeOperations(
+        polls_until_done=1, uri="gs://bucket/veo_jobs/1/sample_0.mp4"
+    )
+    manager = make_manager(operations, vertexai=True)
+    job = manager.wait(manager.submit("a push-up").job_id, timeout=5)
+
+    config = manager.client.submitted[0]
+    assert config.output_gcs_uri.endswith(f"/veo_jobs/{job.job_id}/")
+    assert job.gcs_url == "gs://bucket/veo_jobs/1/sample_0.mp4"
+    assert job.video_bytes is None
+    assert manager.storage_client.objects == {}
+
+    tool_context = FakeToolContext()
+    asyncio.run(manager.save_artifact(job, tool_context))
+    assert tool_context.artifacts[job.filename].file_data.file_uri == job.gcs_url
+
+
+def test_inline_only_artifact_service_gets_the_stored_bytes() -> None:
+    operations = FakeOperations(polls_until_done=1, uri="gs://bucket/v/sample_0.mp4")
+    manager = make_manager(operations, vertexai=True)
+    manager.storage_client.objects["v/sample_0.mp4"] = b"mp4"
+    job = manager.wait(manager.submit("a row").job_id, timeout=5)
+
+    tool_context = FakeToolContext(inline_only=True)
+    asyncio.run(manager.save_artifact(job, tool_context))
+
+    assert tool_context.artifacts[job.filename].inline_data.data == b"mp4"
+    assert job.video_bytes is None
+
+
+def test_cache_key_ignores_case_and_whitespace() -> None:
+    assert video_cache_key("A  squat ", "16:9") == video_cache_key("a squat", "16:9")
+    assert video_cache_key("a squat", "16:9") != video_cache_key("a squat", "9:16")
+    assert video_cache_key("a squat", "16:9") != video_cache_key(
+        "a squat", "16:9", "music"
+    )
+
+
+def test_concurrent_identical_requests_share_one_generation() -> None:
+    manager = make_manager(FakeOperations(polls_until_done=2))
+    jobs: list[Any] = []
+    threads = [
+        threading.Thread(target=lambda: jobs.append(manager.submit("Box jumps")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(manager.client.submitted) == 1
+    assert len({job.job_id for job in jobs}) == 1
+    assert manager.wait(jobs[0].job_id, timeout=5).status == "succeeded"
+    assert manager.submit("box  jumps") is jobs[0]
+
+
+def test_cached_video_is_returned_without_generating(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    operations = FakeOperations(polls_until_done=1)
+    first = make_manager(operations)
+    first.wait(first.submit("a burpee").job_id, timeout=5)
+
+    # A fresh worker finds the video in the bucket
+    worker = make_manager(operations)
+    worker._storage_client = first.storage_client
+    monkeypatch.setattr(video_jobs, "_manager", worker)
+    result = asyncio.run(
+        video_generation_agent.generate_veo_video(
+            " A burpee", tool_context=FakeToolContext()
+        )
+    )
+
+    assert result["status"] == "success"
+    assert result["cached"] is True
+    assert result["artifact"]["size_bytes"] == 3
+    assert worker.client.submitted == []
+
+
+def test_a_job_resumed_after_it_was_moved_reports_the_cache_url() -> None:
+    first = make_manager(FakeOperations(polls_until_done=1), vertexai=True)
+    source = "veo_jobs/x/sample_0.mp4"
+    first.storage_client.objects[source] = b"mp4"
+    first.client.operations.uri = f"gs://{first.bucket_name}/{source}"
+    job = first.wait(first.submit("a pull-up").job_id, timeout=5)
+
+    # Another worker resumes the job after the first moved the video
+    worker = make_manager(first.client.operations, vertexai=True)
+    worker._storage_client = first.storage_client
+    resumed = worker.attach(
+        job.job_id, "operations/1", "a pull-up", "16:9", job.cache_key
+    )
+    resumed = worker.wait(resumed.job_id, timeout=5)
+
+    assert resumed.status == "succeeded"
+    assert resumed.gcs_url == job.gcs_url
+    assert resumed.size_bytes == 3
+
+
+def test_submitting_does_not_block_the_event_loop(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    manager = make_manager(FakeOperations(polls_until_done=100))
+    generate_videos = manager.client.models.generate_videos
+
+    def slow_generate_videos(**kwargs: Any) -> Any:
+        time.sleep(0.2)
+        return generate_videos(**kwargs)
+
+    manager.client.models.generate_videos = slow_generate_videos
+    monkeypatch.setattr(video_jobs, "_manager", manager)
+
+    async def two_requests() -> float:
+        start = time.perf_counter()
+        await asyncio.gather(
+            video_generation_agent.generate_veo_video("a squat"),
+            video_generation_agent.generate_veo_video("a lunge"),
+        )
+        return time.perf_counter() - start
+
+    assert asyncio.run(two_requests()) < 0.35
+
+
+def test_vertex_video_is_moved_to_its_cache_key() -> None:
+    manager = make_manager(FakeOperations(polls_until_done=1), vertexai=True)
+    manager.storage_client.objects["veo_jobs/x/sample_0.mp4"] = b"mp4"
+    manager.client.operations.uri = (
+        f"gs://{manager.bucket_name}/veo_jobs/x/sample_0.mp4"
+    )
+    job = manager.wait(manager.submit("a pull-up").job_id, timeout=5)
+
+    assert manager.storage_client.objects == {f"veo_cache/{job.cache_key}.mp4": b"mp4"}
+
+
+class QuotaLimitedModels:
+    """Rejects the first submissions with a 429, then accepts them."""
+
+    def __init__(self, client: FakeGenaiClient, rejections: int) -> None:
+        self.client = client
+        self.rejections = rejections
+
+    def generate_videos(self, **kwargs: Any) -> Any:
+        if self.rejections:
+            self.rejections -= 1
+            raise RuntimeError("429 RESOURCE_EXHAUSTED")
+        return self.client._generate_videos(**kwargs)
+
+
+def test_batch_runs_concurrently_under_the_cap() -> None:
+    manager = make_manager(
+        FakeOperations(polls_until_done=3), max_concurrent=3, submits_per_minute=6000
+    )
+    batch = manager.submit_batch([(f"day {i}", "16:9", "") for i in range(7)])
+
+    seen: set[int] = set()
+    while len(seen) < 7:
+        seen.update(manager.wait_batch(batch, seen, timeout=5))
+        running = sum(1 for job in batch.jobs if job is not None and not job.done)
+        assert running <= 3
+
+    assert batch.done
+    assert len(manager.client.submitted) == 7
+    assert all(job.status == "succeeded" for job in batch.jobs)
+
+
+def test_batch_retries_quota_errors() -> None:
+    manager = make_manager(FakeOperations(polls_until_done=1), submits_per_minute=6000)
+    manager.client.models = QuotaLimitedModels(manager.client, rejections=2)
+    batch = manager.submit_batch([("a", "16:9", ""), ("b", "16:9", "")])
+
+    seen: set[int] = set()
+    while not batch.done:
+        seen.update(manager.wait_batch(batch, seen, timeout=5))
+    assert batch.errors == [None, None]
+    assert len(manager.client.submitted) == 2
+
+
+def test_finished_jobs_and_their_buffers_expire() -> None:
+    manager = make_manager(
+        FakeOperations(polls_until_done=1),
+        submits_per_minute=6000,
+        job_ttl_seconds=3600,
+        buffer_ttl_seconds=300,
+    )
+    batch = manager.submit_batch([("a squat", "16:9", "")])
+    while not batch.done:
+        manager.wait_batch(batch, set(), timeout=5)
+    (job,) = batch.jobs
+    assert job.video_bytes == b"mp4"
+
+    job.finished_at -= 301
+    manager.submit("a plank")
+    assert job.video_bytes is None
+    assert manager.get(job.job_id) is job
+
+    job.finished_at -= 3300
+    manager.submit("a lunge")
+    assert manager.get(job.job_id) is None
+    assert manager.get_batch(batch.batch_id) is None
+    # The stored video still answers the same request
+    assert manager.submit("a squat").cached
+
+
+def test_batch_status_tool_streams_new_results(monkeypatch: pytest.MonkeyPatch) -> None:
+    manager = make_manager(FakeOperations(polls_until_done=1), submits_per_minute=6000)
+    monkeypatch.setattr(video_jobs, "_manager", manager)
+    tool_context = FakeToolContext()
+
+    submitted = asyncio.run(
+        video_generation_agent.generate_veo_video_batch(
+            ["mon", "tue", "wed"], tool_context=tool_context
+        )
+    )
+    batch_id = submitted["batch_id"]
+    reported: list[int] = []
+    for _ in range(10):
+        status = asyncio.run(
+            video_generation_agent.get_veo_batch_status(
+                batch_id, wait_seconds=5, tool_context=tool_context
+            )
+        )
+        reported += [result["index"] for result in status["new_results"]]
+        if status["status"] == "done":
+            break
+
+    assert sorted(reported) == [0, 1, 2]
+    assert len(tool_context.artifacts) == 3
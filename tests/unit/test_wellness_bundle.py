@@ -0,0 +1,139 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import time
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+from google.adk.events import Event
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from pydantic import Field
+
+from app.sub_agents import wellness_bundle_agent
+from app.sub_agents.wellness_bundle_agent import (
+    WellnessBundleAgent,
+    create_wellness_bundle_agent,
+)
+
+PLANNER_SECONDS = 0.3
+
+
+class FakeLlm(BaseLlm):
+    requests: list[str] = Field(default_factory=list)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.requests.append(llm_request.config.system_instruction)
+        await asyncio.sleep(PLANNER_SECONDS)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=self.model)])
+        )
+
+
+@pytest.fixture
+def loads(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    loads: list[str] = []
+
+    def load_profile(email: str) -> dict[str, Any]:
+        loads.append(f"profile:{email}")
+        return {"name": "Jo", "goal": "lose weight"}
+
+    def load_fitness(email: str) -> dict[str, Any]:
+        loads.append(f"fitness:{email}")
+        return {"status": "success", "rollup": {"steps_mean_7d": 9000}}
+
+    monkeypatch.setattr(wellness_bundle_agent, "_load_profile", load_profile)
+    monkeypatch.setattr(wellness_bundle_agent, "_load_fitness", load_fitness)
+    return loads
+
+
+def _bundle() -> tuple[WellnessBundleAgent, FakeLlm, FakeLlm]:
+    bundle = create_wellness_bundle_agent()
+    workout, diet = bundle.sub_agents[1].sub_agents
+    workout.model = FakeLlm(model="7-day training week", requests=[])
+    diet.model = FakeLlm(model="7-day diet plan", requests=[])
+    return bundle, workout.model, diet.model
+
+
+def _run(bundle: WellnessBundleAgent, message: str) -> list[Event]:
+    runner = InMemoryRunner(agent=bundle)
+
+    async def turn() -> list[Event]:
+        session = await runner.session_service.create_session(
+            app_name=runner.app_name, user_id="user"
+        )
+        return [
+            event
+            async for event in runner.run_async(
+                user_id="user",
+                session_id=session.id,
+                new_message=types.Content(
+                    role="user", parts=[types.Part(text=message)]
+                ),
+            )
+        ]
+
+    return asyncio.run(turn())
+
+
+def test_bundle_reads_once_and_plans_concurrently(loads: list[str]) -> None:
+    bundle, workout, diet = _bundle()
+
+    start = time.perf_counter()
+    events = _run(bundle, "Plan my training and meals, I'm Jo@Example.com")
+    elapsed = time.perf_counter() - start
+
+    assert sorted(loads) == ["fitness:jo@example.com", "profile:jo@example.com"]
+    assert len(workout.requests) == len(diet.requests) == 1
+    instruction = workout.requests[0]
+    data = json.loads(instruction.split("already fetched:\n")[1].split("\n")[0])
+    assert data["fitness"] == {"steps_mean_7d": 9000}
+    assert elapsed < 2 * PLANNER_SECONDS
+
+    merged = events[-1]
+    assert merged.author == "wellness_merge"
+    text = merged.content.parts[0].text
+    assert text.index("7-day training week") < text.index("7-day diet plan")
+
+
+def test_bundle_asks_for_an_email_before_planning(loads: list[str]) -> None:
+    bundle, workout, diet = _bundle()
+
+    events = _run(bundle, "Give me my wellness bundle")
+
+    assert loads == []
+    assert workout.requests == diet.requests == []
+    assert [event.author for event in events] == ["wellness_bundle_agent"]
+    assert "email" in events[0].content.parts[0].text
+
+
+def test_bundle_builds_without_the_plan_storage_tool(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def missing_tool(*names: str) -> list:
+        raise ValueError(f"Tools not found in toolset: {names}")
+
+    monkeypatch.setattr(wellness_bundle_agent, "get_toolbox_tools", missing_tool)
+    bundle = create_wellness_bundle_agent()
+
+    workout, _ = bundle.sub_agents[1].sub_agents
+    assert workout.tools == []
+    assert "add_weekly_workout_plan" not in workout.instruction
+    assert "{store_step}" not in workout.instruction